@@ -0,0 +1,166 @@
+"""batch_prefetch.py
+
+Préchargement des batchs d'apprentissage (double tampon) pour `DQNAgent.train_step`.
+
+Sans préchargement, chaque pas de gradient commence par échantillonner le replay et
+construire les tenseurs (boucles Python sur les objets `Transition` pour le replay
+"transitions"). `BatchPrefetcher` fait ce travail dans un thread de fond:
+
+- les `depth` prochains batchs sont préparés à l'avance dans une file bornée
+- contre-pression: quand la file est pleine, le thread attend (bloqué, sans consommer de CPU)
+  que l'apprenant prenne un batch
+- l'échantillonnage se fait sous `agent.replay_lock`, partagé avec `DQNAgent.remember`
+
+Activation: `DQNConfig(prefetch_batches=K)` (le thread démarre au premier `train_step`) ou
+`agent.start_prefetch(K)`; `agent.stop_prefetch()` l'arrête.
+
+Compromis:
+- un batch peut dater de quelques pas (au plus `depth`): il ignore les transitions ajoutées
+  depuis sa préparation
+- l'ordre des tirages aléatoires dépend de l'ordonnancement des threads: les entraînements ne
+  sont plus reproductibles à l'identique (`reproducibility.seed_everything`)
+- désactivé par défaut (`DEFAULT_PREFETCH_BATCHES = 0`): aucun gain mesuré. `python
+  batch_prefetch.py --updates 3000 --depth 4`, un seul cœur, deux passes:
+
+    replay        sans préchargement      préchargement (4 batchs)
+    transitions   976-1069 maj/s          874-1002 maj/s   (-6 à -10 %)
+    indexed       1316-1357 maj/s         1230-1240 maj/s  (-7 à -9 %)
+
+  Le pas isolé (après 5 ms de pause, cas du jeu) varie de -13 % à +3 % d'une passe à
+  l'autre, sans tendance: dans le bruit. Le thread ne libère le GIL que dans les appels
+  torch/numpy; la construction Python du batch et le passage par la file coûtent plus cher
+  que le travail déplacé. Un gain ne serait envisageable qu'avec un cœur libre
+
+Exemple:
+    python batch_prefetch.py --updates 3000 --depth 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import torch
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_PREFETCH_DEPTH = 4  # batchs préparés à l'avance
+DEFAULT_PREFETCH_POLL_S = 0.1  # période de vérification de l'arrêt quand la file est pleine
+
+
+class BatchPrefetcher:
+    """Thread producteur de batchs (tuples de tenseurs de `DQNAgent._sample_tensors`)."""
+
+    def __init__(self, agent, depth: int = DEFAULT_PREFETCH_DEPTH, batch_size: Optional[int] = None):
+        self.agent = agent
+        self.depth = max(1, depth)
+        self.batch_size = batch_size or agent.config.batch_size
+        self.queue: "queue.Queue[Tuple[torch.Tensor, ...]]" = queue.Queue(maxsize=self.depth)
+        self.produced = 0
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="batch-prefetch", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                batch = self.agent._build_batch(self.batch_size)
+                while not self._stop.is_set():
+                    try:
+                        self.queue.put(batch, timeout=DEFAULT_PREFETCH_POLL_S)
+                        self.produced += 1
+                        break
+                    except queue.Full:
+                        continue
+        except BaseException as e:  # remonté à l'apprenant par `get`
+            self._error = e
+
+    def get(self) -> Tuple[torch.Tensor, ...]:
+        """Prochain batch (attend s'il n'est pas encore prêt).
+
+        Raises:
+            RuntimeError si le thread producteur s'est arrêté sur une erreur
+        """
+        while True:
+            try:
+                return self.queue.get(timeout=DEFAULT_PREFETCH_POLL_S)
+            except queue.Empty:
+                if self._error is not None or not self._thread.is_alive():
+                    raise RuntimeError(f"Préchargement des batchs interrompu: {self._error!r}") from self._error
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def __enter__(self) -> "BatchPrefetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def benchmark(updates: int, depth: int, replay_mode: str = "transitions", seed: int = 0) -> Dict[str, float]:
+    """Sans / avec préchargement (même replay, tranches alternées).
+
+    - `*_updates_per_s`: débit en boucle serrée (apprenant saturé)
+    - `*_step_ms`: durée médiane d'un `train_step` isolé après une pause de 5 ms (cas du jeu:
+      un pas par coup, entre deux images)
+    """
+    from dataclasses import replace
+
+    from compiled_step import _filled_agent
+    from dqn_agent import DQNAgent
+
+    base = _filled_agent("eager", 5_000, seed)
+    config = replace(base.config, replay_mode=replay_mode)
+    agents = {}
+    for nom, prefetch in (("direct", 0), ("prefetch", depth)):
+        agent = DQNAgent(replace(config, prefetch_batches=prefetch), device="cpu")
+        for t in base.replay.buffer:
+            agent.remember(t)
+        agent.train_step()
+        agents[nom] = agent
+
+    tranche = max(1, updates // 10)
+    meilleur = {nom: float("inf") for nom in agents}
+    for _ in range(max(1, updates // tranche)):
+        for nom, agent in agents.items():
+            t0 = time.perf_counter()
+            for _ in range(tranche):
+                agent.train_step()
+            meilleur[nom] = min(meilleur[nom], time.perf_counter() - t0)
+    rows = {f"{nom}_updates_per_s": tranche / meilleur[nom] for nom in agents}
+    for nom, agent in agents.items():
+        durees = []
+        for _ in range(200):
+            time.sleep(0.005)
+            t0 = time.perf_counter()
+            agent.train_step()
+            durees.append(time.perf_counter() - t0)
+        rows[f"{nom}_step_ms"] = sorted(durees)[len(durees) // 2] * 1e3
+    agents["prefetch"].stop_prefetch()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Préchargement des batchs d'apprentissage: débit")
+    parser.add_argument("--updates", type=int, default=3_000)
+    parser.add_argument("--depth", type=int, default=DEFAULT_PREFETCH_DEPTH)
+    parser.add_argument("--replay-mode", choices=("transitions", "indexed", "dedup"), default="transitions")
+    args = parser.parse_args()
+    r = benchmark(args.updates, args.depth, args.replay_mode)
+    print(f"sans préchargement: {r['direct_updates_per_s']:.0f} maj/s, pas isolé {r['direct_step_ms']:.3f} ms | "
+          f"préchargement ({args.depth} batchs): {r['prefetch_updates_per_s']:.0f} maj/s, "
+          f"pas isolé {r['prefetch_step_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""compiled_step.py
+
+Pas d'apprentissage DQN compilé (torch.compile ou TorchScript), avec repli en mode eager.
+
+Sur un MLP de 9 entrées, `DQNAgent.train_step` passe l'essentiel de son temps à
+enchaîner de petites opérations (trois forwards, gather, argmax masqué, where, Huber).
+`TDLoss` regroupe tout le calcul de la perte en un seul module:
+
+- Q_online(s) et Q_online(s') en un seul forward (concaténation, comme `train_fused`)
+- cible Double DQN (argmax masqué online, évaluation target) et perte de Huber
+
+`TDStep` calcule perte et gradients (laissés dans `.grad` des paramètres de Q_online) selon
+`DQNConfig.compile_mode`:
+
+- 'eager'   : pas de `TDStep` (comportement historique de `train_step`)
+- 'compile' : gradient fonctionnel (`torch.func.grad_and_value`) compilé par `torch.compile`:
+              forward, cible et backward forment un seul graphe, sans passage par le moteur
+              autograd; première mise à jour lente (compilation, ~3-30 s sur CPU).
+              C'est le mode à utiliser: ~730 -> ~1100 maj/s sur un cœur CPU
+- 'fused'   : `TDLoss` sans compilation (deux forwards au lieu de trois) + backward autograd
+- 'script'  : `TDLoss` en TorchScript (`torch.jit.script`) + backward autograd
+'fused' et 'script' gardent le moteur autograd, qui domine à cette taille: mesurés entre -5 %
+et +3 % par rapport à eager, dans le bruit. Ils servent de référence de parité, pas à accélérer.
+
+Si la compilation échoue (PyTorch trop ancien, pas de compilateur C++...), l'agent repasse
+en 'eager' avec un avertissement. Le pas d'Adam reste celui de l'agent.
+
+Exemple:
+    python compiled_step.py --mode compile --updates 2000     # parité + débit eager vs compilé
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+import warnings
+from dataclasses import replace
+from typing import Dict, Tuple
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+COMPILE_MODES = ("eager", "fused", "compile", "script")
+
+# Écarts tolérés entre perte / gradients eager et compilés (float32, ordre des réductions)
+DEFAULT_PARITY_ATOL = 1e-5
+
+
+class TDLoss(nn.Module):
+    """Perte TD Double DQN (Huber) d'un batch; retourne (perte, Q_online(s))."""
+
+    def __init__(self, q: nn.Module, q_target: nn.Module):
+        super().__init__()
+        self.q = q
+        self.q_target = q_target
+
+    def forward(
+        self,
+        states: torch.Tensor,
+        actions: torch.Tensor,
+        rewards: torch.Tensor,
+        next_states: torch.Tensor,
+        dones: torch.Tensor,
+        next_masks: torch.Tensor,
+        discounts: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        b = states.shape[0]
+        q_cat = self.q(torch.cat([states, next_states], dim=0))
+        q_all = q_cat[:b]
+        q_sa = q_all.gather(1, actions).squeeze(1)
+
+        with torch.no_grad():
+            q_next_online = q_cat[b:].detach()
+            q_masked = torch.where(next_masks > 0.5, q_next_online, torch.full_like(q_next_online, -1e9))
+            next_actions = torch.argmax(q_masked, dim=1).unsqueeze(1)
+            q_next = self.q_target(next_states).gather(1, next_actions).squeeze(1)
+            q_next = torch.where(q_next < -1e8, torch.zeros_like(q_next), q_next)
+            target = rewards + (1.0 - dones) * discounts * q_next
+
+        return F.smooth_l1_loss(q_sa, target), q_all
+
+
+class TDStep:
+    """Perte et gradients d'un batch: `step(*tenseurs)` -> (perte, Q_online(s)), gradients dans `q.grad`."""
+
+    def __init__(self, q: nn.Module, q_target: nn.Module, mode: str):
+        if mode not in COMPILE_MODES or mode == "eager":
+            raise ValueError(f"Mode de compilation invalide: {mode} (modes: {', '.join(COMPILE_MODES[1:])})")
+        self.q = q
+        self.q_target = q_target
+        self.mode = mode
+        self._loss = TDLoss(q, q_target)
+        if mode == "compile":
+            if not hasattr(torch, "compile") or not hasattr(torch, "func"):
+                raise RuntimeError("torch.compile indisponible (PyTorch >= 2.0 requis)")
+            self._names = [n for n, _ in q.named_parameters()]
+            self._grad_fn = torch.compile(torch.func.grad_and_value(self._functional_loss, has_aux=True), dynamic=False)
+        elif mode == "script":
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)  # TorchScript déprécié à partir de PyTorch 2.5
+                self._loss = torch.jit.script(self._loss)
+
+    def _functional_loss(self, params: Tuple[torch.Tensor, ...], *tensors: torch.Tensor):
+        # Poids passés en argument: le graphe compilé reste valable après une synchro du target
+        # network ou un chargement (les tenseurs des réseaux peuvent être remplacés)
+        poids = {f"q.{n}": p for n, p in zip(self._names, params)}
+        poids.update({f"q_target.{n}": p.detach() for n, p in self.q_target.named_parameters()})
+        loss, q_all = torch.func.functional_call(self._loss, poids, tensors)
+        return loss, (loss.detach(), q_all.detach())
+
+    def __call__(self, *tensors: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        params = tuple(self.q.parameters())
+        if self.mode == "compile":
+            grads, (loss, q_all) = self._grad_fn(tuple(p.detach() for p in params), *tensors)
+            for p, g in zip(params, grads):
+                p.grad = g
+            return loss, q_all
+        for p in params:
+            p.grad = None
+        loss, q_all = self._loss(*tensors)
+        loss.backward()
+        return loss.detach(), q_all
+
+
+def _grads(module: nn.Module) -> torch.Tensor:
+    return torch.cat([p.grad.flatten() for p in module.parameters() if p.grad is not None])
+
+
+def check_parity(agent, mode: str, batches: int = 10, atol: float = DEFAULT_PARITY_ATOL) -> Dict[str, float]:
+    """Compare perte et gradients du pas eager de l'agent et du pas compilé, sur des batchs du replay.
+
+    Les réseaux de l'agent ne sont pas modifiés (copies).
+
+    Returns:
+        {"max_loss_diff", "max_grad_diff", "ok"}
+    """
+    from dqn_agent import DQNAgent
+
+    reference = DQNAgent(replace(agent.config, compile_mode="eager", memory_budget_mb=0), device=str(agent.device))
+    reference.q.load_state_dict(agent.q.state_dict())
+    reference.q_target.load_state_dict(agent.q_target.state_dict())
+    q = copy.deepcopy(agent.q)
+    step = TDStep(q, copy.deepcopy(agent.q_target), mode)
+
+    max_loss = max_grad = 0.0
+    for _ in range(batches):
+        tensors = agent._sample_tensors(agent.config.batch_size)
+        reference.q.zero_grad()
+        loss_ref = reference.eager_loss(*tensors)[0]
+        loss_ref.backward()
+        loss_c = step(*tensors)[0]
+        max_loss = max(max_loss, abs(loss_ref.item() - loss_c.item()))
+        max_grad = max(max_grad, float((_grads(reference.q) - _grads(q)).abs().max()))
+    return {"max_loss_diff": max_loss, "max_grad_diff": max_grad, "ok": float(max(max_loss, max_grad) <= atol)}
+
+
+def _filled_agent(mode: str, transitions: int, seed: int):
+    import random
+
+    from dqn_agent import DQNAgent, DQNConfig
+    from tictactoe_env import Transition, check_winner, to_perspective, valid_actions
+
+    torch.manual_seed(seed)
+    rng = random.Random(seed)
+    agent = DQNAgent(DQNConfig(compile_mode=mode, min_replay_size=256), device="cpu")
+    while len(agent.replay) < transitions:
+        board = [0] * 9
+        player = 1
+        while True:
+            state = to_perspective(board, player)
+            a = rng.choice(valid_actions(board))
+            board[a] = player
+            winner = check_winner(board)
+            done = winner != 0 or all(v != 0 for v in board)
+            nxt = to_perspective(board, -player)
+            mask = [0.0] * 9 if done else [1.0 if v == 0 else 0.0 for v in board]
+            agent.remember(Transition([float(v) for v in state], a, 1.0 if winner else 0.0,
+                                      [float(v) for v in nxt], done, mask))
+            if done:
+                break
+            player = -player
+    return agent
+
+
+def benchmark(mode: str, updates: int, seed: int = 0) -> Dict[str, float]:
+    """Mises à jour par seconde: eager vs `mode` (même replay, même graine).
+
+    Les deux agents alternent par tranches de `updates // 10` mises à jour (meilleure tranche
+    retenue) pour limiter l'effet du bruit de la machine.
+    """
+    rows: Dict[str, float] = {}
+    agents = {m: _filled_agent(m, 5_000, seed) for m in ("eager", mode)}
+    for m, agent in agents.items():
+        t0 = time.perf_counter()
+        agent.train_step()  # compilation éventuelle hors mesure
+        rows[f"{m}_first_step_s"] = time.perf_counter() - t0
+    tranche = max(1, updates // 10)
+    meilleur = {m: float("inf") for m in agents}
+    for _ in range(max(1, updates // tranche)):
+        for m, agent in agents.items():
+            t0 = time.perf_counter()
+            for _ in range(tranche):
+                agent.train_step()
+            meilleur[m] = min(meilleur[m], time.perf_counter() - t0)
+    for m in agents:
+        rows[f"{m}_updates_per_s"] = tranche / meilleur[m]
+    rows.update(check_parity(agents[mode], mode))
+    rows["effective_mode"] = agents[mode].effective_compile_mode  # type: ignore[assignment]
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pas d'apprentissage DQN compilé: parité et débit")
+    parser.add_argument("--mode", choices=COMPILE_MODES[1:], default="compile")
+    parser.add_argument("--updates", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    torch.set_num_threads(1)
+    r = benchmark(args.mode, args.updates, args.seed)
+    print(f"eager: {r['eager_updates_per_s']:.0f} maj/s | {args.mode} ({r['effective_mode']}): "
+          f"{r[f'{args.mode}_updates_per_s']:.0f} maj/s (premier pas {r[f'{args.mode}_first_step_s']:.1f} s)")
+    print(f"parité: écart perte {r['max_loss_diff']:.2e}, écart gradients {r['max_grad_diff']:.2e} "
+          f"-> {'OK' if r['ok'] else 'ÉCHEC'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""distillation.py
+
+Pré-entraînement supervisé du `QNetwork` à partir de l'oracle Minimax (distillation).
+
+Au lieu de `DEFAULT_BOOTSTRAP_EPISODES` parties de self-play au premier lancement, le réseau
+apprend directement les valeurs exactes des coups:
+
+- données: les 4520 états non terminaux atteignables (`tictactoe_env.reachable_states`),
+  en perspective (1 = joueur qui doit jouer)
+- étiquettes: score exact de chaque coup légal (`state_index.negamax_scores`, la résolution
+  complète du jeu, identique au Minimax de `morpion.py` en 'difficile'), converti à l'échelle
+  de la cible TD du self-play: +gamma^k si le coup gagne, -gamma^k s'il perd, 0 si nul, k =
+  nombre de coups suivants du même joueur avec un jeu parfait (une transition relie deux coups
+  du joueur, la défaite est posée sur son dernier coup)
+- perte: erreur quadratique sur les coups légaux seulement (les coups illégaux sont masqués
+  par `select_action`) + terme de classement (entropie croisée entre softmax(Q / température)
+  et les coups optimaux): la régression seule plafonne vers 96 % de coups optimaux avec 64
+  neurones cachés, et les erreurs restantes tombent sur les lignes jouées par le Minimax
+- quelques époques en grands batchs, puis des tours ciblés sur les états encore mal joués
+  (mélangés à des états tirés au hasard pour ne pas oublier les autres), ~2 s sur un cœur CPU
+- en option, un court self-play (`finetune_episodes`) avec exploration minimale
+
+Les étiquettes sont le point fixe de la cible TD (`r + gamma * max Q(s')`, s' = état du joueur
+à son coup suivant) contre un adversaire parfait. Le TD seul fait quand même dériver le réseau
+(le self-play ne visite qu'une partie des états et la régression seule plafonne vers 96 %):
+accord 100 % -> ~90 % après quelques centaines d'épisodes au lr par défaut. Le fine-tuning
+alterne donc des tranches de self-play (`DEFAULT_DISTILL_FINETUNE_CHUNK` épisodes, lr réduit)
+et des tours ciblés sur l'oracle: mesuré, 100 % en fin de fine-tuning (~98,5 % au pire entre
+deux tranches). Sans fine-tuning, `distill` marque l'agent `frozen`: ni le jeu ni
+`self_play_train` ne l'entraînent plus, y compris après rechargement.
+
+Mesures par rapport à l'oracle (`oracle_accuracy`):
+- `accuracy`: proportion des états où le coup glouton du réseau est un coup optimal
+- `outcome_accuracy`: proportion des états où ce coup conserve l'issue (victoire / nul /
+  défaite) de la position, même s'il n'est pas le plus rapide
+
+Exemple:
+    python distillation.py --out models/dqn_tictactoe.pt
+    python distillation.py --compare-bootstrap     # comparaison avec le bootstrap self-play
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+import state_index
+from dqn_agent import DEFAULT_BOOTSTRAP_EPISODES, DQNAgent, DQNConfig, _make_adam, self_play_train
+from tictactoe_env import reachable_states
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_DISTILL_EPOCHS = 60
+DEFAULT_DISTILL_BATCH_SIZE = 256
+DEFAULT_DISTILL_LR = 3e-3
+DEFAULT_DISTILL_RANKING_WEIGHT = 1.0  # poids du terme de classement (0 = régression seule)
+DEFAULT_DISTILL_RANKING_TEMPERATURE = 0.1
+DEFAULT_DISTILL_HARD_ROUNDS = 30  # tours sur les états mal joués (arrêt dès qu'il n'y en a plus)
+DEFAULT_DISTILL_HARD_STEPS = 20  # pas de gradient par tour
+DEFAULT_DISTILL_FINETUNE_EPISODES = 0  # self-play après distillation (0 = aucun)
+DEFAULT_DISTILL_FINETUNE_LR = 1e-4  # lr de l'agent pendant le fine-tuning (restauré ensuite)
+DEFAULT_DISTILL_FINETUNE_CHUNK = 100  # épisodes de self-play entre deux tours ciblés sur l'oracle
+
+_ILLEGAL = -128  # score d'un coup illégal (hors de l'intervalle [-10, 10])
+
+
+def oracle_dataset(gamma: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Étiquettes de l'oracle pour tous les états non terminaux atteignables.
+
+    Returns:
+        (états float32 [n, 9], Q cibles float32 [n, 9], coups légaux bool [n, 9],
+         scores exacts int16 [n, 9], `_ILLEGAL` pour un coup illégal)
+    """
+    idx = np.array([state_index.board_to_index(s) for s in reachable_states()], dtype=np.int64)
+    scores_table = state_index.negamax_scores()
+    legal = state_index.LEGAL_MASK[idx]
+    scores = np.full((len(idx), 9), _ILLEGAL, dtype=np.int16)
+    for a in range(9):
+        child = np.where(legal[:, a], idx + state_index.POW3[a], 0)
+        scores[:, a] = np.where(legal[:, a], -scores_table[state_index.FLIP[child]].astype(np.int16), _ILLEGAL)
+
+    # |score| = cases vides à la fin de la partie + 1: demi-coups restants après le coup.
+    # Cible TD du self-play: un pas de gamma par coup du joueur (victoire: demi-coups / 2,
+    # défaite: -1 posé sur son dernier coup, soit (demi-coups - 1) / 2)
+    remaining = (state_index.EMPTIES[idx].astype(np.int64) - 1)[:, None] - (np.abs(scores) - 1)
+    targets = np.where(legal, np.sign(scores) * np.power(gamma, np.maximum(remaining, 0) // 2), 0.0)
+    return state_index.CELLS[idx].astype(np.float32), targets.astype(np.float32), legal, scores
+
+
+@torch.no_grad()
+def oracle_accuracy(q_net: nn.Module, states: np.ndarray, legal: np.ndarray, scores: np.ndarray) -> Dict[str, float]:
+    """Accord du coup glouton du réseau avec l'oracle (voir le docstring du module)."""
+    device = next(q_net.parameters()).device
+    q = q_net(torch.from_numpy(states).to(device)).cpu().numpy()
+    choix = np.where(legal, q, -np.inf).argmax(axis=1)
+    joue = scores[np.arange(len(choix)), choix]
+    meilleur = scores.max(axis=1)
+    return {
+        "accuracy": float(np.mean(joue == meilleur)),
+        "outcome_accuracy": float(np.mean(np.sign(joue) == np.sign(meilleur))),
+    }
+
+
+def _greedy_errors(q_net: nn.Module, x: torch.Tensor, illegal: torch.Tensor, optimal: torch.Tensor) -> torch.Tensor:
+    """Index des états où le coup glouton du réseau n'est pas optimal."""
+    with torch.no_grad():
+        choix = q_net(x).masked_fill(illegal, -1e9).argmax(dim=1)
+    return torch.nonzero(~optimal[torch.arange(len(choix), device=x.device), choix]).squeeze(1)
+
+
+def distill(
+    agent: DQNAgent,
+    epochs: int = DEFAULT_DISTILL_EPOCHS,
+    batch_size: int = DEFAULT_DISTILL_BATCH_SIZE,
+    lr: float = DEFAULT_DISTILL_LR,
+    finetune_episodes: int = DEFAULT_DISTILL_FINETUNE_EPISODES,
+    ranking_weight: float = DEFAULT_DISTILL_RANKING_WEIGHT,
+    hard_rounds: int = DEFAULT_DISTILL_HARD_ROUNDS,
+) -> Dict[str, float]:
+    """Entraîne `agent.q` sur les valeurs de l'oracle, puis synchronise le target network.
+
+    Returns:
+        {"accuracy", "outcome_accuracy", "loss", "states", "hard_rounds", "seconds"} (après
+        fine-tuning éventuel: "finetune_accuracy", "finetune_outcome_accuracy",
+        "finetune_min_accuracy" (pire accord après une tranche de self-play), "finetune_seconds")
+    """
+    t0 = time.perf_counter()
+    states, targets, legal, scores = oracle_dataset(agent.config.gamma)
+    optimal_np = legal & (scores == scores.max(axis=1, keepdims=True))
+    x = torch.from_numpy(states).to(agent.device)
+    y = torch.from_numpy(targets).to(agent.device)
+    mask = torch.from_numpy(legal.astype(np.float32)).to(agent.device)
+    illegal = mask < 0.5
+    optimal = torch.from_numpy(optimal_np).to(agent.device)
+    optimal_dist = optimal.float() / optimal.float().sum(dim=1, keepdim=True)
+
+    optimizer = _make_adam(agent.q.parameters(), lr)
+
+    def step(b: torch.Tensor) -> torch.Tensor:
+        q = agent.q(x[b])
+        loss = (((q - y[b]) ** 2) * mask[b]).sum() / mask[b].sum()
+        if ranking_weight > 0:
+            logits = (q / DEFAULT_DISTILL_RANKING_TEMPERATURE).masked_fill(illegal[b], -1e9)
+            loss = loss + ranking_weight * -(optimal_dist[b] * F.log_softmax(logits, dim=1)).sum(dim=1).mean()
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        return loss
+
+    agent.q.train()
+    loss = torch.zeros(())
+    for _ in range(epochs):
+        perm = torch.randperm(len(x), device=agent.device)
+        for i in range(0, len(x), batch_size):
+            loss = step(perm[i:i + batch_size])
+
+    def repair() -> int:
+        nonlocal loss
+        agent.q.train()
+        rounds = 0
+        for _ in range(hard_rounds):
+            errors = _greedy_errors(agent.q, x, illegal, optimal)
+            if len(errors) == 0:
+                break
+            rounds += 1
+            for _ in range(DEFAULT_DISTILL_HARD_STEPS):
+                loss = step(torch.cat([errors, torch.randint(0, len(x), (batch_size,), device=agent.device)]))
+        agent.q.eval()
+        return rounds
+
+    rounds = repair()
+
+    agent.q_target.load_state_dict(agent.q.state_dict())
+    agent._after_load()  # poids remplacés: version incrémentée, cache d'inférence vidé
+    stats: Dict[str, float] = dict(oracle_accuracy(agent.q, states, legal, scores))
+    stats.update(loss=float(loss.item()), states=float(len(states)), hard_rounds=float(rounds),
+                 seconds=time.perf_counter() - t0)
+
+    if finetune_episodes > 0:
+        t1 = time.perf_counter()
+        agent.step_count = max(agent.step_count, agent.config.epsilon_decay_steps)  # exploration minimale
+        for group in agent.optimizer.param_groups:
+            group["lr"] = DEFAULT_DISTILL_FINETUNE_LR
+        drift = 1.0
+        for start in range(0, finetune_episodes, DEFAULT_DISTILL_FINETUNE_CHUNK):
+            self_play_train(agent, episodes=min(DEFAULT_DISTILL_FINETUNE_CHUNK, finetune_episodes - start))
+            drift = min(drift, oracle_accuracy(agent.q, states, legal, scores)["accuracy"])
+            repair()
+        for group in agent.optimizer.param_groups:
+            group["lr"] = agent.config.lr
+        agent.q_target.load_state_dict(agent.q.state_dict())
+        agent._after_load()
+        fine = oracle_accuracy(agent.q, states, legal, scores)
+        stats.update(finetune_accuracy=fine["accuracy"], finetune_outcome_accuracy=fine["outcome_accuracy"],
+                     finetune_min_accuracy=drift, finetune_seconds=time.perf_counter() - t1)
+    else:
+        agent.frozen = True  # échelle Minimax: pas d'apprentissage TD en ligne par-dessus
+    return stats
+
+
+def compare_bootstrap(episodes: int = DEFAULT_BOOTSTRAP_EPISODES, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Distillation vs bootstrap self-play historique (durée, accord avec l'oracle, parties vs Minimax)."""
+    from evaluation import evaluate_vs_minimax
+
+    states, _, legal, scores = oracle_dataset(DQNConfig().gamma)
+    rows: Dict[str, Dict[str, float]] = {}
+
+    torch.manual_seed(seed)
+    agent = DQNAgent(device="cpu")
+    rows["distillation"] = distill(agent)
+    rows["distillation"].update(evaluate_vs_minimax(agent, games=20))
+
+    torch.manual_seed(seed)
+    agent = DQNAgent(device="cpu")
+    t0 = time.perf_counter()
+    self_play_train(agent, episodes=episodes, verbose_every=0)
+    agent.q.eval()
+    rows["self_play"] = dict(oracle_accuracy(agent.q, states, legal, scores), seconds=time.perf_counter() - t0)
+    rows["self_play"].update(evaluate_vs_minimax(agent, games=20))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pré-entraînement du QNetwork par distillation de l'oracle Minimax")
+    parser.add_argument("--out", default=None, help="checkpoint à écrire (ex: models/dqn_tictactoe.pt)")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_DISTILL_EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_DISTILL_BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=DEFAULT_DISTILL_LR)
+    parser.add_argument("--finetune-episodes", type=int, default=DEFAULT_DISTILL_FINETUNE_EPISODES)
+    parser.add_argument("--ranking-weight", type=float, default=DEFAULT_DISTILL_RANKING_WEIGHT)
+    parser.add_argument("--hard-rounds", type=int, default=DEFAULT_DISTILL_HARD_ROUNDS)
+    parser.add_argument("--compare-bootstrap", action="store_true",
+                        help=f"compare au bootstrap self-play ({DEFAULT_BOOTSTRAP_EPISODES} épisodes)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.compare_bootstrap:
+        for nom, r in compare_bootstrap(seed=args.seed).items():
+            print(f"{nom:<13} {r['seconds']:6.1f} s | coups optimaux {r['accuracy']:.1%} | "
+                  f"issue conservée {r['outcome_accuracy']:.1%} | vs Minimax: non-défaites {r['non_loss']:.0%}")
+        return
+
+    torch.manual_seed(args.seed)
+    agent = DQNAgent(device="cpu")
+    r = distill(agent, args.epochs, args.batch_size, args.lr, args.finetune_episodes, args.ranking_weight,
+                args.hard_rounds)
+    print(f"{int(r['states'])} états, {args.epochs} époques + {int(r['hard_rounds'])} tours ciblés "
+          f"en {r['seconds']:.1f} s (loss {r['loss']:.4f})")
+    print(f"coups optimaux: {r['accuracy']:.1%} | issue conservée: {r['outcome_accuracy']:.1%}")
+    if args.finetune_episodes > 0:
+        print(f"après {args.finetune_episodes} épisodes de self-play ({r['finetune_seconds']:.1f} s): "
+              f"coups optimaux {r['finetune_accuracy']:.1%} (minimum {r['finetune_min_accuracy']:.1%} entre deux "
+              f"tranches) | issue conservée {r['finetune_outcome_accuracy']:.1%}")
+    if args.out:
+        agent.save(args.out)
+        print(f"Modèle sauvegardé: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""distributed_train.py
+
+Entraînement DQN data-parallel avec `torch.distributed` (backend gloo, CPU).
+
+Chaque rang (processus):
+- a ses propres acteurs (parties de self-play) et son propre replay (fragment local)
+- part des mêmes poids (diffusés depuis le rang 0)
+- moyenne ses gradients avec les autres rangs (all-reduce) avant chaque pas d'Adam:
+  les poids restent identiques sur tous les rangs
+
+L'entraînement avance par tours synchrones: chaque rang joue `episodes_per_round`
+parties (sans apprendre), puis tous les rangs effectuent `updates_per_round` pas de
+gradient dès que chaque replay contient `min_replay_size` transitions.
+Le rang 0 écrit les checkpoints (les autres attendent à une barrière).
+
+`--scaling 1,2,4` relance l'entraînement pour chaque nombre de rangs (même travail par rang)
+et affiche l'efficacité de passage à l'échelle faible: débit(N) / (N * débit(1)).
+
+Plusieurs machines: lancer la même commande sur chaque nœud, avec `--nnodes`, son
+`--node-rank` (0 pour le nœud qui héberge le rendez-vous), `--master-addr` (adresse du nœud 0,
+joignable par les autres) et un `--master-port` fixe. Chaque nœud démarre `--nproc-per-node`
+processus; rang global = node_rank * nproc_per_node + rang local.
+
+Exemple (plusieurs processus sur la machine locale):
+    python distributed_train.py --world-size 4 --rounds 200 --out models/dqn_dist.pt
+    python distributed_train.py --scaling 1,2,4 --rounds 50
+
+Exemple (2 machines x 4 processus):
+    python distributed_train.py --nnodes 2 --node-rank 0 --nproc-per-node 4 --master-addr 10.0.0.1 --master-port 29500
+    python distributed_train.py --nnodes 2 --node-rank 1 --nproc-per-node 4 --master-addr 10.0.0.1 --master-port 29500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import time
+from dataclasses import asdict, replace
+from typing import Dict, List, Optional
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from dqn_agent import DQNAgent, DQNConfig, self_play_train
+from reproducibility import seed_worker
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_WORLD_SIZE = 2
+DEFAULT_ROUNDS = 100
+DEFAULT_EPISODES_PER_ROUND = 8
+DEFAULT_UPDATES_PER_ROUND = 32
+DEFAULT_CHECKPOINT_EVERY = 50  # tours
+DEFAULT_MASTER_ADDR = "127.0.0.1"
+
+
+class AllReduceOptimizer:
+    """Enveloppe un optimizer: moyenne les gradients entre rangs avant chaque `step`.
+
+    Remplace `agent.optimizer`, donc `train_step` / `train_fused` fonctionnent sans modification.
+    """
+
+    def __init__(self, optimizer: torch.optim.Optimizer, world_size: int):
+        self.optimizer = optimizer
+        self.world_size = world_size
+        self.comm_seconds = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.optimizer, name)
+
+    def step(self, closure=None):
+        t0 = time.perf_counter()
+        grads = [p.grad for group in self.optimizer.param_groups for p in group["params"] if p.grad is not None]
+        if grads:
+            # un seul all-reduce pour tous les gradients (tampon aplati)
+            flat = torch.cat([g.reshape(-1) for g in grads])
+            dist.all_reduce(flat, op=dist.ReduceOp.SUM)
+            flat /= self.world_size
+            offset = 0
+            for g in grads:
+                n = g.numel()
+                g.copy_(flat[offset:offset + n].view_as(g))
+                offset += n
+        self.comm_seconds += time.perf_counter() - t0
+        return self.optimizer.step(closure)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _broadcast_weights(agent: DQNAgent) -> None:
+    for t in list(agent.q.state_dict().values()):
+        dist.broadcast(t, src=0)
+    agent.q_target.load_state_dict(agent.q.state_dict())
+
+
+def _all_min(value: int) -> int:
+    t = torch.tensor([value], dtype=torch.int64)
+    dist.all_reduce(t, op=dist.ReduceOp.MIN)
+    return int(t.item())
+
+
+def _worker(
+    local_rank: int,
+    nproc_per_node: int,
+    node_rank: int,
+    nnodes: int,
+    master_addr: str,
+    master_port: int,
+    config: Dict[str, object],
+    rounds: int,
+    episodes_per_round: int,
+    updates_per_round: int,
+    checkpoint_every: int,
+    out_path: Optional[str],
+    seed: int,
+    results,
+) -> None:
+    torch.set_num_threads(1)  # un cœur par rang
+    rank = node_rank * nproc_per_node + local_rank
+    world_size = nnodes * nproc_per_node
+    dist.init_process_group("gloo", init_method=f"tcp://{master_addr}:{master_port}", rank=rank,
+                            world_size=world_size)
+    try:
+        seed_worker(seed, rank)  # acteurs différents sur chaque rang
+
+        # Les acteurs n'apprennent pas pendant leurs parties: les pas de gradient sont
+        # synchronisés entre rangs à la fin de chaque tour.
+        cfg = replace(DQNConfig(**config), train_steps_per_move=0, fused_update_interval=0)
+        agent = DQNAgent(cfg, device="cpu")
+        _broadcast_weights(agent)
+        optimizer = AllReduceOptimizer(agent.optimizer, world_size)
+        agent.optimizer = optimizer
+
+        transitions = 0
+        updates = 0
+        t_start = time.perf_counter()
+        for r in range(1, rounds + 1):
+            before = agent.step_count
+            self_play_train(agent, episodes=episodes_per_round, verbose_every=0)
+            transitions += agent.step_count - before
+
+            if _all_min(len(agent.replay)) >= cfg.min_replay_size:
+                for _ in range(updates_per_round):
+                    agent.train_step()
+                updates += updates_per_round
+
+            # barrière sur tous les rangs même sans `out_path` local (seul le nœud 0 écrit)
+            if r % checkpoint_every == 0 or r == rounds:
+                if rank == 0 and out_path:
+                    agent.save(out_path)
+                dist.barrier()
+        elapsed = time.perf_counter() - t_start
+
+        stats = {
+            "rank": rank,
+            "seconds": elapsed,
+            "transitions": transitions,
+            "updates": updates,
+            "comm_seconds": optimizer.comm_seconds,
+        }
+        # mesures de tous les rangs (tous nœuds) remontées par le rang local 0 de chaque nœud
+        per_rank: List[Optional[Dict[str, float]]] = [None] * world_size
+        dist.all_gather_object(per_rank, stats)
+        if local_rank == 0:
+            results.put(per_rank)
+    finally:
+        dist.destroy_process_group()
+
+
+def run_distributed(
+    world_size: int = DEFAULT_WORLD_SIZE,
+    config: Optional[DQNConfig] = None,
+    rounds: int = DEFAULT_ROUNDS,
+    episodes_per_round: int = DEFAULT_EPISODES_PER_ROUND,
+    updates_per_round: int = DEFAULT_UPDATES_PER_ROUND,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    out_path: Optional[str] = None,
+    seed: int = 0,
+    nnodes: int = 1,
+    node_rank: int = 0,
+    master_addr: str = DEFAULT_MASTER_ADDR,
+    master_port: int = 0,
+) -> Dict[str, float]:
+    """Lance `world_size` processus sur ce nœud (sur `nnodes` nœuds: `world_size` par nœud).
+
+    Args:
+        nnodes, node_rank: nombre de nœuds et rang de celui-ci (0 = nœud du rendez-vous)
+        master_addr, master_port: rendez-vous TCP sur le nœud 0; port 0 = port libre choisi
+            localement (un seul nœud uniquement)
+
+    Returns:
+        {'world_size', 'seconds', 'transitions_per_s', 'samples_per_s', 'comm_fraction'}
+        (tous rangs de tous les nœuds). `samples_per_s`: transitions consommées par les pas
+        de gradient
+
+    Raises:
+        ValueError si plusieurs nœuds sont demandés sans port de rendez-vous fixe
+    """
+    if not 0 <= node_rank < nnodes:
+        raise ValueError(f"node_rank={node_rank} hors de [0, {nnodes})")
+    if master_port == 0:
+        if nnodes > 1:
+            raise ValueError("Plusieurs nœuds: --master-port doit être fixé (identique sur tous les nœuds)")
+        master_port = _free_port()
+    config = config or DQNConfig()
+    ctx = mp.get_context("spawn")
+    results = ctx.SimpleQueue()
+    mp.start_processes(
+        _worker,
+        args=(
+            world_size, node_rank, nnodes, master_addr, master_port, asdict(config), rounds,
+            episodes_per_round, updates_per_round, checkpoint_every, out_path, seed, results,
+        ),
+        nprocs=world_size,
+        join=True,
+        start_method="spawn",
+    )
+    per_rank: List[Dict[str, float]] = results.get()
+    seconds = max(r["seconds"] for r in per_rank)
+    return {
+        "world_size": len(per_rank),
+        "seconds": seconds,
+        "transitions_per_s": sum(r["transitions"] for r in per_rank) / seconds,
+        "samples_per_s": sum(r["updates"] for r in per_rank) * config.batch_size / seconds,
+        "comm_fraction": sum(r["comm_seconds"] for r in per_rank) / sum(r["seconds"] for r in per_rank),
+    }
+
+
+def scaling_report(world_sizes: List[int], **kwargs) -> List[Dict[str, float]]:
+    """Même travail par rang pour chaque taille: efficacité = débit(N) / (N * débit(1))."""
+    rows = [run_distributed(world_size=n, **kwargs) for n in world_sizes]
+    base = next((r for r in rows if r["world_size"] == 1), rows[0])
+    base_per_rank = base["samples_per_s"] / base["world_size"]
+    for row in rows:
+        row["efficiency"] = row["samples_per_s"] / (row["world_size"] * base_per_rank) if base_per_rank else 0.0
+    return rows
+
+
+def _print_row(row: Dict[str, float]) -> None:
+    eff = f" efficacité={row['efficiency'] * 100:.0f}%" if "efficiency" in row else ""
+    print(
+        f"[{row['world_size']} rang(s)] {row['seconds']:.1f}s "
+        f"transitions/s={row['transitions_per_s']:.0f} échantillons/s={row['samples_per_s']:.0f} "
+        f"communication={row['comm_fraction'] * 100:.1f}%{eff}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Entraînement DQN data-parallel (torch.distributed, gloo)")
+    parser.add_argument("--world-size", type=int, default=DEFAULT_WORLD_SIZE,
+                        help="nombre de rangs (processus) sur une seule machine")
+    parser.add_argument("--nproc-per-node", type=int, default=None,
+                        help="processus par nœud en multi-nœuds (défaut: --world-size)")
+    parser.add_argument("--nnodes", type=int, default=1, help="nombre de machines")
+    parser.add_argument("--node-rank", type=int, default=0, help="rang de cette machine (0 = rendez-vous)")
+    parser.add_argument("--master-addr", default=DEFAULT_MASTER_ADDR, help="adresse du nœud 0")
+    parser.add_argument("--master-port", type=int, default=0,
+                        help="port du rendez-vous sur le nœud 0 (0 = port libre, une seule machine)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="tours synchrones")
+    parser.add_argument("--episodes-per-round", type=int, default=DEFAULT_EPISODES_PER_ROUND)
+    parser.add_argument("--updates-per-round", type=int, default=DEFAULT_UPDATES_PER_ROUND)
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY, help="tours entre checkpoints")
+    parser.add_argument("--scaling", default="", help="tailles à comparer, ex: 1,2,4 (rapport d'efficacité)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="checkpoint écrit par le rang 0")
+    args = parser.parse_args()
+
+    kwargs = dict(
+        rounds=args.rounds,
+        episodes_per_round=args.episodes_per_round,
+        updates_per_round=args.updates_per_round,
+        checkpoint_every=args.checkpoint_every,
+        seed=args.seed,
+    )
+    if args.scaling:
+        sizes = [int(s) for s in args.scaling.split(",") if s.strip()]
+        for row in scaling_report(sizes, **kwargs):
+            _print_row(row)
+    else:
+        try:
+            row = run_distributed(
+                world_size=args.nproc_per_node or args.world_size, out_path=args.out, nnodes=args.nnodes,
+                node_rank=args.node_rank, master_addr=args.master_addr, master_port=args.master_port, **kwargs,
+            )
+        except ValueError as e:
+            raise SystemExit(str(e))
+        _print_row(row)
+        if args.out and args.node_rank == 0:
+            print(f"Checkpoint: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,15 +18,36 @@ from __future__ import annotations
 
 import os
 import random
+import threading
+import warnings
 from collections import deque
-from dataclasses import dataclass
-from typing import Deque, List, Optional, Tuple
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from typing import ContextManager, Deque, Dict, List, Optional, Tuple
 
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
-from tictactoe_env import Transition, check_winner, is_draw, to_perspective, valid_actions
+from memory_budget import MemoryBudget, MemoryBudgetExceeded, Q_CACHE_ENTRY_BYTES, Q_CACHE_MAX_ENTRIES, module_bytes
+from mmap_checkpoint import (
+    flatten_optimizer_state,
+    is_mmap_checkpoint,
+    read_checkpoint,
+    unflatten_optimizer_state,
+    write_checkpoint,
+)
+from reproducibility import get_rng_state, set_rng_state
+from telemetry import TrainingTelemetry
+from tictactoe_env import Transition, check_winner, is_draw, reachable_states, to_perspective, valid_actions
+
+try:
+    import numpy as np
+    import state_index
+except ImportError:
+    # NumPy absent: seul le replay "transitions" (deque de Transition) est disponible.
+    np = None  # type: ignore[assignment]
+    state_index = None  # type: ignore[assignment]
 
 
 # =====================
@@ -38,6 +59,8 @@ from tictactoe_env import Transition, check_winner, is_draw, to_perspective, val
 DEFAULT_GAMMA = 0.99
 DEFAULT_LR = 1e-3
 DEFAULT_BATCH_SIZE = 64
+# Nombre de transitions jouées conservées (fenêtre glissante), quel que soit le mode de replay;
+# en mode "dedup", c'est aussi la borne du nombre de transitions distinctes stockées
 DEFAULT_REPLAY_CAPACITY = 50_000
 DEFAULT_MIN_REPLAY_SIZE = 1_000
 
@@ -52,6 +75,43 @@ DEFAULT_TRAIN_STEPS_PER_MOVE = 1
 # Target Network: fréquence de mise à jour (hard update)
 DEFAULT_TARGET_UPDATE_INTERVAL = 500
 
+# Retours n-step (1 = DQN classique). Avec n > 1, les transitions d'un joueur sont
+# chaînées sur ses n coups suivants: la récompense terminale remonte n fois plus vite.
+DEFAULT_N_STEP = 1
+
+# Mises à jour groupées (0 = désactivé): toutes les N coups, un gros bloc de transitions
+# est échantillonné une fois et plusieurs pas de gradient sont effectués dessus.
+DEFAULT_FUSED_UPDATE_INTERVAL = 0
+DEFAULT_FUSED_CHUNK_BATCHES = 8
+
+# Stockage du replay: "transitions" (deque d'objets Transition),
+# "indexed" (index de plateau uint16 dans des tableaux NumPy, voir state_index.py) ou
+# "dedup" (chaque transition distincte stockée une fois avec son nombre d'occurrences)
+DEFAULT_REPLAY_MODE = "transitions"
+# Mode "dedup": échantillonnage proportionnel à occurrences**puissance (1.0 = même distribution
+# qu'un replay classique de même capacité, les occurrences sortent de la fenêtre dans l'ordre)
+DEFAULT_DEDUP_COUNT_POWER = 1.0
+
+# Cache d'inférence: Q(s) mémorisé par état, invalidé dès que les poids changent. Consulté
+# seulement en inférence (réseau en mode eval, ou agent `frozen`): pendant `self_play_train`,
+# chaque pas d'optimisation le périme et il ne coûterait que des recherches et insertions
+DEFAULT_Q_CACHE = True
+# Précalcul du cache pour tous les états atteignables, quand les poids cessent de changer:
+# au chargement et à la fin de `self_play_train` (pas pendant l'entraînement: le cache serait
+# périmé dès le pas d'optimisation suivant)
+DEFAULT_Q_CACHE_PRECOMPUTE = False
+
+# Budget mémoire du processus en Mo (0 = illimité): la capacité du replay et le cache
+# d'inférence sont réduits pour tenir dans le budget, voir memory_budget.py
+DEFAULT_MEMORY_BUDGET_MB = 0
+
+# Pas d'apprentissage compilé (voir compiled_step.py): "eager", "fused", "compile" ou "script"
+DEFAULT_COMPILE_MODE = "eager"
+
+# Batchs préparés à l'avance par un thread de fond (voir batch_prefetch.py). 0 = désactivé:
+# mesuré 6 à 10 % plus lent sur un cœur, sans gain sur le pas isolé
+DEFAULT_PREFETCH_BATCHES = 0
+
 # Entraînement self-play: nombre d'épisodes par défaut
 DEFAULT_SELF_PLAY_EPISODES = 3000
 
@@ -74,6 +134,35 @@ class QNetwork(nn.Module):
         return self.net(x)
 
 
+def _make_adam(params, lr: float) -> optim.Optimizer:
+    """Adam "fused" (un seul noyau pour tous les paramètres) si la version de PyTorch le permet.
+
+    Sur un petit MLP, la boucle Python par paramètre d'Adam coûte plus cher que le forward/backward.
+    """
+    params = list(params)
+    try:
+        return optim.Adam(params, lr=lr, fused=True)
+    except (TypeError, RuntimeError):
+        return optim.Adam(params, lr=lr)
+
+
+def _rebind_optimizer(optimizer, params) -> None:
+    """Fait pointer un optimizer existant sur de nouveaux tenseurs de paramètres (même ordre).
+
+    Garde l'objet (et une éventuelle enveloppe, ex. `distributed_train.AllReduceOptimizer`);
+    l'état (moments d'Adam), indexé par les anciens tenseurs, est vidé.
+    """
+    params = list(params)
+    start = 0
+    for group in optimizer.param_groups:
+        n = len(group["params"])
+        group["params"] = params[start:start + n]
+        start += n
+    if start != len(params):
+        raise ValueError(f"Nombre de paramètres différent: {len(params)} au lieu de {start}")
+    optimizer.state.clear()
+
+
 class ReplayBuffer:
     def __init__(self, capacity: int = 50_000):
         self.buffer: Deque[Transition] = deque(maxlen=capacity)
@@ -88,6 +177,185 @@ class ReplayBuffer:
         return random.sample(self.buffer, batch_size)
 
 
+class IndexedReplayBuffer:
+    """Replay compact: s et s' stockés comme index de plateau (uint16, voir state_index.py).
+
+    Une transition occupe ~10 octets (contre plusieurs centaines pour un objet `Transition`),
+    et l'échantillonnage produit directement des tableaux NumPy (pas de boucle Python par transition).
+    Le masque des coups valides de s' est retrouvé par la table `LEGAL_MASK`.
+
+    En self-play, la récompense du dernier coup adverse est modifiée *après* l'ajout
+    (défaite / nul): les dernières transitions ajoutées restent donc liées à leur objet
+    et sont resynchronisées avant chaque échantillonnage.
+    """
+
+    _TRACKED = 2
+
+    def __init__(self, capacity: int = 50_000):
+        if state_index is None:
+            raise ImportError("Le replay 'indexed' nécessite NumPy")
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.uint16)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.uint16)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.n_steps = np.ones(capacity, dtype=np.uint8)
+        self.size = 0
+        self.pos = 0
+        self._recent: Deque[Tuple[int, Transition]] = deque(maxlen=self._TRACKED)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _sync_recent(self) -> None:
+        for slot, t in self._recent:
+            self.rewards[slot] = t.reward
+            self.dones[slot] = t.done
+
+    def push(self, transition: Transition) -> None:
+        self._sync_recent()
+        i = self.pos
+        self.states[i] = state_index.board_to_index(transition.state)
+        self.actions[i] = transition.action
+        self.rewards[i] = transition.reward
+        self.next_states[i] = state_index.board_to_index(transition.next_state)
+        self.dones[i] = transition.done
+        self.n_steps[i] = transition.n_steps
+        self._recent.append((i, transition))
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample_arrays(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        """(states[B,9], actions[B], rewards[B], next_states[B,9], dones[B], next_masks[B,9], n_steps[B])"""
+        self._sync_recent()
+        idx = np.random.randint(0, self.size, size=batch_size)
+        s = self.states[idx]
+        ns = self.next_states[idx]
+        return (
+            state_index.CELLS[s].astype(np.float32),
+            self.actions[idx].astype(np.int64),
+            self.rewards[idx],
+            state_index.CELLS[ns].astype(np.float32),
+            self.dones[idx].astype(np.float32),
+            state_index.LEGAL_MASK[ns].astype(np.float32),
+            self.n_steps[idx],
+        )
+
+    def sample(self, batch_size: int) -> List[Transition]:
+        """Compatibilité avec `ReplayBuffer.sample` (reconstruit des objets Transition)."""
+        states, actions, rewards, next_states, dones, masks, n_steps = self.sample_arrays(batch_size)
+        return [
+            Transition(
+                state=states[k].tolist(),
+                action=int(actions[k]),
+                reward=float(rewards[k]),
+                next_state=next_states[k].tolist(),
+                done=bool(dones[k]),
+                next_valid_mask=masks[k].tolist(),
+                n_steps=int(n_steps[k]),
+            )
+            for k in range(batch_size)
+        ]
+
+
+class DedupReplayBuffer(IndexedReplayBuffer):
+    """Replay dédupliqué: chaque transition distincte (s, a, r, s', done, n) est stockée une fois.
+
+    - `capacity`: nombre d'occurrences conservées, comme un replay classique: une fenêtre
+      glissante (`_window`, case de chaque occurrence) retire la plus ancienne occurrence au-delà
+    - `counts`: occurrences de chaque transition distincte dans cette fenêtre; une transition
+      dont le compte retombe à 0 est évincée (sa case est réutilisée)
+    - l'échantillonnage est proportionnel à counts**count_power (1.0 = même distribution qu'un
+      `ReplayBuffer(capacity)`, < 1 favorise les transitions rares)
+    - `len()`: nombre d'occurrences dans la fenêtre (comparable à un replay classique pour `min_replay_size`)
+
+    Les `_TRACKED` dernières transitions ajoutées peuvent encore être modifiées (récompense
+    de défaite / nul en self-play): elles ne sont insérées qu'une fois sorties de cette fenêtre.
+    """
+
+    def __init__(self, capacity: int = 50_000, count_power: float = 1.0):
+        super().__init__(capacity)
+        self.count_power = count_power
+        self.counts = np.zeros(capacity, dtype=np.float64)
+        self.total = 0  # occurrences dans la fenêtre
+        self._window: Deque[int] = deque()  # case de chaque occurrence, de la plus ancienne à la plus récente
+        self._free: List[int] = []  # cases libérées (compte retombé à 0)
+        self._slots: Dict[int, int] = {}  # clé entière de la transition -> case des tableaux
+        self._keys = np.zeros(capacity, dtype=object)
+        self._weights: Optional[np.ndarray] = None  # poids cumulés, recalculés après modification
+
+    def __len__(self) -> int:
+        return self.total + len(self._recent)
+
+    @property
+    def unique(self) -> int:
+        return len(self._slots)
+
+    def _insert(self, t: Transition) -> None:
+        s = state_index.board_to_index(t.state)
+        ns = state_index.board_to_index(t.next_state)
+        reward_bits = int(np.float32(t.reward).view(np.uint32))
+        key = (((((s * 9 + int(t.action)) * state_index.N_STATES + ns) * 2 + int(bool(t.done))) * 16
+                + int(t.n_steps)) << 32) | reward_bits
+        if self.total >= self.capacity:
+            self._expire_oldest()
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = self.size  # au plus `capacity` transitions distinctes dans la fenêtre
+                self.size += 1
+            self._slots[key] = slot
+            self._keys[slot] = key
+            self.states[slot], self.actions[slot], self.rewards[slot] = s, t.action, t.reward
+            self.next_states[slot], self.dones[slot], self.n_steps[slot] = ns, t.done, t.n_steps
+        self.counts[slot] += 1
+        self._window.append(slot)
+        self.total += 1
+        self._weights = None
+
+    def _expire_oldest(self) -> None:
+        """Retire l'occurrence la plus ancienne; évince sa transition si c'était la dernière."""
+        slot = self._window.popleft()
+        self.counts[slot] -= 1
+        self.total -= 1
+        if self.counts[slot] == 0:
+            # poids nul: la case n'est plus tirée jusqu'à sa réutilisation
+            del self._slots[self._keys[slot]]
+            self._free.append(slot)
+
+    def push(self, transition: Transition) -> None:
+        if len(self._recent) == self._recent.maxlen:
+            self._insert(self._recent[0][1])
+        self._recent.append((-1, transition))
+
+    def _sync_recent(self) -> None:
+        # les transitions récentes ne sont pas encore dans les tableaux (voir `push`)
+        pass
+
+    def sample_arrays(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        if self._weights is None:
+            w = self.counts[: self.size]
+            if self.count_power != 1.0:
+                w = np.power(w, self.count_power)
+            self._weights = np.cumsum(w)
+        idx = np.searchsorted(self._weights, np.random.random(batch_size) * self._weights[-1], side="right")
+        idx = np.minimum(idx, self.size - 1)
+        s = self.states[idx]
+        ns = self.next_states[idx]
+        return (
+            state_index.CELLS[s].astype(np.float32),
+            self.actions[idx].astype(np.int64),
+            self.rewards[idx],
+            state_index.CELLS[ns].astype(np.float32),
+            self.dones[idx].astype(np.float32),
+            state_index.LEGAL_MASK[ns].astype(np.float32),
+            self.n_steps[idx],
+        )
+
+
 @dataclass
 class DQNConfig:
     gamma: float = DEFAULT_GAMMA
@@ -105,6 +373,22 @@ class DQNConfig:
 
     train_steps_per_move: int = DEFAULT_TRAIN_STEPS_PER_MOVE
 
+    n_step: int = DEFAULT_N_STEP
+    fused_update_interval: int = DEFAULT_FUSED_UPDATE_INTERVAL
+    fused_chunk_batches: int = DEFAULT_FUSED_CHUNK_BATCHES
+
+    replay_mode: str = DEFAULT_REPLAY_MODE
+    dedup_count_power: float = DEFAULT_DEDUP_COUNT_POWER
+
+    q_cache: bool = DEFAULT_Q_CACHE
+    q_cache_precompute: bool = DEFAULT_Q_CACHE_PRECOMPUTE
+
+    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB
+
+    compile_mode: str = DEFAULT_COMPILE_MODE
+
+    prefetch_batches: int = DEFAULT_PREFETCH_BATCHES
+
 
 class DQNAgent:
     def __init__(
@@ -115,18 +399,82 @@ class DQNAgent:
         self.config = config or DQNConfig()
         self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
 
-        self.q = QNetwork().to(self.device)
+        # Mode train seulement pendant `self_play_train` (le réseau n'a ni dropout ni batchnorm:
+        # le mode ne sert qu'à désactiver le cache d'inférence, voir `_q_cache_active`)
+        self.q = QNetwork().to(self.device).eval()
         self.q_target = QNetwork().to(self.device)
         self.q_target.load_state_dict(self.q.state_dict())
         self.q_target.eval()
-        self.optimizer = optim.Adam(self.q.parameters(), lr=self.config.lr)
+        self.optimizer = _make_adam(self.q.parameters(), self.config.lr)
         self.loss_fn = nn.SmoothL1Loss()  # Huber loss
 
-        self.replay = ReplayBuffer(self.config.replay_capacity)
+        self.memory_budget: Optional[MemoryBudget] = None
+        if self.config.memory_budget_mb > 0:
+            self.memory_budget = MemoryBudget.from_mb(self.config.memory_budget_mb)
+            self.config = self._fit_to_budget(self.config, self.memory_budget)
+
+        if self.config.replay_mode == "indexed":
+            self.replay = IndexedReplayBuffer(self.config.replay_capacity)
+        elif self.config.replay_mode == "dedup":
+            # capacité = fenêtre glissante d'occurrences (comme un replay classique); les transitions
+            # distinctes de la fenêtre, jamais plus nombreuses, sont stockées une fois chacune
+            self.replay = DedupReplayBuffer(self.config.replay_capacity, self.config.dedup_count_power)
+        else:
+            self.replay = ReplayBuffer(self.config.replay_capacity)
 
         self.step_count = 0
         self.epsilon = self.config.epsilon_start
         self.train_updates = 0
+        # Poids à ne pas modifier (réseau distillé de l'oracle, voir distillation.py). Sauvegardé
+        # dans le checkpoint: `train_step` / `train_fused` ne font rien et `self_play_train`
+        # ne joue pas; remettre à False pour reprendre l'entraînement.
+        self.frozen = False
+
+        # Cache d'inférence: état -> (version des poids, Q-values).
+        # `weights_version` est incrémentée à chaque pas d'optimisation et à chaque `load`.
+        self.weights_version = 0
+        self._q_cache: Dict[Tuple[float, ...], Tuple[int, List[float]]] = {}
+
+        # Instrumentation optionnelle (voir telemetry.py). None => aucun surcoût.
+        self.telemetry: Optional[TrainingTelemetry] = None
+
+        # Pas TD compilé (construit au premier `train_step`, voir compiled_step.py)
+        self.effective_compile_mode = self.config.compile_mode
+        self._td_step = None
+
+        # Préchargement des batchs (thread de fond, voir batch_prefetch.py). Le verrou protège
+        # le replay entre `remember` (apprenant) et l'échantillonnage (thread).
+        self.replay_lock = threading.Lock()
+        self.prefetcher = None
+
+    def _fit_to_budget(self, config: DQNConfig, budget: MemoryBudget) -> DQNConfig:
+        """Copie de `config` dont le replay et le cache tiennent dans le budget.
+
+        Raises:
+            MemoryBudgetExceeded si le replay ne peut même pas atteindre `min_replay_size`
+        """
+        # état d'Adam (2 tenseurs par paramètre), alloué au premier pas d'optimisation
+        reserved = 2 * module_bytes(self.q)
+        q_cache = config.q_cache and budget.fits_q_cache(reserved)
+        if q_cache:
+            reserved += Q_CACHE_MAX_ENTRIES * Q_CACHE_ENTRY_BYTES
+        capacity = budget.fit_replay_capacity(config.replay_mode, config.replay_capacity, reserved)
+        if capacity < max(config.min_replay_size, config.batch_size):
+            raise MemoryBudgetExceeded(
+                f"Budget mémoire de {config.memory_budget_mb} Mo insuffisant: replay limité à {capacity} "
+                f"transitions (< min_replay_size={config.min_replay_size})"
+            )
+        return replace(
+            config,
+            replay_capacity=capacity,
+            q_cache=q_cache,
+            q_cache_precompute=config.q_cache_precompute and q_cache,
+        )
+
+    def _phase(self, name: str) -> ContextManager[None]:
+        if self.telemetry is None:
+            return nullcontext()
+        return self.telemetry.phase(name)
 
     def set_epsilon_for_difficulty(self, difficulte: str) -> None:
         """Ajuste l'exploration en mode jeu.
@@ -160,8 +508,7 @@ class DQNAgent:
         if (not training) and random.random() < eps:
             return random.choice(valid)
 
-        x = torch.tensor([state], dtype=torch.float32, device=self.device)
-        q_values = self.q(x)[0].detach().cpu().tolist()
+        q_values = self.q_values(state)
 
         best_a = valid[0]
         best_q = q_values[best_a]
@@ -171,8 +518,63 @@ class DQNAgent:
                 best_a = a
         return best_a
 
+    @torch.no_grad()
+    def q_values(self, state: List[float]) -> List[float]:
+        """Q(s, ·) du réseau online, servi par le cache si les poids n'ont pas changé."""
+        if not self._q_cache_active():
+            return self.q(torch.tensor([state], dtype=torch.float32, device=self.device))[0].cpu().tolist()
+        key = tuple(state)
+        hit = self._q_cache.get(key)
+        if hit is not None and hit[0] == self.weights_version:
+            return hit[1]
+        x = torch.tensor([state], dtype=torch.float32, device=self.device)
+        q_values = self.q(x)[0].detach().cpu().tolist()
+        self._q_cache[key] = (self.weights_version, q_values)
+        return q_values
+
+    @torch.no_grad()
+    def q_values_batch(self, states: List[Tuple[float, ...]]) -> List[List[float]]:
+        """Comme `q_values` pour plusieurs états: un seul forward pass pour les absents du cache."""
+        use_cache = self._q_cache_active()
+        out: List[Optional[List[float]]] = [None] * len(states)
+        missing: List[int] = []
+        for i, st in enumerate(states):
+            hit = self._q_cache.get(tuple(st)) if use_cache else None
+            if hit is not None and hit[0] == self.weights_version:
+                out[i] = hit[1]
+            else:
+                missing.append(i)
+        if missing:
+            x = torch.tensor([list(states[i]) for i in missing], dtype=torch.float32, device=self.device)
+            rows = self.q(x).cpu().tolist()
+            for i, row in zip(missing, rows):
+                out[i] = row
+                if use_cache:
+                    self._q_cache[tuple(float(v) for v in states[i])] = (self.weights_version, row)
+        return out  # type: ignore[return-value]
+
+    def _q_cache_active(self) -> bool:
+        return self.config.q_cache and (self.frozen or not self.q.training)
+
+    def precompute_q_cache(self) -> int:
+        """Remplit le cache pour tous les états atteignables (un forward pass de 4520 lignes).
+
+        Returns:
+            nombre d'états mis en cache
+        """
+        states = [tuple(float(v) for v in st) for st in reachable_states()]
+        self._q_cache.clear()
+        self.q_values_batch(states)
+        return len(states)
+
+    def _bump_weights_version(self) -> None:
+        self.weights_version += 1
+
     def remember(self, transition: Transition) -> None:
-        self.replay.push(transition)
+        if self.memory_budget is not None:
+            self.memory_budget.tick("replay")
+        with self.replay_lock:
+            self.replay.push(transition)
 
     def _masked_max(self, q_next: torch.Tensor, next_valid_mask: torch.Tensor) -> torch.Tensor:
         # q_next: [B,9] ; mask: [B,9] in {0,1}
@@ -198,46 +600,234 @@ class DQNAgent:
         q_masked = torch.where(valid_mask > 0.5, q_values, neg_inf)
         return torch.argmax(q_masked, dim=1)
 
-    def train_step(self) -> Optional[float]:
-        if len(self.replay) < self.config.min_replay_size:
-            return None
-
-        batch = self.replay.sample(self.config.batch_size)
-
+    def _batch_tensors(self, batch: List[Transition]) -> Tuple[torch.Tensor, ...]:
         states = torch.tensor([t.state for t in batch], dtype=torch.float32, device=self.device)
         actions = torch.tensor([t.action for t in batch], dtype=torch.int64, device=self.device).unsqueeze(1)
         rewards = torch.tensor([t.reward for t in batch], dtype=torch.float32, device=self.device)
         next_states = torch.tensor([t.next_state for t in batch], dtype=torch.float32, device=self.device)
         dones = torch.tensor([t.done for t in batch], dtype=torch.float32, device=self.device)
         next_masks = torch.tensor([t.next_valid_mask for t in batch], dtype=torch.float32, device=self.device)
+        if self.config.n_step > 1:
+            discounts = torch.tensor(
+                [self.config.gamma ** t.n_steps for t in batch], dtype=torch.float32, device=self.device
+            )
+        else:
+            discounts = torch.full_like(rewards, self.config.gamma)
+        return states, actions, rewards, next_states, dones, next_masks, discounts
+
+    def _array_tensors(self, arrays: Tuple[np.ndarray, ...]) -> Tuple[torch.Tensor, ...]:
+        states, actions, rewards, next_states, dones, next_masks, n_steps = arrays
+        to = lambda a: torch.from_numpy(a).to(self.device)  # noqa: E731
+        if self.config.n_step > 1:
+            discounts = to(np.power(self.config.gamma, n_steps.astype(np.float32)).astype(np.float32))
+        else:
+            discounts = torch.full((len(rewards),), self.config.gamma, dtype=torch.float32, device=self.device)
+        return (
+            to(states), to(actions).unsqueeze(1), to(rewards), to(next_states), to(dones), to(next_masks), discounts
+        )
 
-        q_sa = self.q(states).gather(1, actions).squeeze(1)
+    def _build_batch(self, batch_size: int) -> Tuple[torch.Tensor, ...]:
+        """Échantillonnage + tenseurs sans chronomètres (appelé par le thread de `BatchPrefetcher`)."""
+        with self.replay_lock:
+            if isinstance(self.replay, IndexedReplayBuffer):
+                arrays = self.replay.sample_arrays(batch_size)
+            else:
+                batch = self.replay.sample(batch_size)
+        if isinstance(self.replay, IndexedReplayBuffer):
+            return self._array_tensors(arrays)
+        return self._batch_tensors(batch)
+
+    def start_prefetch(self, depth: int) -> None:
+        """Démarre (ou redémarre) le préchargement de `depth` batchs de `config.batch_size`."""
+        from batch_prefetch import BatchPrefetcher
+
+        self.stop_prefetch()
+        self.prefetcher = BatchPrefetcher(self, depth, self.config.batch_size)
+
+    def stop_prefetch(self) -> None:
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
+    def _sample_tensors(self, batch_size: int) -> Tuple[torch.Tensor, ...]:
+        """Échantillonne le replay et retourne les tenseurs du batch (voir `_batch_tensors`).
+
+        Avec le préchargement actif, le batch vient de la file du thread de fond (le temps
+        d'attente éventuel est compté dans la phase "sample").
+        """
+        if self.prefetcher is not None and batch_size == self.prefetcher.batch_size:
+            with self._phase("sample"):
+                return self.prefetcher.get()
+        if isinstance(self.replay, IndexedReplayBuffer):
+            with self._phase("sample"):
+                arrays = self.replay.sample_arrays(batch_size)
+            with self._phase("tensors"):
+                return self._array_tensors(arrays)
+        with self._phase("sample"):
+            batch = self.replay.sample(batch_size)
+        with self._phase("tensors"):
+            return self._batch_tensors(batch)
+
+    def _double_dqn_target(
+        self,
+        rewards: torch.Tensor,
+        dones: torch.Tensor,
+        discounts: torch.Tensor,
+        next_masks: torch.Tensor,
+        q_next_online: torch.Tensor,
+        q_next_target_all: torch.Tensor,
+    ) -> torch.Tensor:
+        # Double DQN:
+        # - sélection de l'action avec le réseau online
+        # - évaluation avec le target network
+        next_actions = self._masked_argmax(q_next_online, next_masks).unsqueeze(1)  # [B,1]
+        q_next = q_next_target_all.gather(1, next_actions).squeeze(1)
+
+        # Si aucun coup valide (terminal), q_next sera -1e9 => remettre à 0
+        q_next = torch.where(q_next < -1e8, torch.zeros_like(q_next), q_next)
+        return rewards + (1.0 - dones) * discounts * q_next
+
+    def _after_update(self, loss: float, q_all: torch.Tensor) -> bool:
+        """Compteurs, synchronisation du target network et télémétrie.
+
+        `loss`: valeur déjà lue par l'appelant (une seule synchronisation `.item()` par pas).
+
+        Returns:
+            True si le target network vient d'être synchronisé.
+        """
+        self.train_updates += 1
+        self._bump_weights_version()
+        synced = False
+        if self.train_updates % self.config.target_update_interval == 0:
+            with self._phase("target_sync"):
+                self.q_target.load_state_dict(self.q.state_dict())
+            synced = True
+
+        if self.telemetry is not None:
+            mean_max_q = float(q_all.detach().max(dim=1).values.mean().item())
+            self.telemetry.record_update(loss, self.epsilon, mean_max_q)
+        return synced
+
+    def eager_loss(
+        self,
+        states: torch.Tensor,
+        actions: torch.Tensor,
+        rewards: torch.Tensor,
+        next_states: torch.Tensor,
+        dones: torch.Tensor,
+        next_masks: torch.Tensor,
+        discounts: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Perte TD Double DQN d'un batch (opérations eager); retourne (perte, Q_online(s))."""
+        q_all = self.q(states)
+        q_sa = q_all.gather(1, actions).squeeze(1)
 
         with torch.no_grad():
-            # Double DQN:
-            # - sélection de l'action avec le réseau online
-            # - évaluation avec le target network
             q_next_online = self.q(next_states)
-            next_actions = self._masked_argmax(q_next_online, next_masks).unsqueeze(1)  # [B,1]
             q_next_target_all = self.q_target(next_states)
-            q_next = q_next_target_all.gather(1, next_actions).squeeze(1)
+            target = self._double_dqn_target(
+                rewards, dones, discounts, next_masks, q_next_online, q_next_target_all
+            )
 
-            # Si aucun coup valide (terminal), q_next sera -1e9 => remettre à 0
-            q_next = torch.where(q_next < -1e8, torch.zeros_like(q_next), q_next)
-            target = rewards + (1.0 - dones) * self.config.gamma * q_next
+        return self.loss_fn(q_sa, target), q_all
 
-        loss = self.loss_fn(q_sa, target)
+    def _compiled_step(self, tensors: Tuple[torch.Tensor, ...]) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+        """Perte et gradients via `compiled_step.TDStep`; None (et repli définitif en eager) en cas d'échec."""
+        try:
+            if self._td_step is None:
+                from compiled_step import TDStep
 
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
+                self._td_step = TDStep(self.q, self.q_target, self.effective_compile_mode)
+            return self._td_step(*tensors)
+        except Exception as e:  # compilation impossible: on garde l'entraînement eager
+            warnings.warn(f"Pas d'apprentissage '{self.effective_compile_mode}' indisponible, repli eager: {e}")
+            self.effective_compile_mode = "eager"
+            self._td_step = None
+            return None
+
+    def train_step(self) -> Optional[float]:
+        if self.frozen or len(self.replay) < self.config.min_replay_size:
+            return None
+
+        if self.config.prefetch_batches > 0 and self.prefetcher is None:
+            self.start_prefetch(self.config.prefetch_batches)
+        tensors = self._sample_tensors(self.config.batch_size)
+
+        with self._phase("forward_backward"):
+            result = self._compiled_step(tensors) if self.effective_compile_mode != "eager" else None
+            if result is not None:
+                loss, q_all = result  # gradients déjà calculés
+            else:
+                loss, q_all = self.eager_loss(*tensors)
+                self.optimizer.zero_grad()
+                loss.backward()
+            self.optimizer.step()
 
+        loss_value = float(loss.item())
         # Mise à jour périodique du target network
-        self.train_updates += 1
-        if self.train_updates % self.config.target_update_interval == 0:
-            self.q_target.load_state_dict(self.q.state_dict())
+        self._after_update(loss_value, q_all)
+
+        return loss_value
+
+    def train_fused(self, num_updates: int) -> Optional[float]:
+        """Effectue `num_updates` pas de gradient sur des blocs échantillonnés.
 
-        return float(loss.item())
+        Par rapport à `num_updates` appels à `train_step`:
+        - un seul échantillonnage + une seule construction de tenseurs par bloc
+          (`batch_size * fused_chunk_batches` transitions), les mini-batchs sont des index
+        - Q_target(s') est calculé une fois pour tout le bloc (recalculé après une synchro)
+        - Q_online(s) et Q_online(s') sont obtenus en un seul forward (concaténation)
+
+        Chaque mini-batch d'un bloc sert une seule fois: au-delà, un nouveau bloc est tiré.
+
+        Returns:
+            loss moyenne, ou None si le replay est trop petit (ou l'agent `frozen`).
+        """
+        if self.frozen or num_updates <= 0 or len(self.replay) < self.config.min_replay_size:
+            return None
+
+        chunk_size = min(len(self.replay), self.config.batch_size * max(1, self.config.fused_chunk_batches))
+        b = min(self.config.batch_size, chunk_size)
+        n_slices = max(1, chunk_size // b)
+        total = 0.0
+        for u in range(num_updates):
+            if u % n_slices == 0:
+                states, actions, rewards, next_states, dones, next_masks, discounts = self._sample_tensors(chunk_size)
+                # Mélange une fois le bloc: les mini-batchs sont ensuite de simples tranches (pas de copie)
+                perm = torch.randperm(chunk_size, device=self.device)
+                states, actions, rewards = states[perm], actions[perm], rewards[perm]
+                next_states, dones, next_masks, discounts = (
+                    next_states[perm], dones[perm], next_masks[perm], discounts[perm]
+                )
+                with torch.no_grad():
+                    q_next_target_chunk = self.q_target(next_states)
+
+            with self._phase("forward_backward"):
+                lo = (u % n_slices) * b
+                hi = lo + b
+                q_cat = self.q(torch.cat([states[lo:hi], next_states[lo:hi]], dim=0))
+                q_all = q_cat[:b]
+                q_sa = q_all.gather(1, actions[lo:hi]).squeeze(1)
+
+                with torch.no_grad():
+                    target = self._double_dqn_target(
+                        rewards[lo:hi], dones[lo:hi], discounts[lo:hi], next_masks[lo:hi],
+                        q_cat[b:].detach(), q_next_target_chunk[lo:hi],
+                    )
+
+                loss = self.loss_fn(q_sa, target)
+
+                self.optimizer.zero_grad()
+                loss.backward()
+                self.optimizer.step()
+
+            loss_value = float(loss.item())
+            total += loss_value
+            if self._after_update(loss_value, q_all):
+                with torch.no_grad():
+                    q_next_target_chunk = self.q_target(next_states)
+
+        return total / num_updates
 
     def save(self, path: str) -> None:
         os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -249,13 +839,25 @@ class DQNAgent:
                 "step_count": self.step_count,
                 "epsilon": self.epsilon,
                 "train_updates": self.train_updates,
+                "frozen": self.frozen,
+                "rng_state": get_rng_state(),
             },
             path,
         )
 
-    def load(self, path: str) -> bool:
+    def load(self, path: str, restore_rng: bool = False) -> bool:
+        """Charge un checkpoint.
+
+        Args:
+            restore_rng: restaure aussi l'état des générateurs aléatoires sauvegardé
+                (reprise exacte d'un entraînement)
+        """
         if not os.path.exists(path):
             return False
+        if is_mmap_checkpoint(path):
+            self._load_mmap(path, restore_rng)
+            self._after_load()
+            return True
         ckpt = torch.load(path, map_location=self.device)
         self.q.load_state_dict(ckpt.get("model", ckpt))
         if "target_model" in ckpt:
@@ -270,8 +872,102 @@ class DQNAgent:
         self.step_count = int(ckpt.get("step_count", 0))
         self.epsilon = float(ckpt.get("epsilon", self.config.epsilon_end))
         self.train_updates = int(ckpt.get("train_updates", 0))
+        self.frozen = bool(ckpt.get("frozen", False))
+        if restore_rng:
+            set_rng_state(ckpt.get("rng_state"))
+        self._after_load()
         return True
 
+    def _after_load(self) -> None:
+        self._bump_weights_version()
+        self._td_step = None  # un chargement mmap remplace les tenseurs des réseaux: reconstruire
+        self._q_cache.clear()
+        if self.config.q_cache and self.config.q_cache_precompute:
+            self.precompute_q_cache()
+
+    def save_mmap(self, path: str, training: bool = True) -> None:
+        """Sauvegarde au format mmap (voir mmap_checkpoint.py).
+
+        Args:
+            training: True => artefact complet (target, optimizer, compteurs, RNG);
+                False => poids du réseau online seulement (processus de jeu)
+        """
+        tensors = {f"model.{k}": v for k, v in self.q.state_dict().items()}
+        meta: Dict[str, object] = {}
+        if training:
+            tensors.update({f"target_model.{k}": v for k, v in self.q_target.state_dict().items()})
+            opt_tensors, opt_state = flatten_optimizer_state(self.optimizer.state_dict())
+            tensors.update(opt_tensors)
+            rng_state = get_rng_state()
+            # états des générateurs torch (tenseurs uint8): blobs, le reste en JSON
+            tensors["rng.torch"] = rng_state.pop("torch")
+            for i, t in enumerate(rng_state.pop("torch_cuda", [])):
+                tensors[f"rng.torch_cuda.{i}"] = t
+            meta = {
+                "optimizer": opt_state,
+                "step_count": self.step_count,
+                "epsilon": self.epsilon,
+                "train_updates": self.train_updates,
+                "frozen": self.frozen,
+                "rng_state": rng_state,
+            }
+        write_checkpoint(path, tensors, meta, "training" if training else "inference")
+
+    def _load_mmap(self, path: str, restore_rng: bool) -> None:
+        tensors, header = read_checkpoint(path)
+        meta = header["meta"]
+
+        def section(prefix: str) -> Dict[str, torch.Tensor]:
+            return {k[len(prefix):]: v for k, v in tensors.items() if k.startswith(prefix)}
+
+        model = section("model.")
+        if self.device.type == "cpu":
+            # les paramètres pointent directement dans les pages du fichier (copie à l'écriture)
+            self.q.load_state_dict(model, assign=True)
+            _rebind_optimizer(self.optimizer, self.q.parameters())
+        else:
+            self.q.load_state_dict(model)
+        target = section("target_model.")
+        self.q_target.load_state_dict(target if target else self.q.state_dict())
+
+        if header["kind"] == "training":
+            try:
+                self.optimizer.load_state_dict(unflatten_optimizer_state(tensors, meta["optimizer"]))
+            except Exception:
+                pass
+            self.step_count = int(meta.get("step_count", 0))
+            self.epsilon = float(meta.get("epsilon", self.config.epsilon_end))
+            self.train_updates = int(meta.get("train_updates", 0))
+            self.frozen = bool(meta.get("frozen", False))
+            if restore_rng:
+                rng_state = dict(meta.get("rng_state") or {})
+                if "rng.torch" in tensors:
+                    rng_state["torch"] = tensors["rng.torch"].clone()
+                cuda = [tensors[k].clone() for k in sorted(tensors) if k.startswith("rng.torch_cuda.")]
+                if cuda:
+                    rng_state["torch_cuda"] = cuda
+                set_rng_state(rng_state)
+        else:
+            self.epsilon = self.config.epsilon_end
+
+
+def load_inference_qnetwork(path: str) -> QNetwork:
+    """QNetwork d'inférence (CPU, sans gradient) depuis un checkpoint mmap ou torch.
+
+    Avec un checkpoint mmap, les poids ne sont pas copiés: tous les processus qui chargent
+    le même fichier partagent ses pages.
+    """
+    q = QNetwork()
+    if is_mmap_checkpoint(path):
+        tensors, _ = read_checkpoint(path)
+        q.load_state_dict({k[len("model."):]: v for k, v in tensors.items() if k.startswith("model.")}, assign=True)
+    else:
+        ckpt = torch.load(path, map_location="cpu")
+        q.load_state_dict(ckpt.get("model", ckpt))
+    for p in q.parameters():
+        p.requires_grad_(False)
+    return q.eval()
+
 
 def _mask_from_board_abs(board_abs: List[int]) -> List[float]:
     mask = [0.0] * 9
@@ -280,38 +976,110 @@ def _mask_from_board_abs(board_abs: List[int]) -> List[float]:
     return mask
 
 
-def self_play_train(agent: DQNAgent, episodes: int = DEFAULT_SELF_PLAY_EPISODES, verbose_every: int = 500) -> None:
-    """Entraîne l'agent par self-play.
+def _n_step_transitions(own: List[Transition], n: int, gamma: float) -> List[Transition]:
+    """Chaîne les transitions d'un même joueur (dans l'ordre de l'épisode) sur n coups.
 
-    Le même réseau joue les deux camps, mais on encode l'état du point de vue du joueur courant.
+    - récompense: somme actualisée des récompenses des n coups (arrêt au premier coup terminal)
+    - s': état du joueur à son n-ième coup suivant (sa propre perspective), masque recalculé
+    - `n_steps` indique le nombre de coups agrégés (cible: gamma**n_steps * max Q(s'))
+    """
+    out: List[Transition] = []
+    for i in range(len(own)):
+        reward = 0.0
+        k = 0
+        done = False
+        while k < n and i + k < len(own):
+            t = own[i + k]
+            reward += (gamma ** k) * t.reward
+            k += 1
+            if t.done:
+                done = True
+                break
 
-    Récompenses (conforme cahier):
-    - +1 si le joueur qui vient de jouer gagne
-    - -1 attribué au dernier coup de l'adversaire (défaite)
-    - 0 en cas de match nul
+        last = own[i + k - 1]
+        if done or i + k >= len(own):
+            next_state, next_mask = last.next_state, last.next_valid_mask
+            done = True
+        else:
+            next_state = own[i + k].state
+            next_mask = [1.0 if v == 0 else 0.0 for v in next_state]
+
+        out.append(
+            Transition(
+                state=own[i].state,
+                action=own[i].action,
+                reward=reward,
+                next_state=next_state,
+                done=done,
+                next_valid_mask=next_mask,
+                n_steps=k,
+            )
+        )
+    return out
+
+
+def _set_train_mode(agent: DQNAgent, training: bool) -> None:
+    # Les agents tabulaires (tabular_agent.py) n'ont pas de réseau.
+    q_net = getattr(agent, "q", None)
+    if isinstance(q_net, nn.Module):
+        q_net.train(training)
+
+
+class _UpdateScheduler:
+    """Décroissance d'epsilon et pas de gradient après chaque coup joué par l'agent.
+
+    Mode classique: `train_steps_per_move` appels à `train_step`.
+    Mode groupé (`config.fused_update_interval` > 0): `train_fused` tous les N coups.
     """
-    agent.q.train()
 
-    for ep in range(1, episodes + 1):
-        board_abs = [0] * 9
-        player = 1  # 1=X, -1=O
+    def __init__(self, agent: DQNAgent):
+        self.agent = agent
+        self.fused_every = getattr(agent.config, "fused_update_interval", 0)
+        self.total_moves = 0
+        self.pending_updates = 0
+
+    def after_move(self) -> None:
+        agent = self.agent
+        agent._update_epsilon_training()
+        if self.fused_every > 0:
+            self.total_moves += 1
+            self.pending_updates += agent.config.train_steps_per_move
+            if self.total_moves % self.fused_every == 0:
+                agent.train_fused(self.pending_updates)
+                self.pending_updates = 0
+        else:
+            for _ in range(agent.config.train_steps_per_move):
+                agent.train_step()
 
-        last_transition = {1: None, -1: None}  # type: ignore[dict-item]
-        done = False
 
-        while not done:
+def _self_play_episode(agent: DQNAgent, scheduler: _UpdateScheduler, n_step: int) -> Tuple[int, int]:
+    """Joue un épisode où l'agent tient les deux camps. Retourne (gagnant, nombre de coups)."""
+    board_abs = [0] * 9
+    player = 1  # 1=X, -1=O
+
+    last_transition = {1: None, -1: None}  # type: ignore[dict-item]
+    done = False
+    winner = 0
+    moves = 0
+    own_transitions: dict = {1: [], -1: []}
+
+    while not done:
+        with agent._phase("select_action"):
             state = [float(v) for v in to_perspective(board_abs, player)]
             valid = valid_actions(board_abs)
             action = agent.select_action(state, valid, training=True)
-            if action == -1:
-                break
+        if action == -1:
+            break
 
+        with agent._phase("env_step"):
             # jouer
             board_abs[action] = player
+            moves += 1
 
             winner = check_winner(board_abs)
             draw = is_draw(board_abs)
 
+            # s' définitif (état suivant du même joueur) posé par `_n_step_transitions` en fin d'épisode
             next_state = [float(v) for v in to_perspective(board_abs, -player)]
             next_mask = _mask_from_board_abs(board_abs)
 
@@ -323,7 +1091,7 @@ def self_play_train(agent: DQNAgent, episodes: int = DEFAULT_SELF_PLAY_EPISODES,
                 done=False,
                 next_valid_mask=next_mask,
             )
-            agent.remember(t)
+            own_transitions[player].append(t)
             last_transition[player] = t
 
             if winner == player:
@@ -350,13 +1118,159 @@ def self_play_train(agent: DQNAgent, episodes: int = DEFAULT_SELF_PLAY_EPISODES,
             else:
                 player *= -1
 
-            # apprentissage
-            agent._update_epsilon_training()
-            for _ in range(agent.config.train_steps_per_move):
-                agent.train_step()
+        # apprentissage
+        scheduler.after_move()
+
+    for p in (1, -1):
+        for t in _n_step_transitions(own_transitions[p], n_step, agent.config.gamma):
+            agent.remember(t)
+
+    return winner, moves
+
+
+def _opponent_episode(
+    agent: DQNAgent, scheduler: _UpdateScheduler, opponent, agent_player: int, n_step: int = 1
+) -> Tuple[int, int]:
+    """Joue un épisode agent vs adversaire externe (`opponent.act(board_abs, player)`).
+
+    Seuls les coups de l'agent sont appris. Comme en jeu contre un humain, s' est l'état
+    vu par l'agent après la réponse adverse (même convention que morpion_pygame). Les
+    transitions sont ajoutées au replay en fin d'épisode, chaînées sur `n_step` coups.
+    """
+    board_abs = [0] * 9
+    player = 1
+    pending: Optional[Tuple[List[float], int]] = None
+    moves = 0
+    winner = 0
+    own: List[Transition] = []
+
+    while True:
+        if player == agent_player:
+            with agent._phase("select_action"):
+                state = [float(v) for v in to_perspective(board_abs, player)]
+                action = agent.select_action(state, valid_actions(board_abs), training=True)
+        else:
+            with agent._phase("select_action"):
+                action = opponent.act(board_abs, player)
+        if action == -1:
+            break
+
+        with agent._phase("env_step"):
+            board_abs[action] = player
+            moves += 1
+            winner = check_winner(board_abs)
+            done = winner != 0 or is_draw(board_abs)
+            after = [float(v) for v in to_perspective(board_abs, agent_player)]
+
+            if player == agent_player:
+                if done:
+                    own.append(Transition(state, action, 1.0 if winner else 0.0, after, True, [0.0] * 9))
+                else:
+                    pending = (state, action)
+            elif pending is not None:
+                own.append(
+                    Transition(
+                        pending[0],
+                        pending[1],
+                        -1.0 if winner else 0.0,
+                        after,
+                        done,
+                        [0.0] * 9 if done else _mask_from_board_abs(board_abs),
+                    )
+                )
+                pending = None
+
+        if player == agent_player:
+            scheduler.after_move()
+        if done:
+            break
+        player = -player
+
+    for t in _n_step_transitions(own, n_step, agent.config.gamma):
+        agent.remember(t)
+    return winner, moves
+
+
+def self_play_train(
+    agent: DQNAgent,
+    episodes: int = DEFAULT_SELF_PLAY_EPISODES,
+    verbose_every: int = 0,
+    telemetry: Optional[TrainingTelemetry] = None,
+    opponents=None,
+) -> None:
+    """Entraîne l'agent par self-play.
 
-        if verbose_every and ep % verbose_every == 0:
-            # Simple métrique indicative
-            pass
+    Le même réseau joue les deux camps, mais on encode l'état du point de vue du joueur courant.
 
-    agent.q.eval()
+    Récompenses (conforme cahier):
+    - +1 si le joueur qui vient de jouer gagne
+    - -1 attribué au dernier coup de l'adversaire (défaite)
+    - 0 en cas de match nul
+
+    Les transitions de chaque joueur sont chaînées sur ses propres coups et ajoutées au replay
+    en fin d'épisode: s' est l'état vu par le joueur à son coup suivant (après la réponse
+    adverse), comme contre un adversaire externe ou un humain. La cible `r + gamma * max Q(s')`
+    est donc celle du joueur lui-même, sans changement de signe. Retours n-step
+    (`config.n_step` > 1): n coups du joueur sont agrégés par transition.
+
+    Mises à jour groupées (`config.fused_update_interval` > 0): au lieu de
+    `train_steps_per_move` appels à `train_step` par coup, `train_fused` est appelé
+    tous les N coups avec le nombre de pas de gradient accumulés.
+
+    Adversaires (`opponents`, voir opponent_pool.py): à chaque épisode, `opponents.sample(agent)`
+    retourne un adversaire (Minimax, aléatoire, ancien snapshot...) ou None pour un épisode
+    de self-play; `opponents.on_episode_end(agent, ep)` permet d'archiver des snapshots.
+    L'agent joue X ou O au hasard et seuls ses coups sont appris.
+
+    Un agent `frozen` n'est pas entraîné (avertissement, aucun épisode joué).
+
+    Instrumentation:
+    - `telemetry`: collecteur (chronomètres par phase, loss, epsilon, max-Q, issues)
+    - si `verbose_every` > 0, un résumé est affiché (et écrit dans le sink) tous les N épisodes;
+      la fenêtre restante est écrite en fin d'entraînement (même avec `verbose_every` = 0)
+    - sans `telemetry` ni `verbose_every` (défaut), aucune mesure n'est collectée
+    """
+    if getattr(agent, "frozen", False):
+        warnings.warn("Agent figé (frozen): self_play_train ignoré")
+        return
+    if telemetry is None and verbose_every:
+        telemetry = TrainingTelemetry()
+    previous_telemetry = agent.telemetry
+    agent.telemetry = telemetry
+
+    _set_train_mode(agent, True)
+
+    n_step = getattr(agent.config, "n_step", 1)
+    scheduler = _UpdateScheduler(agent)
+
+    try:
+        for ep in range(1, episodes + 1):
+            opponent = opponents.sample(agent) if opponents is not None else None
+            if opponent is None:
+                winner, moves = _self_play_episode(agent, scheduler, n_step)
+            else:
+                winner, moves = _opponent_episode(agent, scheduler, opponent, random.choice((1, -1)), n_step)
+            if opponents is not None:
+                opponents.on_episode_end(agent, ep)
+
+            if telemetry is not None:
+                telemetry.record_episode(winner, moves, agent.epsilon)
+                if verbose_every and ep % verbose_every == 0:
+                    print(telemetry.format_summary(telemetry.flush()))
+    finally:
+        agent.telemetry = previous_telemetry
+        # Dernière fenêtre (partielle, ou unique sans `verbose_every`) écrite dans le sink
+        if telemetry is not None and (telemetry.episode_lengths or telemetry.losses):
+            row = telemetry.flush()
+            if verbose_every:
+                print(telemetry.format_summary(row))
+        # Les agents tabulaires (tabular_agent.py) n'ont pas de préchargement.
+        stop_prefetch = getattr(agent, "stop_prefetch", None)
+        if stop_prefetch is not None:
+            stop_prefetch()
+        _set_train_mode(agent, False)
+
+    # Poids figés jusqu'au prochain entraînement: le précalcul reste valable
+    config = agent.config
+    if getattr(config, "q_cache", False) and getattr(config, "q_cache_precompute", False):
+        agent.precompute_q_cache()
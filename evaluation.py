@@ -0,0 +1,88 @@
+"""evaluation.py
+
+Évaluation d'un agent (DQN, tabulaire, ...) contre l'IA Minimax de `morpion.py` (oracle).
+
+L'agent doit exposer `select_action(state, valid, training=False)` et un attribut `epsilon`
+(mis à 0 pendant l'évaluation: politique gloutonne).
+
+Les coups de l'oracle en mode 'difficile' sont déterministes: ils sont mémorisés
+(plateau -> coup) pour que des milliers de parties d'évaluation restent rapides.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from morpion import IntelligenceArtificielle
+from tictactoe_env import check_winner, from_chars, to_perspective, valid_actions
+
+
+_ORACLE_CACHE: Dict[Tuple[Tuple[str, ...], str], int] = {}
+
+
+def oracle_move(plateau: List[str], symbole: str, difficulte: str = "difficile",
+                rng: Optional[random.Random] = None) -> int:
+    """Coup de l'IA Minimax jouant `symbole` (mémorisé en mode 'difficile')."""
+    adversaire = 'O' if symbole == 'X' else 'X'
+    if difficulte != "difficile":
+        return IntelligenceArtificielle(symbole, adversaire, rng=rng).meilleur_coup(plateau, difficulte)
+    key = (tuple(plateau), symbole)
+    move = _ORACLE_CACHE.get(key)
+    if move is None:
+        move = IntelligenceArtificielle(symbole, adversaire).meilleur_coup(list(plateau), "difficile")
+        _ORACLE_CACHE[key] = move
+    return move
+
+
+def play_vs_oracle(agent, agent_symbol: str, difficulte: str = "difficile",
+                   rng: Optional[random.Random] = None) -> int:
+    """Joue une partie agent vs oracle.
+
+    Returns:
+        1 si l'agent gagne, -1 s'il perd, 0 en cas de match nul
+    """
+    plateau = [' '] * 9
+    oracle_symbol = 'O' if agent_symbol == 'X' else 'X'
+    tour = 'X'
+    while True:
+        if tour == agent_symbol:
+            board_abs, player = from_chars(plateau, agent_symbol)
+            state = [float(v) for v in to_perspective(board_abs, player)]
+            action = agent.select_action(state, valid_actions(board_abs), training=False)
+        else:
+            action = oracle_move(plateau, oracle_symbol, difficulte, rng)
+        plateau[action] = tour
+
+        board_abs, _ = from_chars(plateau, 'X')
+        winner = check_winner(board_abs)
+        if winner != 0:
+            agent_player = 1 if agent_symbol == 'X' else -1
+            return 1 if winner == agent_player else -1
+        if ' ' not in plateau:
+            return 0
+        tour = 'O' if tour == 'X' else 'X'
+
+
+def evaluate_vs_minimax(agent, games: int = 20, difficulte: str = "difficile",
+                        rng: Optional[random.Random] = None) -> Dict[str, float]:
+    """Évalue l'agent (glouton) sur `games` parties, en alternant X et O.
+
+    Returns:
+        {'win', 'draw', 'loss', 'non_loss'}: taux dans [0, 1]
+    """
+    saved_epsilon = agent.epsilon
+    agent.epsilon = 0.0
+    counts = {1: 0, 0: 0, -1: 0}
+    try:
+        for g in range(games):
+            counts[play_vs_oracle(agent, 'X' if g % 2 == 0 else 'O', difficulte, rng)] += 1
+    finally:
+        agent.epsilon = saved_epsilon
+    n = float(max(1, games))
+    return {
+        "win": counts[1] / n,
+        "draw": counts[0] / n,
+        "loss": counts[-1] / n,
+        "non_loss": (counts[1] + counts[0]) / n,
+    }
@@ -0,0 +1,351 @@
+"""game_log.py
+
+Journal binaire compact des parties jouées (Pygame, console, batch) et requêtes d'analyse.
+
+Chaque partie est un enregistrement de taille fixe (24 octets, `RECORD_DTYPE`):
+
+- `moves`         uint64  coups joués (cases 0-8), 4 bits par coup, premier coup en bits de poids faible
+- `timestamp`     uint32  date de fin (secondes Unix)
+- `duration_ms`   uint32  durée de la partie
+- `model_version` uint16  version du modèle (registre), 0 = inconnue / sans IA apprenante
+- `n_moves`       uint8   nombre de coups
+- `mode`          uint8   index dans `MODES`
+- `difficulty`    uint8   index dans `DIFFICULTES` (0 = aucune)
+- `outcome`       int8    gagnant: 1 = X, -1 = O, 0 = nul
+- `ai_player`     int8    camp de l'IA: 1 = X, -1 = O, 0 = aucun ou les deux
+- `flags`         uint8   réservé
+
+Stockage: segments en ajout seul (`seg_000001.bin`, ...). Un segment plein est scellé et
+reçoit un index (`seg_000001.idx.npz`): lignes triées par ouverture (2 premiers coups) et
+par issue, avec les bornes de chaque clé. Les requêtes projettent les segments en mémoire
+(NumPy memmap) et filtrent de façon vectorisée; les index d'ouverture et d'issue évitent de
+parcourir les lignes qui ne commencent pas par l'ouverture ou n'ont pas l'issue demandées.
+
+Plusieurs processus peuvent écrire dans le même dossier (jeu, console, batch): chaque
+écriture prend un verrou exclusif (`fcntl.flock` sur `writer.lock`), les ajouts et le
+scellement d'un segment ne s'entrelacent donc pas. Sans `fcntl` (Windows), un seul
+processus écrivain par dossier: deux écrivains corrompraient le segment actif.
+
+Exemple:
+    log = GameLog("runs/games")
+    log.append([4, 0, 8, 2, 6], mode="ia", difficulte="difficile", outcome=-1, ai_player=-1, model_version=7)
+    log.close()
+    GameLog("runs/games").stats(opening=[4, 0], model_version=7)   # taux de défaite du modèle v7 après 4-0
+
+    python game_log.py runs/games --opening 4,0 --model-version 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import glob
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: pas de verrou d'écriture (un seul processus écrivain par dossier)
+    fcntl = None  # type: ignore[assignment]
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_GAME_LOG_DIR = "runs/games"
+DEFAULT_SEGMENT_RECORDS = 1 << 20  # ~24 Mo par segment
+DEFAULT_FLUSH_EVERY = 256  # enregistrements gardés en mémoire avant écriture
+WRITER_LOCK = "writer.lock"  # verrou des écritures, dans le dossier du journal
+
+MODES = ("inconnu", "ia", "2joueurs", "ia_vs_ia", "console_ia", "console_2joueurs", "console_ia_vs_ia", "batch")
+DIFFICULTES = ("", "facile", "moyen", "difficile")
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("moves", "<u8"),
+        ("timestamp", "<u4"),
+        ("duration_ms", "<u4"),
+        ("model_version", "<u2"),
+        ("n_moves", "u1"),
+        ("mode", "u1"),
+        ("difficulty", "u1"),
+        ("outcome", "i1"),
+        ("ai_player", "i1"),
+        ("flags", "u1"),
+    ]
+)
+
+# Ouverture indexée: 2 premiers coups (81 clés), 1 seul coup (9 clés), aucun coup (1 clé)
+OPENING_DEPTH = 2
+N_OPENING_KEYS = 81 + 9 + 1
+
+
+def encode_moves(moves: Sequence[int]) -> int:
+    code = 0
+    for i, m in enumerate(moves):
+        code |= (int(m) & 0xF) << (4 * i)
+    return code
+
+
+def decode_moves(code: int, n_moves: int) -> List[int]:
+    return [(int(code) >> (4 * i)) & 0xF for i in range(n_moves)]
+
+
+def _opening_keys(records: np.ndarray) -> np.ndarray:
+    first = (records["moves"] & 0xF).astype(np.int64)
+    second = ((records["moves"] >> 4) & 0xF).astype(np.int64)
+    n = records["n_moves"]
+    return np.where(n >= 2, first * 9 + second, np.where(n == 1, 81 + first, 90))
+
+
+def _opening_key_ranges(opening: Sequence[int]) -> List[Tuple[int, int]]:
+    """Intervalles [lo, hi) de clés d'index compatibles avec le préfixe `opening`."""
+    if len(opening) >= 2:
+        k = opening[0] * 9 + opening[1]
+        return [(k, k + 1)]
+    if len(opening) == 1:
+        a = opening[0]
+        return [(a * 9, a * 9 + 9), (81 + a, 82 + a)]
+    return [(0, N_OPENING_KEYS)]
+
+
+def _csr(keys: np.ndarray, n_keys: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(keys, kind="stable").astype(np.uint32)
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return order, offsets
+
+
+class GameLog:
+    def __init__(
+        self,
+        root: str = DEFAULT_GAME_LOG_DIR,
+        segment_records: int = DEFAULT_SEGMENT_RECORDS,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+    ):
+        self.root = root
+        self.segment_records = segment_records
+        self.flush_every = flush_every
+        self._buffer: List[tuple] = []
+        os.makedirs(root, exist_ok=True)
+
+    # --- segments ---
+    def segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.root, "seg_*.bin")))
+
+    @staticmethod
+    def _index_path(segment: str) -> str:
+        return segment[: -len(".bin")] + ".idx.npz"
+
+    def _active_segment(self) -> str:
+        segs = self.segments()
+        if segs and not os.path.exists(self._index_path(segs[-1])):
+            return segs[-1]
+        return os.path.join(self.root, f"seg_{len(segs) + 1:06d}.bin")
+
+    @staticmethod
+    def _count(segment: str) -> int:
+        return os.path.getsize(segment) // RECORD_DTYPE.itemsize
+
+    def seal(self, segment: str) -> None:
+        """Construit l'index d'un segment plein (il n'est plus modifié ensuite)."""
+        records = np.fromfile(segment, dtype=RECORD_DTYPE)
+        opening_order, opening_offsets = _csr(_opening_keys(records), N_OPENING_KEYS)
+        outcome_order, outcome_offsets = _csr((records["outcome"].astype(np.int64) + 1), 3)
+        tmp = self._index_path(segment) + ".tmp.npz"
+        np.savez(
+            tmp,
+            opening_order=opening_order,
+            opening_offsets=opening_offsets,
+            outcome_order=outcome_order,
+            outcome_offsets=outcome_offsets,
+        )
+        os.replace(tmp, self._index_path(segment))
+
+    # --- écriture ---
+    def append(
+        self,
+        moves: Sequence[int],
+        mode: str = "inconnu",
+        difficulte: Optional[str] = None,
+        outcome: int = 0,
+        ai_player: int = 0,
+        model_version: int = 0,
+        duration_ms: int = 0,
+        timestamp: Optional[int] = None,
+    ) -> None:
+        """Ajoute une partie (coups 0-8 dans l'ordre, `outcome`: 1 = X gagne, -1 = O gagne, 0 = nul)."""
+        if len(moves) > 9:
+            raise ValueError(f"Partie trop longue: {len(moves)} coups")
+        self._buffer.append(
+            (
+                encode_moves(moves),
+                int(time.time()) if timestamp is None else int(timestamp),
+                max(0, int(duration_ms)),
+                int(model_version or 0),
+                len(moves),
+                MODES.index(mode) if mode in MODES else 0,
+                DIFFICULTES.index(difficulte) if difficulte in DIFFICULTES else 0,
+                int(outcome),
+                int(ai_player),
+                0,
+            )
+        )
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def append_records(self, records: np.ndarray) -> None:
+        """Ajout en masse d'enregistrements déjà encodés (`RECORD_DTYPE`)."""
+        self.flush()
+        self._write(np.asarray(records, dtype=RECORD_DTYPE))
+
+    def flush(self) -> None:
+        if self._buffer:
+            records = np.array(self._buffer, dtype=RECORD_DTYPE)
+            self._buffer.clear()
+            self._write(records)
+
+    @contextlib.contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Verrou exclusif du dossier entre processus écrivains (rien sans `fcntl`)."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, WRITER_LOCK), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)  # libéré à la fermeture du fichier
+            yield
+
+    def _write(self, records: np.ndarray) -> None:
+        pos = 0
+        with self._write_lock():
+            # segment actif et nombre de lignes relus sous le verrou: un autre écrivain a pu
+            # ajouter des lignes ou sceller le segment depuis notre dernière écriture
+            while pos < len(records):
+                segment = self._active_segment()
+                count = self._count(segment) if os.path.exists(segment) else 0
+                take = min(self.segment_records - count, len(records) - pos)
+                with open(segment, "ab") as f:
+                    records[pos:pos + take].tofile(f)
+                pos += take
+                if count + take >= self.segment_records:
+                    self.seal(segment)
+
+    def close(self) -> None:
+        self.flush()
+
+    # --- lecture ---
+    def _segment_rows(
+        self, segment: str, opening: Optional[Sequence[int]], outcome: Optional[int] = None
+    ) -> np.ndarray:
+        """Lignes du segment candidates pour `opening` / `outcome` (index du segment scellé)."""
+        n = self._count(segment)
+        if n == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        records = np.memmap(segment, dtype=RECORD_DTYPE, mode="r", shape=(n,))
+        index_path = self._index_path(segment)
+        if not (opening or outcome is not None) or not os.path.exists(index_path):
+            return records
+        rows = None
+        with np.load(index_path) as idx:
+            if opening:
+                order, offsets = idx["opening_order"], idx["opening_offsets"]
+                rows = np.sort(
+                    np.concatenate([order[offsets[lo]:offsets[hi]] for lo, hi in _opening_key_ranges(opening)])
+                )
+            if outcome is not None:
+                if outcome not in (-1, 0, 1):
+                    return records[:0]
+                order, offsets = idx["outcome_order"], idx["outcome_offsets"]
+                # clé = outcome + 1; ordre stable: lignes croissantes dans chaque clé
+                by_outcome = order[offsets[outcome + 1]:offsets[outcome + 2]]
+                rows = by_outcome if rows is None else np.intersect1d(rows, by_outcome, assume_unique=True)
+        return records[rows]
+
+    def query(
+        self,
+        opening: Optional[Sequence[int]] = None,
+        model_version: Optional[int] = None,
+        mode: Optional[str] = None,
+        difficulte: Optional[str] = None,
+        outcome: Optional[int] = None,
+        ai_player: Optional[int] = None,
+    ) -> np.ndarray:
+        """Enregistrements (RECORD_DTYPE) correspondant à tous les filtres fournis.
+
+        `opening`: préfixe de coups (cases 0-8), ex. [4, 0]
+        """
+        self.flush()
+        if opening:
+            mask_bits = (1 << (4 * len(opening))) - 1
+            pattern = encode_moves(opening)
+        parts = []
+        for segment in self.segments():
+            rec = self._segment_rows(segment, opening, outcome)
+            if len(rec) == 0:
+                continue
+            keep = np.ones(len(rec), dtype=bool)
+            if opening:
+                keep &= rec["n_moves"] >= len(opening)
+                keep &= (rec["moves"] & np.uint64(mask_bits)) == np.uint64(pattern)
+            if model_version is not None:
+                keep &= rec["model_version"] == model_version
+            if mode is not None:
+                keep &= rec["mode"] == MODES.index(mode)
+            if difficulte is not None:
+                keep &= rec["difficulty"] == DIFFICULTES.index(difficulte)
+            if outcome is not None:
+                keep &= rec["outcome"] == outcome
+            if ai_player is not None:
+                keep &= rec["ai_player"] == ai_player
+            parts.append(np.asarray(rec[keep]))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE)
+
+    def stats(self, **filters) -> Dict[str, float]:
+        """Comptes et taux du point de vue de l'IA (parties où `ai_player` != 0)."""
+        rec = self.query(**filters)
+        ai = rec[rec["ai_player"] != 0]
+        wins = int(np.count_nonzero(ai["outcome"] == ai["ai_player"]))
+        losses = int(np.count_nonzero(ai["outcome"] == -ai["ai_player"]))
+        n_ai = max(1, len(ai))
+        return {
+            "games": len(rec),
+            "ai_games": len(ai),
+            "ai_win_rate": wins / n_ai,
+            "ai_loss_rate": losses / n_ai,
+            "draw_rate": float(np.count_nonzero(rec["outcome"] == 0)) / max(1, len(rec)),
+            "mean_moves": float(rec["n_moves"].mean()) if len(rec) else 0.0,
+            "mean_duration_ms": float(rec["duration_ms"].mean()) if len(rec) else 0.0,
+        }
+
+    def games(self, records: np.ndarray) -> List[List[int]]:
+        return [decode_moves(r["moves"], int(r["n_moves"])) for r in records]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Statistiques du journal des parties")
+    parser.add_argument("root", nargs="?", default=DEFAULT_GAME_LOG_DIR)
+    parser.add_argument("--opening", default=None, help="préfixe de coups (cases 0-8), ex: 4,0")
+    parser.add_argument("--model-version", type=int, default=None)
+    parser.add_argument("--mode", choices=MODES, default=None)
+    parser.add_argument("--difficulte", choices=DIFFICULTES[1:], default=None)
+    args = parser.parse_args()
+
+    opening = [int(c) for c in args.opening.split(",")] if args.opening else None
+    t0 = time.perf_counter()
+    stats = GameLog(args.root).stats(
+        opening=opening, model_version=args.model_version, mode=args.mode, difficulte=args.difficulte
+    )
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{stats['games']} parties ({stats['ai_games']} avec IA) | IA: victoire {stats['ai_win_rate'] * 100:.1f}% "
+        f"défaite {stats['ai_loss_rate'] * 100:.1f}% | nul {stats['draw_rate'] * 100:.1f}% | "
+        f"{stats['mean_moves']:.2f} coups en moyenne | requête {elapsed * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""jit_kernels.py
+
+Noyaux compilés (Numba, optionnel) pour l'environnement et la recherche Minimax.
+
+Les plateaux sont des tableaux NumPy int8 de 9 cases en convention absolue (1 = X, -1 = O,
+0 = vide), comme `tictactoe_env`. Le moteur est choisi à l'import:
+
+- 'numba'  : Numba installé (et `MORPION_JIT` différent de "0") -> fonctions compilées en code
+             natif au premier appel (cache disque dans __pycache__, pas de recompilation ensuite)
+- 'python' : repli sur les mêmes fonctions interprétées (résultats identiques, plus lentes)
+
+Noyaux:
+- `check_winner_arr`, `valid_actions_arr`, `to_perspective_arr`: équivalents de `tictactoe_env`
+- `minimax_arr` / `best_move_arr`: Minimax alpha-bêta de `morpion.IntelligenceArtificielle`
+  (mêmes scores, même ordre de parcours, donc mêmes coups)
+- `random_selfplay`: parties aléatoires complètes jouées entièrement dans le noyau
+
+L'intérêt vient des boucles exécutées à l'intérieur du code compilé (recherche, parties
+entières): appelées une à une depuis Python sur des listes, les fonctions de `tictactoe_env`
+restent plus rapides (coût d'appel et de conversion), elles ne sont donc pas remplacées.
+
+Exemple:
+    python jit_kernels.py --benchmark
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+try:
+    if os.environ.get("MORPION_JIT", "1") == "0":
+        raise ImportError("JIT désactivé (MORPION_JIT=0)")
+    from numba import njit
+    BACKEND = "numba"
+except ImportError:
+    # Repli: mêmes noyaux, exécutés par l'interpréteur.
+    BACKEND = "python"
+
+    def njit(*args, **kwargs):  # type: ignore[no-redef]
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+NON_TERMINAL = 100  # hors de l'intervalle des scores [-10, 10]
+
+# Combinaisons gagnantes (même ordre que tictactoe_env.WIN_COMBOS)
+WIN_COMBOS_ARR = np.array(
+    [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)], dtype=np.int64
+)
+
+
+@njit(cache=True)
+def check_winner_arr(board: np.ndarray) -> int:
+    for k in range(8):
+        s = board[WIN_COMBOS_ARR[k, 0]] + board[WIN_COMBOS_ARR[k, 1]] + board[WIN_COMBOS_ARR[k, 2]]
+        if s == 3:
+            return 1
+        if s == -3:
+            return -1
+    return 0
+
+
+@njit(cache=True)
+def _is_full(board: np.ndarray) -> bool:
+    for i in range(9):
+        if board[i] == 0:
+            return False
+    return True
+
+
+@njit(cache=True)
+def valid_actions_arr(board: np.ndarray) -> np.ndarray:
+    out = np.empty(9, dtype=np.int64)
+    n = 0
+    for i in range(9):
+        if board[i] == 0:
+            out[n] = i
+            n += 1
+    return out[:n]
+
+
+@njit(cache=True)
+def to_perspective_arr(board: np.ndarray, player: int) -> np.ndarray:
+    out = np.empty(9, dtype=np.int8)
+    for i in range(9):
+        out[i] = board[i] * player
+    return out
+
+
+@njit(cache=True)
+def _score_terminal(board: np.ndarray, ia: int, profondeur: int) -> int:
+    """Score d'une position terminale, `NON_TERMINAL` sinon."""
+    gagnant = check_winner_arr(board)
+    if gagnant == ia:
+        return 10 - profondeur
+    if gagnant == -ia:
+        return profondeur - 10
+    if _is_full(board):
+        return 0
+    return NON_TERMINAL
+
+
+@njit(cache=True)
+def minimax_arr(board: np.ndarray, ia: int, profondeur: int, est_maximisant: bool, alpha: int, beta: int) -> int:
+    """Score Minimax (10 - profondeur si `ia` gagne, profondeur - 10 s'il perd, 0 si nul).
+
+    Même parcours et mêmes coupures alpha-bêta que `IntelligenceArtificielle.minimax`, écrit avec
+    une pile explicite (Numba ne sait pas mettre en cache une fonction récursive).
+    `board` est modifié pendant la recherche puis restauré.
+    """
+    score = _score_terminal(board, ia, profondeur)
+    if score != NON_TERMINAL:
+        return score
+
+    # un niveau de pile par coup joué (au plus 9)
+    prochain = np.zeros(10, dtype=np.int64)  # prochaine case à essayer
+    joue = np.zeros(10, dtype=np.int64)  # case jouée pour descendre au niveau suivant
+    meilleur = np.zeros(10, dtype=np.int64)
+    alphas = np.zeros(10, dtype=np.int64)
+    betas = np.zeros(10, dtype=np.int64)
+    k = 0
+    alphas[0] = alpha
+    betas[0] = beta
+    meilleur[0] = -1000 if est_maximisant else 1000
+    while True:
+        maximisant = est_maximisant == (k % 2 == 0)
+        p = prochain[k]
+        while p < 9 and board[p] != 0:
+            p += 1
+        if p >= 9:
+            # niveau épuisé (ou coupé): remonter son score au parent
+            score = meilleur[k]
+            if k == 0:
+                return score
+            k -= 1
+            board[joue[k]] = 0
+            maximisant = not maximisant
+        else:
+            prochain[k] = p + 1
+            joue[k] = p
+            board[p] = ia if maximisant else -ia
+            score = _score_terminal(board, ia, profondeur + k + 1)
+            if score == NON_TERMINAL:
+                k += 1
+                prochain[k] = 0
+                alphas[k] = alphas[k - 1]
+                betas[k] = betas[k - 1]
+                meilleur[k] = 1000 if maximisant else -1000
+                continue
+            board[p] = 0
+
+        # intégrer le score de l'enfant au niveau k
+        if maximisant:
+            meilleur[k] = max(meilleur[k], score)
+            alphas[k] = max(alphas[k], score)
+        else:
+            meilleur[k] = min(meilleur[k], score)
+            betas[k] = min(betas[k], score)
+        if betas[k] <= alphas[k]:
+            prochain[k] = 9  # élagage
+
+
+@njit(cache=True)
+def best_move_arr(board: np.ndarray, ia: int) -> int:
+    """Premier coup de score maximal (comme `IntelligenceArtificielle.meilleur_coup`), -1 si plein."""
+    meilleur_score = -1000
+    meilleur_position = -1
+    for position in range(9):
+        if board[position] != 0:
+            continue
+        if meilleur_position == -1:
+            meilleur_position = position
+        board[position] = ia
+        score = minimax_arr(board, ia, 0, False, -1000, 1000)
+        board[position] = 0
+        if score > meilleur_score:
+            meilleur_score = score
+            meilleur_position = position
+    return meilleur_position
+
+
+@njit(cache=True)
+def random_selfplay(n_games: int, seed: int) -> np.ndarray:
+    """Joue `n_games` parties aléatoires; retourne [victoires X, victoires O, nuls]."""
+    np.random.seed(seed)
+    resultats = np.zeros(3, dtype=np.int64)
+    board = np.zeros(9, dtype=np.int8)
+    for _ in range(n_games):
+        board[:] = 0
+        joueur = 1
+        while True:
+            coups = valid_actions_arr(board)
+            board[coups[np.random.randint(0, len(coups))]] = joueur
+            gagnant = check_winner_arr(board)
+            if gagnant != 0:
+                resultats[0 if gagnant == 1 else 1] += 1
+                break
+            if _is_full(board):
+                resultats[2] += 1
+                break
+            joueur = -joueur
+    return resultats
+
+
+def board_from_chars(plateau: Sequence[str]) -> np.ndarray:
+    """Plateau en caractères ('X', 'O', ' ') -> tableau int8 absolu."""
+    return np.array([1 if c == 'X' else (-1 if c == 'O' else 0) for c in plateau], dtype=np.int8)
+
+
+def _bench(fn, repeats: int) -> float:
+    fn()  # compilation (ou chargement du cache) hors mesure
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+
+def benchmark() -> List[Dict[str, object]]:
+    """Compare les noyaux à leurs équivalents Python (listes) du projet."""
+    import random
+
+    from morpion import IntelligenceArtificielle
+    from tictactoe_env import check_winner, valid_actions
+
+    rows: List[Dict[str, object]] = []
+
+    def add(nom: str, t_python: float, t_noyau: float, unite: str) -> None:
+        rows.append({"noyau": nom, "python": t_python, "compile": t_noyau, "unite": unite,
+                     "acceleration": t_python / t_noyau if t_noyau > 0 else float("inf")})
+
+    vide = [' '] * 9
+    ia = IntelligenceArtificielle('X', 'O')
+    t_py = _bench(lambda: ia._meilleur_coup_python(list(vide)), 3)
+    t_jit = _bench(lambda: best_move_arr(board_from_chars(vide), 1), 3)
+    add("minimax (plateau vide)", t_py * 1e3, t_jit * 1e3, "ms")
+
+    n = 20_000
+    rng = random.Random(0)
+
+    def parties_python() -> None:
+        for _ in range(n):
+            b = [0] * 9
+            joueur = 1
+            while True:
+                b[rng.choice(valid_actions(b))] = joueur
+                if check_winner(b) != 0 or all(v != 0 for v in b):
+                    break
+                joueur = -joueur
+
+    t_py = _bench(parties_python, 1)
+    t_jit = _bench(lambda: random_selfplay(n, 0), 1)
+    add(f"{n} parties aléatoires", t_py * 1e3, t_jit * 1e3, "ms")
+
+    b_list = [1, -1, 0, 0, 1, 0, -1, 0, 0]
+    b_arr = np.array(b_list, dtype=np.int8)
+    t_py = _bench(lambda: check_winner(b_list), 50_000)
+    t_jit = _bench(lambda: check_winner_arr(b_arr), 50_000)
+    add("check_winner (un appel)", t_py * 1e6, t_jit * 1e6, "µs")
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Noyaux JIT (Numba) de l'environnement et du Minimax")
+    parser.add_argument("--benchmark", action="store_true", help="compare aux versions Python du projet")
+    args = parser.parse_args()
+    print(f"Moteur: {BACKEND}")
+    if args.benchmark:
+        for r in benchmark():
+            print(f"{r['noyau']:<26} python {r['python']:9.3f} {r['unite']} | {BACKEND} {r['compile']:9.3f} "
+                  f"{r['unite']} | x{r['acceleration']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
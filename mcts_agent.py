@@ -0,0 +1,251 @@
+"""mcts_agent.py
+
+Monte Carlo Tree Search (PUCT) guidé par le `QNetwork` du DQN.
+
+- Priors: softmax des Q-values sur les coups valides
+- Valeur d'une feuille: max des Q-values valides (point de vue du joueur qui doit jouer)
+- Évaluation par lots: plusieurs simulations sont lancées en parallèle grâce à la
+  "virtual loss", leurs feuilles sont évaluées en un seul forward pass
+- Réutilisation de l'arbre: le sous-arbre du coup joué (et de la réponse adverse) est conservé
+- Budget: nombre de simulations et/ou temps maximal par coup
+
+`MCTSAgent` expose la même interface que `DQNAgent` (`select_action`, `remember`,
+`train_step`, `save`, `load`, `set_epsilon_for_difficulty`): l'apprentissage est délégué
+à l'agent DQN encapsulé, seule la sélection de coup change.
+
+Convention: les états sont toujours vus par le joueur qui doit jouer (1 = moi, -1 = adversaire).
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dqn_agent import DQNAgent
+from tictactoe_env import Transition, check_winner
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_MCTS_SIMULATIONS = 200
+DEFAULT_MCTS_BATCH_SIZE = 16
+DEFAULT_MCTS_C_PUCT = 1.5
+DEFAULT_MCTS_PRIOR_TEMPERATURE = 0.5
+DEFAULT_MCTS_VIRTUAL_LOSS = 1.0
+
+
+StateKey = Tuple[int, ...]
+# Évaluateur: liste d'états -> liste de vecteurs Q (9 valeurs)
+Evaluator = Callable[[List[StateKey]], List[List[float]]]
+
+
+@dataclass
+class MCTSConfig:
+    simulations: int = DEFAULT_MCTS_SIMULATIONS
+    time_budget_s: Optional[float] = None  # None = pas de limite de temps
+    batch_size: int = DEFAULT_MCTS_BATCH_SIZE  # feuilles évaluées par forward pass
+    c_puct: float = DEFAULT_MCTS_C_PUCT
+    prior_temperature: float = DEFAULT_MCTS_PRIOR_TEMPERATURE
+    virtual_loss: float = DEFAULT_MCTS_VIRTUAL_LOSS
+    reuse_tree: bool = True
+
+
+class Node:
+    __slots__ = ("state", "prior", "children", "n", "w", "terminal_value", "expanded")
+
+    def __init__(self, state: StateKey, prior: float = 0.0):
+        self.state = state
+        self.prior = prior
+        self.children: Dict[int, "Node"] = {}
+        self.n = 0.0
+        self.w = 0.0  # somme des valeurs, point de vue du joueur qui doit jouer en ce nœud
+        self.terminal_value: Optional[float] = None
+        self.expanded = False
+
+
+def _child_state(state: StateKey, action: int) -> StateKey:
+    # Je joue `action`, puis la perspective passe à l'adversaire.
+    child = [-v for v in state]
+    child[action] = -1
+    return tuple(child)
+
+
+def _terminal_value(state: StateKey) -> Optional[float]:
+    """Valeur pour le joueur qui doit jouer: -1 si l'adversaire vient de gagner, 0 si nul."""
+    if check_winner(list(state)) == -1:
+        return -1.0
+    if all(v != 0 for v in state):
+        return 0.0
+    return None
+
+
+class MCTSAgent:
+    def __init__(
+        self,
+        agent: DQNAgent,
+        config: Optional[MCTSConfig] = None,
+        evaluator: Optional[Evaluator] = None,
+    ):
+        self.agent = agent
+        self.mcts_config = config or MCTSConfig()
+        self.evaluator = evaluator or self._evaluate_with_network
+        self.epsilon = 0.0
+        self.root: Optional[Node] = None
+        self.last_simulations = 0
+
+    # --- interface commune avec DQNAgent (apprentissage délégué) ---
+    @property
+    def config(self):
+        return self.agent.config
+
+    def set_epsilon_for_difficulty(self, difficulte: str) -> None:
+        self.agent.set_epsilon_for_difficulty(difficulte)
+        self.epsilon = self.agent.epsilon
+
+    def remember(self, transition: Transition) -> None:
+        self.agent.remember(transition)
+
+    def train_step(self) -> Optional[float]:
+        return self.agent.train_step()
+
+    def save(self, path: str) -> None:
+        self.agent.save(path)
+
+    def load(self, path: str) -> bool:
+        self.root = None
+        return self.agent.load(path)
+
+    @property
+    def frozen(self) -> bool:
+        return self.agent.frozen
+
+    def stop_prefetch(self) -> None:
+        self.agent.stop_prefetch()
+
+    # --- recherche ---
+    def _evaluate_with_network(self, states: List[StateKey]) -> List[List[float]]:
+        # passe par le cache d'inférence du DQN (un seul forward pour les états absents)
+        return self.agent.q_values_batch(states)
+
+    def _expand(self, node: Node, q_values: List[float]) -> float:
+        valid = [i for i, v in enumerate(node.state) if v == 0]
+        t = max(1e-6, self.mcts_config.prior_temperature)
+        m = max(q_values[a] for a in valid)
+        exps = [math.exp((q_values[a] - m) / t) for a in valid]
+        z = sum(exps)
+        for a, e in zip(valid, exps):
+            if a not in node.children:
+                node.children[a] = Node(_child_state(node.state, a), e / z)
+            else:
+                node.children[a].prior = e / z
+        node.expanded = True
+        return max(-1.0, min(1.0, m))
+
+    def _select_child(self, node: Node) -> Tuple[int, Node]:
+        c = self.mcts_config.c_puct
+        sqrt_n = math.sqrt(node.n + 1.0)
+        best_score = -float("inf")
+        best: Tuple[int, Node] = next(iter(node.children.items()))
+        for a, child in node.children.items():
+            q = -child.w / child.n if child.n > 0 else 0.0
+            score = q + c * child.prior * sqrt_n / (1.0 + child.n)
+            if score > best_score:
+                best_score = score
+                best = (a, child)
+        return best
+
+    def _collect_leaf(self, root: Node) -> Tuple[List[Node], Node]:
+        vl = self.mcts_config.virtual_loss
+        path = [root]
+        node = root
+        while node.expanded and node.terminal_value is None and node.children:
+            _, node = self._select_child(node)
+            path.append(node)
+        # virtual loss: la feuille paraît perdante pour le parent tant qu'elle n'est pas évaluée
+        for n in path:
+            n.n += vl
+            n.w += vl
+        return path, node
+
+    def _backup(self, path: List[Node], value: float) -> None:
+        vl = self.mcts_config.virtual_loss
+        # `value` est du point de vue du joueur qui doit jouer à la feuille
+        for node in reversed(path):
+            node.n += 1.0 - vl
+            node.w += value - vl
+            value = -value
+
+    def _find_root(self, state: StateKey) -> Node:
+        if self.mcts_config.reuse_tree and self.root is not None:
+            if self.root.state == state:
+                return self.root
+            # sous-arbre après la réponse adverse
+            for child in self.root.children.values():
+                if child.state == state:
+                    return child
+                for grandchild in child.children.values():
+                    if grandchild.state == state:
+                        return grandchild
+        return Node(state, 1.0)
+
+    def search(self, state: StateKey) -> Node:
+        """Lance les simulations depuis `state` et retourne la racine."""
+        cfg = self.mcts_config
+        root = self._find_root(state)
+        root.terminal_value = _terminal_value(root.state)
+        deadline = time.perf_counter() + cfg.time_budget_s if cfg.time_budget_s else None
+
+        done = 0
+        while done < cfg.simulations:
+            if deadline is not None and time.perf_counter() >= deadline and done > 0:
+                break
+            batch = min(cfg.batch_size, cfg.simulations - done)
+            pending: List[Tuple[List[Node], Node]] = []
+            for _ in range(batch):
+                path, leaf = self._collect_leaf(root)
+                if leaf.terminal_value is None and not leaf.expanded:
+                    tv = _terminal_value(leaf.state)
+                    if tv is not None:
+                        leaf.terminal_value = tv
+                if leaf.terminal_value is not None:
+                    self._backup(path, leaf.terminal_value)
+                else:
+                    pending.append((path, leaf))
+            done += batch
+
+            if pending:
+                unique: Dict[int, Node] = {id(leaf): leaf for _, leaf in pending}
+                leaves = list(unique.values())
+                q_batch = self.evaluator([leaf.state for leaf in leaves])
+                values = {id(leaf): self._expand(leaf, q) for leaf, q in zip(leaves, q_batch)}
+                for path, leaf in pending:
+                    self._backup(path, values[id(leaf)])
+
+        self.last_simulations = done
+        self.root = root
+        return root
+
+    def select_action(self, state: List[float], valid: List[int], training: bool = False) -> int:
+        if not valid:
+            return -1
+        if random.random() < self.epsilon:
+            return random.choice(valid)
+
+        root = self.search(tuple(int(v) for v in state))
+        visits = {a: root.children[a].n for a in valid if a in root.children}
+        if not visits:
+            return random.choice(valid)
+
+        if training:
+            # exploration proportionnelle au nombre de visites
+            actions = list(visits)
+            action = random.choices(actions, weights=[visits[a] + 1e-6 for a in actions])[0]
+        else:
+            action = max(visits, key=lambda a: visits[a])
+
+        self.root = root.children.get(action) if self.mcts_config.reuse_tree else None
+        return action
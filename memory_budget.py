@@ -0,0 +1,186 @@
+"""memory_budget.py
+
+Comptabilité mémoire et budget par processus (entraînement et jeu).
+
+- `rss_bytes` / `peak_rss_bytes`: mémoire résidente actuelle et maximale du processus
+- `replay_entry_bytes(mode)`: coût d'une entrée de replay selon le mode de stockage
+- `memory_report(agent)`: empreinte du modèle, du target, de l'optimizer, du replay et du
+  cache d'inférence, plus RSS (et pic tracemalloc si le traçage est actif)
+- `MemoryBudget`: dimensionne le replay et le cache pour tenir dans une limite, puis vérifie
+  périodiquement le RSS; au-delà de la limite, `MemoryBudgetExceeded` est levée
+  (le processus s'arrête proprement au lieu d'être tué par l'OOM killer)
+
+Exemple:
+    agent = DQNAgent(DQNConfig(memory_budget_mb=512))   # replay_capacity ajusté au budget
+    print(format_report(memory_report(agent)))
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tracemalloc
+from typing import Dict, Iterable
+
+try:
+    import resource
+except ImportError:
+    # Windows: pas de module resource (pic RSS indisponible)
+    resource = None  # type: ignore[assignment]
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_MEMORY_CHECK_EVERY = 1024  # transitions ajoutées entre deux lectures du RSS
+DEFAULT_MEMORY_SAFETY_MB = 16  # marge gardée en réserve (fragmentation, pics d'allocation)
+
+# Coût d'une entrée de replay (octets, mesuré avec tracemalloc), voir `replay_entry_bytes`
+_REPLAY_ENTRY_BYTES = {
+    # objet Transition + 3 listes de 9 flottants + objets float
+    "transitions": 1_200,
+    # uint16 s, uint8 a, float32 r, uint16 s', bool done, uint8 n
+    "indexed": 11,
+    # tableaux de "indexed" + compte, clé (entier Python) + entrée de dict, case dans la fenêtre
+    "dedup": 200,
+}
+# Une entrée du cache d'inférence: clé (tuple de 9 flottants) + (version, liste de 9 flottants)
+Q_CACHE_ENTRY_BYTES = 1_100
+Q_CACHE_MAX_ENTRIES = 5_478  # nombre d'états atteignables (terminaux inclus)
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Le processus dépasse (ou dépasserait) son budget mémoire."""
+
+
+def rss_bytes() -> int:
+    """Mémoire résidente actuelle (0 si indisponible)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Pic de mémoire résidente depuis le démarrage (0 si indisponible)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: kilo-octets
+
+
+def tensors_bytes(tensors: Iterable) -> int:
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def module_bytes(module) -> int:
+    return tensors_bytes(list(module.parameters()) + list(module.buffers()))
+
+
+def optimizer_bytes(optimizer) -> int:
+    return tensors_bytes(
+        v for state in optimizer.state.values() for v in state.values() if hasattr(v, "element_size")
+    )
+
+
+def replay_entry_bytes(mode: str) -> int:
+    if mode not in _REPLAY_ENTRY_BYTES:
+        raise ValueError(f"Mode de replay inconnu: {mode}")
+    return _REPLAY_ENTRY_BYTES[mode]
+
+
+def replay_bytes(replay, mode: str) -> int:
+    """Mémoire occupée (tableaux préalloués: capacité entière) ou estimée (deque: entrées présentes)."""
+    if mode == "transitions":
+        return len(replay) * replay_entry_bytes(mode)
+    return getattr(replay, "capacity", len(replay)) * replay_entry_bytes(mode)
+
+
+def memory_report(agent) -> Dict[str, int]:
+    """Empreinte mémoire de l'agent et du processus (octets)."""
+    mode = getattr(agent.config, "replay_mode", "transitions")
+    report = {
+        "model": module_bytes(agent.q),
+        "target_model": module_bytes(agent.q_target),
+        "optimizer": optimizer_bytes(agent.optimizer),
+        "replay": replay_bytes(agent.replay, mode),
+        "replay_entries": len(agent.replay),
+        "replay_entry": replay_entry_bytes(mode),
+        "q_cache": len(getattr(agent, "_q_cache", {})) * Q_CACHE_ENTRY_BYTES,
+        "rss": rss_bytes(),
+        "peak_rss": peak_rss_bytes(),
+    }
+    if tracemalloc.is_tracing():
+        report["tracemalloc_current"], report["tracemalloc_peak"] = tracemalloc.get_traced_memory()
+    budget = getattr(agent, "memory_budget", None)
+    if budget is not None:
+        report["budget"] = budget.limit_bytes
+    return report
+
+
+def format_report(report: Dict[str, int]) -> str:
+    def mb(b: int) -> str:
+        return f"{b / 2**20:.1f} Mo" if b >= 2**20 else f"{b / 1024:.0f} ko"
+
+    parts = [
+        f"modèle {mb(report['model'])}",
+        f"target {mb(report['target_model'])}",
+        f"optimizer {mb(report['optimizer'])}",
+        f"replay {mb(report['replay'])} ({report['replay_entries']} x {report['replay_entry']} o)",
+        f"cache Q {mb(report['q_cache'])}",
+        f"RSS {mb(report['rss'])} (pic {mb(report['peak_rss'])})",
+    ]
+    if "tracemalloc_peak" in report:
+        parts.append(f"tracemalloc pic {mb(report['tracemalloc_peak'])}")
+    if "budget" in report:
+        parts.append(f"budget {mb(report['budget'])}")
+    return " | ".join(parts)
+
+
+class MemoryBudget:
+    """Limite de mémoire résidente pour un processus.
+
+    - `fit_replay_capacity`: capacité de replay maximale compte tenu du RSS actuel
+    - `tick` (à chaque transition ajoutée): relit le RSS toutes les `check_every` fois
+    - `check`: lève `MemoryBudgetExceeded` si le RSS dépasse la limite
+    """
+
+    def __init__(
+        self,
+        limit_bytes: int,
+        check_every: int = DEFAULT_MEMORY_CHECK_EVERY,
+        safety_mb: float = DEFAULT_MEMORY_SAFETY_MB,
+    ):
+        self.limit_bytes = int(limit_bytes)
+        self.check_every = max(1, check_every)
+        self.safety_bytes = int(safety_mb * 2**20)
+        self._ticks = 0
+
+    @classmethod
+    def from_mb(cls, mb: float, **kwargs) -> "MemoryBudget":
+        return cls(int(mb * 2**20), **kwargs)
+
+    def available_bytes(self, reserved: int = 0) -> int:
+        return self.limit_bytes - self.safety_bytes - rss_bytes() - reserved
+
+    def fit_replay_capacity(self, mode: str, requested: int, reserved: int = 0) -> int:
+        """Plus grande capacité <= `requested` qui tient dans le budget restant."""
+        fit = max(0, self.available_bytes(reserved)) // replay_entry_bytes(mode)
+        return int(min(requested, fit))
+
+    def fits_q_cache(self, reserved: int = 0) -> bool:
+        return self.available_bytes(reserved) >= Q_CACHE_MAX_ENTRIES * Q_CACHE_ENTRY_BYTES
+
+    def check(self, context: str = "") -> None:
+        rss = rss_bytes()
+        if rss > self.limit_bytes:
+            where = f" ({context})" if context else ""
+            raise MemoryBudgetExceeded(
+                f"Budget mémoire dépassé{where}: RSS {rss / 2**20:.1f} Mo > {self.limit_bytes / 2**20:.1f} Mo"
+            )
+
+    def tick(self, context: str = "") -> None:
+        self._ticks += 1
+        if self._ticks % self.check_every == 0:
+            self.check(context)
@@ -0,0 +1,215 @@
+"""mmap_checkpoint.py
+
+Format de checkpoint projetable en mémoire (mmap), sans unpickling ni copie des tenseurs.
+
+Disposition du fichier:
+
+    [0:8]    magic b"MORPCKPT"
+    [8:12]   version du format (uint32, little-endian)
+    [12:16]  taille de l'en-tête JSON (uint32)
+    [16:...] en-tête JSON: {"kind", "meta", "tensors": [{name, dtype, shape, offset, nbytes}]}
+    puis chaque tenseur brut (little-endian, contigu), aligné sur une page (4096 octets)
+
+Deux types d'artefacts:
+- 'inference': poids du réseau online uniquement (ce dont un processus de jeu a besoin)
+- 'training' : réseau online + target + état de l'optimizer + compteurs (reprise d'entraînement)
+
+À la lecture, le fichier est projeté en mémoire en mode privé (copie à l'écriture):
+les tenseurs pointent directement dans les pages du fichier, partagées par tous les
+processus qui chargent le même modèle; une écriture (ex: pas d'optimizer) copie la page
+concernée sans jamais modifier le fichier.
+
+Exemple (conversion d'un checkpoint torch existant):
+    python mmap_checkpoint.py --model models/dqn_tictactoe.pt --out models/dqn_tictactoe.inference.ckpt
+    python mmap_checkpoint.py --model models/dqn_tictactoe.pt --out models/dqn_tictactoe.train.ckpt --training
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import torch
+
+
+MAGIC = b"MORPCKPT"
+FORMAT_VERSION = 1
+PAGE_SIZE = 4096
+KINDS = ("inference", "training")
+
+_PREFIX = struct.Struct("<8sII")
+
+_DTYPES: Dict[str, torch.dtype] = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "float64": torch.float64,
+    "int64": torch.int64,
+    "int32": torch.int32,
+    "int8": torch.int8,
+    "uint8": torch.uint8,
+    "bool": torch.bool,
+}
+_DTYPE_NAMES = {v: k for k, v in _DTYPES.items()}
+
+
+def _align(n: int) -> int:
+    return (n + PAGE_SIZE - 1) // PAGE_SIZE * PAGE_SIZE
+
+
+def is_mmap_checkpoint(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_checkpoint(path: str, tensors: Dict[str, torch.Tensor], meta: Dict[str, Any], kind: str) -> None:
+    """Écrit les tenseurs (CPU, contigus) et les métadonnées JSON. Écriture atomique (fichier temporaire)."""
+    if kind not in KINDS:
+        raise ValueError(f"Type d'artefact inconnu: {kind} (types: {', '.join(KINDS)})")
+    if sys.byteorder != "little":
+        raise RuntimeError("Format de checkpoint mmap: machine little-endian requise")
+
+    blobs: List[Tuple[Dict[str, Any], torch.Tensor]] = []
+    for name, t in tensors.items():
+        t = t.detach().to("cpu").contiguous()
+        if t.dtype not in _DTYPE_NAMES:
+            raise ValueError(f"Type de tenseur non supporté: {name} ({t.dtype})")
+        entry = {"name": name, "dtype": _DTYPE_NAMES[t.dtype], "shape": list(t.shape),
+                 "nbytes": t.numel() * t.element_size()}
+        blobs.append((entry, t))
+
+    # l'en-tête contient les offsets, qui dépendent de sa propre taille: on itère jusqu'à stabilité
+    data_start = PAGE_SIZE
+    while True:
+        offset = data_start
+        for entry, _ in blobs:
+            entry["offset"] = offset
+            offset = _align(offset + max(1, entry["nbytes"]))
+        header = json.dumps(
+            {"kind": kind, "meta": meta, "tensors": [e for e, _ in blobs]}, separators=(",", ":")
+        ).encode("utf-8")
+        needed = _align(_PREFIX.size + len(header))
+        if needed <= data_start:
+            break
+        data_start = needed
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for entry, t in blobs:
+            f.seek(entry["offset"])
+            if entry["nbytes"]:
+                f.write(t.numpy().tobytes())
+        f.truncate(offset)
+    os.replace(tmp, path)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: pas un checkpoint mmap")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: version de format {version} non supportée (attendue: {FORMAT_VERSION})")
+        return json.loads(f.read(header_len).decode("utf-8"))
+
+
+def read_checkpoint(path: str, mmap: bool = True) -> Tuple[Dict[str, torch.Tensor], Dict[str, Any]]:
+    """Lit un checkpoint.
+
+    Args:
+        mmap: True => tenseurs projetés depuis le fichier (aucune copie); False => lecture en mémoire
+
+    Returns:
+        (tenseurs par nom, en-tête {'kind', 'meta', 'tensors'})
+    """
+    header = read_header(path)
+    size = os.path.getsize(path)
+    if mmap:
+        storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=size)
+    else:
+        with open(path, "rb") as f:
+            storage = torch.frombuffer(bytearray(f.read()), dtype=torch.uint8).untyped_storage()
+
+    tensors: Dict[str, torch.Tensor] = {}
+    for entry in header["tensors"]:
+        dtype = _DTYPES[entry["dtype"]]
+        t = torch.empty(0, dtype=dtype)
+        itemsize = t.element_size()
+        t.set_(storage, entry["offset"] // itemsize, tuple(entry["shape"]))
+        tensors[entry["name"]] = t
+    return tensors, header
+
+
+def flatten_optimizer_state(state_dict: Dict[str, Any], prefix: str = "optimizer") -> Tuple[Dict[str, torch.Tensor], Dict[str, Any]]:
+    """Sépare l'état d'un optimizer en tenseurs (blobs) et partie JSON (hyperparamètres, scalaires)."""
+    tensors: Dict[str, torch.Tensor] = {}
+    state_json: Dict[str, Dict[str, Any]] = {}
+    for pid, pstate in state_dict["state"].items():
+        entry: Dict[str, Any] = {}
+        for k, v in pstate.items():
+            if torch.is_tensor(v):
+                name = f"{prefix}.{pid}.{k}"
+                tensors[name] = v
+                entry[k] = {"tensor": name}
+            else:
+                entry[k] = v
+        state_json[str(pid)] = entry
+    return tensors, {"state": state_json, "param_groups": state_dict["param_groups"]}
+
+
+def unflatten_optimizer_state(tensors: Dict[str, torch.Tensor], state_json: Dict[str, Any]) -> Dict[str, Any]:
+    state: Dict[int, Dict[str, Any]] = {}
+    for pid, entry in state_json["state"].items():
+        state[int(pid)] = {
+            k: tensors[v["tensor"]].clone() if isinstance(v, dict) and "tensor" in v else v
+            for k, v in entry.items()
+        }
+    return {"state": state, "param_groups": state_json["param_groups"]}
+
+
+def _time_load(fn, repeats: int = 20) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats * 1e3
+
+
+def main() -> None:
+    from dqn_agent import DQNAgent, load_inference_qnetwork
+
+    parser = argparse.ArgumentParser(description="Conversion d'un checkpoint DQN vers le format mmap")
+    parser.add_argument("--model", default="models/dqn_tictactoe.pt")
+    parser.add_argument("--out", default=None, help="défaut: <model>.inference.ckpt (ou .train.ckpt)")
+    parser.add_argument("--training", action="store_true", help="artefact complet (optimizer, target, compteurs)")
+    args = parser.parse_args()
+
+    agent = DQNAgent(device="cpu")
+    if not agent.load(args.model):
+        raise SystemExit(f"Modèle introuvable: {args.model}")
+    out = args.out or os.path.splitext(args.model)[0] + (".train.ckpt" if args.training else ".inference.ckpt")
+    agent.save_mmap(out, training=args.training)
+    print(f"Sauvegardé: {out} ({os.path.getsize(out)} o, {read_header(out)['kind']})")
+
+    t_torch = _time_load(lambda: agent.load(args.model))
+    t_mmap = _time_load(lambda: agent.load(out))
+    t_infer = _time_load(lambda: load_inference_qnetwork(out)) if not args.training else float("nan")
+    print(
+        f"chargement: torch.load {t_torch:.2f} ms -> mmap {t_mmap:.2f} ms"
+        + (f" | réseau d'inférence seul: {t_infer:.2f} ms" if not args.training else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""model_registry.py
+
+Registre local de modèles versionnés + surveillance pour rechargement à chaud.
+
+Disposition:
+
+    models/registry/
+        manifest.json      {"current": 3, "versions": [{version, file, sha256, created, metrics, note}, ...]}
+        v0001.pt
+        v0002.pt
+        v0003.ckpt         (les checkpoints mmap sont acceptés aussi)
+
+- `ModelRegistry.publish` copie un checkpoint, le valide puis met à jour le manifeste
+  (écriture atomique: fichier temporaire + `os.replace`).
+- `ModelWatcher` vérifie en tâche de fond (thread) si la version courante a changé,
+  charge et valide le nouveau modèle hors du thread de jeu; le jeu récupère ensuite
+  le chemin validé entre deux coups (`prendre_nouvelle_version`) sans redémarrer.
+
+Exemple:
+    python model_registry.py publish models/dqn_tictactoe.pt --min-non-loss 1.0 --note "bootstrap 3000"
+    python model_registry.py list
+    python model_registry.py promote 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_REGISTRY_DIR = "models/registry"
+DEFAULT_POLL_INTERVAL_S = 2.0
+
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class ModelVersion:
+    version: int
+    file: str
+    sha256: str
+    created: str
+    metrics: Dict[str, float] = field(default_factory=dict)
+    note: str = ""
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def validate_model(path: str, min_non_loss: Optional[float] = None) -> Dict[str, float]:
+    """Charge le modèle dans un agent neuf et vérifie qu'il est utilisable.
+
+    - le checkpoint se charge et tous les poids sont finis
+    - si `min_non_loss` est fourni: taux de non-défaite contre Minimax 'difficile' (X et O) >= seuil
+
+    Returns:
+        métriques mesurées (enregistrées dans le manifeste)
+
+    Raises:
+        ValueError si le modèle est invalide
+    """
+    from dqn_agent import DQNAgent
+
+    agent = DQNAgent(device="cpu")
+    if not agent.load(path):
+        raise ValueError(f"Modèle illisible: {path}")
+    for name, t in agent.q.state_dict().items():
+        if not all(math.isfinite(v) for v in t.flatten().tolist()):
+            raise ValueError(f"Poids non finis dans {path} ({name})")
+
+    metrics: Dict[str, float] = {}
+    if min_non_loss is not None:
+        from evaluation import evaluate_vs_minimax
+
+        metrics["non_loss_difficile"] = evaluate_vs_minimax(agent, games=2, difficulte="difficile")["non_loss"]
+        if metrics["non_loss_difficile"] < min_non_loss:
+            raise ValueError(
+                f"Modèle refusé: non-défaite {metrics['non_loss_difficile']:.2f} < {min_non_loss:.2f} contre Minimax"
+            )
+    return metrics
+
+
+class ModelRegistry:
+    def __init__(self, root: str = DEFAULT_REGISTRY_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST)
+
+    # --- manifeste ---
+    def _read(self) -> Dict[str, object]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"current": None, "versions": []}
+
+    def _write(self, manifest: Dict[str, object]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.manifest_path)
+
+    def versions(self) -> List[ModelVersion]:
+        return [ModelVersion(**v) for v in self._read()["versions"]]  # type: ignore[union-attr]
+
+    def current(self) -> Optional[ModelVersion]:
+        manifest = self._read()
+        for v in self.versions():
+            if v.version == manifest["current"]:
+                return v
+        return None
+
+    def path(self, version: ModelVersion) -> str:
+        return os.path.join(self.root, version.file)
+
+    def manifest_mtime(self) -> int:
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return 0
+
+    # --- publication ---
+    def publish(
+        self,
+        checkpoint: str,
+        metrics: Optional[Dict[str, float]] = None,
+        note: str = "",
+        promote: bool = True,
+        validator: Optional[Callable[[str], Dict[str, float]]] = validate_model,
+    ) -> ModelVersion:
+        """Ajoute `checkpoint` au registre (copie + validation) et en fait la version courante."""
+        manifest = self._read()
+        existing = manifest["versions"]  # type: ignore[assignment]
+        number = max((v["version"] for v in existing), default=0) + 1
+        ext = os.path.splitext(checkpoint)[1] or ".pt"
+        filename = f"v{number:04d}{ext}"
+        os.makedirs(self.root, exist_ok=True)
+        target = os.path.join(self.root, filename)
+        tmp = target + ".tmp"
+        shutil.copyfile(checkpoint, tmp)
+
+        try:
+            measured = validator(tmp) if validator is not None else {}
+        except Exception:
+            os.remove(tmp)
+            raise
+        os.replace(tmp, target)
+
+        version = ModelVersion(
+            version=number,
+            file=filename,
+            sha256=_sha256(target),
+            created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            metrics={**measured, **(metrics or {})},
+            note=note,
+        )
+        existing.append(asdict(version))  # type: ignore[union-attr]
+        if promote:
+            manifest["current"] = number
+        self._write(manifest)
+        return version
+
+    def promote(self, number: int) -> ModelVersion:
+        """Change la version courante (retour arrière possible)."""
+        manifest = self._read()
+        for v in self.versions():
+            if v.version == number:
+                manifest["current"] = number
+                self._write(manifest)
+                return v
+        raise KeyError(f"Version inconnue: {number}")
+
+
+class ModelWatcher:
+    """Surveille le registre et prépare (hors du thread de jeu) les nouvelles versions validées.
+
+    Usage (boucle de jeu):
+        watcher = ModelWatcher(registry, loaded_version=v.version).start()
+        ...
+        nouvelle = watcher.prendre_nouvelle_version()  # entre deux coups
+        if nouvelle is not None:
+            agent.load(registry.path(nouvelle))
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        loaded_version: Optional[int] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL_S,
+        validator: Optional[Callable[[str], Dict[str, float]]] = validate_model,
+    ):
+        self.registry = registry
+        self.loaded_version = loaded_version
+        self.poll_interval = poll_interval
+        self.validator = validator
+        self.last_error: Optional[str] = None
+        self._ready: Optional[ModelVersion] = None
+        self._rejected: Dict[int, str] = {}
+        self._seen_mtime = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> Optional[ModelVersion]:
+        """Une vérification (appelée par le thread, ou directement sans thread)."""
+        mtime = self.registry.manifest_mtime()
+        if mtime == self._seen_mtime:
+            return None
+        self._seen_mtime = mtime
+        candidate = self.registry.current()
+        if candidate is None or candidate.version == self.loaded_version or candidate.version in self._rejected:
+            return None
+        path = self.registry.path(candidate)
+        try:
+            if _sha256(path) != candidate.sha256:
+                raise ValueError(f"Empreinte SHA-256 incorrecte: {path}")
+            if self.validator is not None:
+                self.validator(path)
+        except Exception as e:
+            self._rejected[candidate.version] = str(e)
+            self.last_error = f"v{candidate.version} refusée: {e}"
+            return None
+        with self._lock:
+            self._ready = candidate
+        return candidate
+
+    def prendre_nouvelle_version(self) -> Optional[ModelVersion]:
+        """Version validée en attente (une seule fois), ou None."""
+        with self._lock:
+            ready, self._ready = self._ready, None
+        if ready is not None:
+            self.loaded_version = ready.version
+        return ready
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:  # le thread de surveillance ne doit jamais s'arrêter
+                self.last_error = str(e)
+
+    def start(self) -> "ModelWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1.0)
+            self._thread = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Registre local des modèles DQN")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY_DIR)
+    sub = parser.add_subparsers(dest="commande", required=True)
+
+    p_pub = sub.add_parser("publish", help="ajoute un checkpoint et le rend courant")
+    p_pub.add_argument("checkpoint")
+    p_pub.add_argument("--min-non-loss", type=float, default=None,
+                       help="refuse le modèle s'il perd contre Minimax 'difficile' (0..1)")
+    p_pub.add_argument("--note", default="")
+    p_pub.add_argument("--no-promote", action="store_true", help="ajoute sans changer la version courante")
+
+    sub.add_parser("list", help="liste les versions")
+    p_pro = sub.add_parser("promote", help="change la version courante")
+    p_pro.add_argument("version", type=int)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    if args.commande == "publish":
+        v = registry.publish(
+            args.checkpoint,
+            note=args.note,
+            promote=not args.no_promote,
+            validator=lambda p: validate_model(p, args.min_non_loss),
+        )
+        print(f"Publié: v{v.version} ({registry.path(v)}) {v.metrics}")
+    elif args.commande == "promote":
+        v = registry.promote(args.version)
+        print(f"Version courante: v{v.version}")
+    else:
+        current = registry.current()
+        for v in registry.versions():
+            mark = "*" if current is not None and v.version == current.version else " "
+            print(f"{mark} v{v.version:<4} {v.created} {v.file:<12} {v.metrics} {v.note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,26 @@ Auteur: Projet pédagogique IA
 Date: Décembre 2025
 """
 
+import argparse
+import json
 import random
 import copy
-from typing import List, Tuple, Optional
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple, Optional
+
+try:
+    # Minimax compilé (Numba) si disponible; sinon la version Python ci-dessous est utilisée.
+    from jit_kernels import BACKEND as JIT_BACKEND, best_move_arr, board_from_chars
+except ImportError:
+    JIT_BACKEND = "python"
+
+try:
+    # Jeu résolu une fois pour toutes (tables NumPy, voir state_index.py): le coup Minimax
+    # devient une lecture de table au lieu d'une recherche
+    from state_index import index_from_chars, move_scores
+except ImportError:
+    move_scores = None
 
 
 class Morpion:
@@ -19,6 +36,7 @@ class Morpion:
         self.joueur_humain = 'X'
         self.joueur_ia = 'O'
         self.joueur_actuel = self.joueur_humain
+        self.coups: List[int] = []  # cases jouées dans l'ordre (journal des parties)
     
     def afficher_plateau(self):
         """Affiche le plateau de jeu dans la console de manière claire et lisible"""
@@ -60,6 +78,7 @@ class Morpion:
         """
         if self.case_disponible(position):
             self.plateau[position] = symbole
+            self.coups.append(position)
             return True
         return False
     
@@ -112,21 +131,25 @@ class Morpion:
         """Réinitialise le plateau pour une nouvelle partie"""
         self.plateau = [' ' for _ in range(9)]
         self.joueur_actuel = self.joueur_humain
+        self.coups = []
 
 
 class IntelligenceArtificielle:
     """Classe gérant l'intelligence artificielle avec l'algorithme Minimax"""
     
-    def __init__(self, symbole_ia: str, symbole_joueur: str):
+    def __init__(self, symbole_ia: str, symbole_joueur: str, rng: Optional[random.Random] = None):
         """
         Initialise l'IA
         
         Args:
             symbole_ia: Symbole de l'IA ('X' ou 'O')
             symbole_joueur: Symbole du joueur humain
+            rng: Générateur aléatoire pour les modes facile/moyen
+                 (par défaut le module `random`; passer un `random.Random(graine)` pour des parties reproductibles)
         """
         self.symbole_ia = symbole_ia
         self.symbole_joueur = symbole_joueur
+        self.rng = rng if rng is not None else random
     
     def minimax(self, plateau: List[str], profondeur: int, est_maximisant: bool, 
                 alpha: float = float('-inf'), beta: float = float('inf')) -> int:
@@ -200,15 +223,38 @@ class IntelligenceArtificielle:
         
         if difficulte == 'facile':
             # Mode facile : coups aléatoires
-            return random.choice(cases_disponibles)
+            return self.rng.choice(cases_disponibles)
         
         elif difficulte == 'moyen':
             # Mode moyen : 50% Minimax, 50% aléatoire
-            if random.random() < 0.5:
-                return random.choice(cases_disponibles)
+            if self.rng.random() < 0.5:
+                return self.rng.choice(cases_disponibles)
             # Sinon, utilise Minimax avec profondeur limitée
         
         # Mode difficile ou moyen (partie Minimax) : utilise l'algorithme complet
+        if move_scores is not None:
+            return self._meilleur_coup_table(plateau)
+        if JIT_BACKEND == "numba":
+            return int(best_move_arr(board_from_chars(plateau), 1 if self.symbole_ia == 'X' else -1))
+        return self._meilleur_coup_python(plateau)
+
+    def _meilleur_coup_table(self, plateau: List[str]) -> int:
+        """Même coup que `_meilleur_coup_python`: première case (ordre croissant) de score maximal.
+
+        Les scores de `state_index.move_scores` et de `minimax` classent les issues de la même
+        façon (victoire la plus rapide, puis nul, puis défaite la plus lente).
+        """
+        scores = move_scores(index_from_chars(plateau, self.symbole_ia))
+        if not scores:  # partie déjà gagnée, cases vides restantes
+            return self._meilleur_coup_python(plateau)
+        meilleur = max(s for _, s in scores)
+        return min(a for a, s in scores if s == meilleur)
+
+    def _meilleur_coup_python(self, plateau: List[str]) -> int:
+        """Recherche Minimax complète en Python (référence du noyau compilé `jit_kernels.best_move_arr`)"""
+        cases_disponibles = [i for i, c in enumerate(plateau) if c == ' ']
+        if not cases_disponibles:
+            return -1
         meilleur_score = float('-inf')
         meilleur_position = cases_disponibles[0]
         
@@ -227,12 +273,19 @@ class IntelligenceArtificielle:
 class JeuMorpion:
     """Classe principale gérant le déroulement du jeu"""
     
-    def __init__(self):
-        """Initialise le jeu"""
+    def __init__(self, journal=None):
+        """
+        Initialise le jeu
+        
+        Args:
+            journal: GameLog optionnel (game_log.py) où chaque partie terminée est enregistrée
+        """
         self.jeu = Morpion()
         self.ia = None
         self.mode_jeu = None
         self.difficulte = None
+        self.journal = journal
+        self.debut_partie = 0.0
     
     def afficher_menu_principal(self):
         """Affiche le menu principal du jeu"""
@@ -348,10 +401,27 @@ class JeuMorpion:
             return 'nul'
         return None
     
+    def journaliser_partie(self, resultat: str, mode: str, joueur_ia: Optional[str] = None,
+                           difficulte: Optional[str] = None):
+        """Enregistre la partie terminée dans le journal (si activé)"""
+        if self.journal is None:
+            return
+        camps = {'X': 1, 'O': -1}
+        self.journal.append(
+            self.jeu.coups,
+            mode=mode,
+            difficulte=difficulte,
+            outcome=camps.get(resultat, 0),
+            ai_player=camps.get(joueur_ia, 0),
+            duration_ms=int((time.perf_counter() - self.debut_partie) * 1000),
+        )
+        self.journal.flush()
+    
     def jouer_partie_contre_ia(self):
         """Lance une partie contre l'IA"""
         self.difficulte = self.choisir_difficulte()
         self.jeu.reinitialiser()
+        self.debut_partie = time.perf_counter()
         self.ia = IntelligenceArtificielle(self.jeu.joueur_ia, self.jeu.joueur_humain)
         
         print(f"\n🎮 Partie lancée en mode {self.difficulte.upper()}")
@@ -370,6 +440,7 @@ class JeuMorpion:
             if resultat:
                 self.jeu.afficher_plateau()
                 self.afficher_resultat(resultat)
+                self.journaliser_partie(resultat, "console_ia", self.jeu.joueur_ia, self.difficulte)
                 return
             
             # Tour de l'IA
@@ -380,11 +451,13 @@ class JeuMorpion:
             if resultat:
                 self.jeu.afficher_plateau()
                 self.afficher_resultat(resultat)
+                self.journaliser_partie(resultat, "console_ia", self.jeu.joueur_ia, self.difficulte)
                 return
     
     def jouer_partie_deux_joueurs(self):
         """Lance une partie entre deux joueurs humains"""
         self.jeu.reinitialiser()
+        self.debut_partie = time.perf_counter()
         
         print("\n🎮 Mode deux joueurs")
         print(f"Joueur 1 : X")
@@ -406,6 +479,7 @@ class JeuMorpion:
             if resultat:
                 self.jeu.afficher_plateau()
                 self.afficher_resultat(resultat)
+                self.journaliser_partie(resultat, "console_2joueurs")
                 return
             
             # Changer de joueur
@@ -414,6 +488,7 @@ class JeuMorpion:
     def jouer_partie_ia_vs_ia(self):
         """Lance une démonstration IA contre IA"""
         self.jeu.reinitialiser()
+        self.debut_partie = time.perf_counter()
         ia1 = IntelligenceArtificielle('X', 'O')
         ia2 = IntelligenceArtificielle('O', 'X')
         
@@ -443,6 +518,7 @@ class JeuMorpion:
             if resultat:
                 self.jeu.afficher_plateau()
                 self.afficher_resultat(resultat)
+                self.journaliser_partie(resultat, "console_ia_vs_ia", difficulte='difficile')
                 return
             
             # Changer de tour
@@ -525,9 +601,191 @@ class JeuMorpion:
                 print(f"❌ Erreur inattendue : {e}")
 
 
+class JeuBatch:
+    """Mode non interactif : rejoue des séquences de coups et des matchs IA vs IA
+    sans aucune saisie ni affichage de plateau, un résultat JSON par partie.
+
+    Formats d'entrée (une ligne = une requête) :
+    - séquence de cases (1-9) séparées par des espaces ou des virgules : "5 1 9"
+    - objet JSON séquence : {"id": "a", "coups": [5, 1, 9], "completer": "difficile"}
+      ("completer" optionnel : les deux IA terminent la partie avec ce niveau)
+    - objet JSON match : {"id": "m", "x": "difficile", "o": "facile", "parties": 10}
+    Les lignes vides et celles commençant par '#' sont ignorées.
+    """
+
+    DIFFICULTES = ('facile', 'moyen', 'difficile')
+
+    def __init__(self, graine: Optional[int] = None, journal=None):
+        """
+        Initialise le mode batch
+        
+        Args:
+            graine: Graine du générateur aléatoire (modes facile/moyen) pour des résultats reproductibles
+            journal: GameLog optionnel (game_log.py) où chaque partie terminée est enregistrée
+        """
+        self.rng = random.Random(graine)
+        self.journal = journal
+        self.ias = {
+            'X': IntelligenceArtificielle('X', 'O', rng=self.rng),
+            'O': IntelligenceArtificielle('O', 'X', rng=self.rng),
+        }
+
+    @staticmethod
+    def resultat(jeu: Morpion) -> Optional[str]:
+        """Retourne 'X', 'O', 'nul' ou None (partie en cours)"""
+        if jeu.verifier_victoire('X'):
+            return 'X'
+        if jeu.verifier_victoire('O'):
+            return 'O'
+        if jeu.verifier_match_nul():
+            return 'nul'
+        return None
+
+    def journaliser(self, jeu: Morpion, difficulte: Optional[str] = None):
+        """Enregistre une partie terminée dans le journal (si activé)"""
+        resultat = self.resultat(jeu)
+        if self.journal is None or resultat is None:
+            return
+        self.journal.append(jeu.coups, mode="batch", difficulte=difficulte,
+                            outcome={'X': 1, 'O': -1}.get(resultat, 0))
+
+    def rejouer_coups(self, coups: List[int], completer: Optional[str] = None) -> Dict:
+        """
+        Rejoue une séquence de cases (1-9) en alternant X puis O
+        
+        Args:
+            coups: Cases jouées dans l'ordre (numérotation console 1-9)
+            completer: Niveau des IA qui terminent la partie, ou None
+            
+        Returns:
+            Dictionnaire résultat (coups joués, résultat, erreur éventuelle)
+        """
+        jeu = Morpion()
+        joues: List[int] = []
+        symbole = 'X'
+        for coup in coups:
+            if self.resultat(jeu) is not None:
+                return {"coups": joues, "resultat": "invalide", "erreur": "coup après la fin de la partie"}
+            if not isinstance(coup, int) or not 1 <= coup <= 9 or not jeu.placer_symbole(coup - 1, symbole):
+                return {"coups": joues, "resultat": "invalide", "erreur": f"coup invalide : {coup}"}
+            joues.append(coup)
+            symbole = 'O' if symbole == 'X' else 'X'
+
+        if completer is not None:
+            while self.resultat(jeu) is None:
+                position = self.ias[symbole].meilleur_coup(jeu.plateau, completer)
+                jeu.placer_symbole(position, symbole)
+                joues.append(position + 1)
+                symbole = 'O' if symbole == 'X' else 'X'
+
+        self.journaliser(jeu, completer)
+        return {"coups": joues, "resultat": self.resultat(jeu) or "en_cours"}
+
+    def jouer_match(self, difficulte_x: str, difficulte_o: str) -> Dict:
+        """Joue une partie IA (X) contre IA (O) et retourne le résultat"""
+        jeu = Morpion()
+        joues: List[int] = []
+        symbole = 'X'
+        niveaux = {'X': difficulte_x, 'O': difficulte_o}
+        while self.resultat(jeu) is None:
+            position = self.ias[symbole].meilleur_coup(jeu.plateau, niveaux[symbole])
+            jeu.placer_symbole(position, symbole)
+            joues.append(position + 1)
+            symbole = 'O' if symbole == 'X' else 'X'
+        self.journaliser(jeu, difficulte_x if difficulte_x == difficulte_o else None)
+        return {"coups": joues, "resultat": self.resultat(jeu)}
+
+    def traiter_ligne(self, ligne: str, numero: int) -> Iterator[Dict]:
+        """Interprète une ligne d'entrée et produit un ou plusieurs résultats"""
+        ligne = ligne.strip()
+        if not ligne or ligne.startswith('#'):
+            return
+        try:
+            if ligne.startswith('{'):
+                requete = json.loads(ligne)
+            else:
+                requete = {"coups": [int(c) for c in ligne.replace(',', ' ').split()]}
+        except ValueError as e:
+            yield {"id": numero, "resultat": "invalide", "erreur": f"ligne illisible : {e}"}
+            return
+
+        ident = requete.get("id", numero)
+        if "coups" in requete:
+            completer = requete.get("completer")
+            if completer is not None and completer not in self.DIFFICULTES:
+                yield {"id": ident, "resultat": "invalide", "erreur": f"niveau inconnu : {completer}"}
+                return
+            coups = requete["coups"]
+            if not isinstance(coups, list) or not all(isinstance(c, int) and not isinstance(c, bool) for c in coups):
+                yield {"id": ident, "resultat": "invalide", "erreur": f"'coups' doit être une liste d'entiers : {coups!r}"}
+                return
+            reponse = self.rejouer_coups(coups, completer)
+            yield {"id": ident, "type": "sequence", **reponse}
+        elif "x" in requete or "o" in requete:
+            niveau_x = requete.get("x", "difficile")
+            niveau_o = requete.get("o", "difficile")
+            if niveau_x not in self.DIFFICULTES or niveau_o not in self.DIFFICULTES:
+                yield {"id": ident, "resultat": "invalide", "erreur": "niveau inconnu"}
+                return
+            parties = requete.get("parties", 1)
+            if not isinstance(parties, int) or isinstance(parties, bool) or parties < 0:
+                yield {"id": ident, "resultat": "invalide", "erreur": f"'parties' doit être un entier >= 0 : {parties!r}"}
+                return
+            for partie in range(parties):
+                yield {"id": ident, "type": "match", "partie": partie, "x": niveau_x, "o": niveau_o,
+                       **self.jouer_match(niveau_x, niveau_o)}
+        else:
+            yield {"id": ident, "resultat": "invalide", "erreur": "requête sans 'coups' ni 'x'/'o'"}
+
+    def executer(self, lignes: Iterable[str], sortie: TextIO) -> int:
+        """
+        Traite toutes les lignes et écrit un résultat JSON par ligne (flux continu)
+        
+        Returns:
+            Nombre de résultats écrits
+        """
+        total = 0
+        for numero, ligne in enumerate(lignes, start=1):
+            for reponse in self.traiter_ligne(ligne, numero):
+                sortie.write(json.dumps(reponse, ensure_ascii=False) + "\n")
+                total += 1
+        sortie.flush()
+        if self.journal is not None:
+            self.journal.close()
+        return total
+
+
+def _lignes_entree(fichiers: List[str]) -> Iterator[str]:
+    """Lignes de tous les fichiers ('-' = entrée standard), lues au fil de l'eau"""
+    for chemin in fichiers or ['-']:
+        if chemin == '-':
+            yield from sys.stdin
+        else:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                yield from f
+
+
 def main():
     """Fonction principale du programme"""
-    jeu = JeuMorpion()
+    parser = argparse.ArgumentParser(description="Morpion (console) avec IA Minimax")
+    parser.add_argument('--batch', nargs='*', metavar='FICHIER',
+                        help="mode non interactif : lit les requêtes depuis les fichiers (ou stdin) "
+                             "et écrit les résultats en JSONL")
+    parser.add_argument('--graine', type=int, default=None, help="graine aléatoire (mode batch)")
+    parser.add_argument('--journal', default=None, metavar='DOSSIER',
+                        help="enregistre chaque partie dans un journal binaire (ex: runs/games, NumPy requis)")
+    args = parser.parse_args()
+
+    journal = None
+    if args.journal:
+        from game_log import GameLog
+        journal = GameLog(args.journal)
+
+    if args.batch is not None:
+        JeuBatch(args.graine, journal).executer(_lignes_entree(args.batch), sys.stdout)
+        return
+
+    jeu = JeuMorpion(journal)
     jeu.lancer()
 
 
@@ -5,14 +5,18 @@ Auteur: Projet pédagogique IA
 Date: Décembre 2025
 """
 
+import argparse
+import math
 import pygame
 import sys
-import random
+import time
 from typing import List, Tuple, Optional
 
 try:
     from dqn_agent import DQNAgent, DQNConfig, self_play_train, DEFAULT_BOOTSTRAP_EPISODES
     from tictactoe_env import from_chars, to_perspective, valid_actions, Transition
+    from model_registry import ModelRegistry, ModelWatcher
+    from mcts_agent import MCTSAgent
     DQN_DISPONIBLE = True
 except Exception:
     # Permet au mode "2 Joueurs" de fonctionner même si PyTorch n'est pas installé.
@@ -24,8 +28,50 @@ except Exception:
     to_perspective = None  # type: ignore[assignment]
     valid_actions = None  # type: ignore[assignment]
     Transition = None  # type: ignore[assignment]
+    ModelRegistry = None  # type: ignore[assignment]
+    ModelWatcher = None  # type: ignore[assignment]
+    MCTSAgent = None  # type: ignore[assignment]
     DEFAULT_BOOTSTRAP_EPISODES = 2500
 
+try:
+    # Agent tabulaire (moteur "tabulaire"): sans PyTorch, seul le bootstrap self-play en a besoin.
+    from tabular_agent import TabularQAgent
+    from tictactoe_env import from_chars, to_perspective, valid_actions, Transition
+except ImportError:
+    TabularQAgent = None  # type: ignore[assignment]
+
+try:
+    from distillation import distill
+except ImportError:
+    # Distillation indisponible (PyTorch ou NumPy absent): bootstrap self-play.
+    distill = None  # type: ignore[assignment]
+
+try:
+    from game_log import GameLog
+except ImportError:
+    # Journal des parties indisponible sans NumPy.
+    GameLog = None  # type: ignore[assignment]
+
+try:
+    from table_minimax import TableMinimax
+except ImportError:
+    # IA Minimax par tables indisponible sans NumPy.
+    TableMinimax = None  # type: ignore[assignment]
+
+from memory_budget import MemoryBudgetExceeded
+from perf_hud import PerfHUD
+
+DEFAULT_MODELE_PATH = "models/dqn_tictactoe.pt"
+DEFAULT_MODELE_TABULAIRE_PATH = "models/tabular_q.json"
+DEFAULT_TABULAIRE_BOOTSTRAP_EPISODES = 3000  # quelques secondes (voir tabular_agent.py)
+DEFAULT_HUD_EXPORT = "runs/perf_hud.csv"
+# Moteur des modes IA: "dqn" (PyTorch), "tabulaire" (Q-learning tabulaire, voir tabular_agent.py),
+# "table" (Minimax précalculé, sans PyTorch) ou "mcts" (recherche arborescente guidée par le
+# réseau du DQN, voir mcts_agent.py).
+# "dqn" et "mcts" basculent automatiquement sur "table" si PyTorch n'est pas installé.
+DEFAULT_MOTEUR = "dqn"
+MOTEURS = ("dqn", "tabulaire", "table", "mcts")
+
 # Initialisation de Pygame
 pygame.init()
 
@@ -61,6 +107,57 @@ FONT_MENU = pygame.font.Font(None, 40)
 FONT_TEXTE = pygame.font.Font(None, 36)
 FONT_PETIT = pygame.font.Font(None, 28)
 
+# Nombre maximal de textes pré-rendus conservés (messages, titres, libellés)
+DEFAULT_CACHE_TEXTES = 256
+COULEUR_CLE = (255, 0, 255)  # couleur "transparente" des surfaces pré-rendues (jamais utilisée à l'écran)
+
+
+class CacheRendu:
+    """Surfaces pré-rendues réutilisées d'une image à l'autre (aucune allocation par image).
+
+    - `texte(police, texte, couleur)`: rendu de police, recalculé seulement si le texte change
+    - `surface(cle, taille, dessiner)`: surface construite une fois par (clé, taille) par `dessiner(surface)`
+      (glyphes X/O, grille, voile de fin de partie, boutons)
+
+    Les surfaces sont converties au format de l'écran; la transparence passe par une couleur clé
+    (pas d'alpha par pixel), ce qui garde les blits aussi rapides que les dessins directs.
+    """
+
+    def __init__(self, max_textes: int = DEFAULT_CACHE_TEXTES):
+        self.max_textes = max_textes
+        self._textes = {}
+        self._surfaces = {}
+
+    def texte(self, police: pygame.font.Font, texte: str, couleur: tuple) -> pygame.Surface:
+        cle = (id(police), texte, couleur)
+        rendu = self._textes.get(cle)
+        if rendu is None:
+            if len(self._textes) >= self.max_textes:
+                self._textes.clear()
+            rendu = self._textes[cle] = police.render(texte, True, couleur)
+        return rendu
+
+    def surface(self, cle, taille: Tuple[int, int], dessiner, transparent: bool = False,
+                alpha: Optional[int] = None) -> pygame.Surface:
+        rendu = self._surfaces.get((cle, taille))
+        if rendu is None:
+            rendu = pygame.Surface(taille).convert()
+            if transparent:
+                rendu.fill(COULEUR_CLE)
+                rendu.set_colorkey(COULEUR_CLE, pygame.RLEACCEL)
+            dessiner(rendu)
+            if alpha is not None:
+                rendu.set_alpha(alpha)
+            self._surfaces[(cle, taille)] = rendu
+        return rendu
+
+    def vider(self):
+        self._textes.clear()
+        self._surfaces.clear()
+
+
+CACHE_RENDU = CacheRendu()
+
 
 class Morpion:
     """Classe gérant la logique du jeu de Morpion"""
@@ -72,6 +169,7 @@ class Morpion:
         self.joueur_actuel = self.joueur_humain
         self.gagnant = None
         self.combinaison_gagnante = None
+        self.coups: List[int] = []  # cases jouées dans l'ordre (journal des parties)
     
     def case_disponible(self, position: int) -> bool:
         return self.plateau[position] == ' '
@@ -79,6 +177,7 @@ class Morpion:
     def placer_symbole(self, position: int, symbole: str) -> bool:
         if self.case_disponible(position):
             self.plateau[position] = symbole
+            self.coups.append(position)
             return True
         return False
     
@@ -106,23 +205,24 @@ class Morpion:
         self.joueur_actuel = self.joueur_humain
         self.gagnant = None
         self.combinaison_gagnante = None
+        self.coups = []
 
 
 class IntelligenceArtificielle:
-    """Compat: ancienne IA Minimax.
+    """IA Minimax sans PyTorch (moteur "table", voir table_minimax.py).
 
-    Le projet a été transformé vers du Deep RL (DQN).
-    Cette classe est conservée uniquement pour compatibilité de code
-    (ne plus utiliser dans la version DQN).
+    Utilisée quand PyTorch n'est pas installé (ou avec `--moteur table`):
+    le jeu est résolu une fois au démarrage, chaque coup est une lecture de table.
+    La difficulté correspond à une probabilité d'erreur (`DEFAULT_BLUNDER_PROBS`).
     """
 
     def __init__(self, symbole_ia: str, symbole_joueur: str):
         self.symbole_ia = symbole_ia
         self.symbole_joueur = symbole_joueur
+        self.moteur = TableMinimax(symbole_ia)
 
     def meilleur_coup(self, plateau: List[str], difficulte: str) -> int:
-        cases_disponibles = [i for i, c in enumerate(plateau) if c == ' ']
-        return random.choice(cases_disponibles) if cases_disponibles else -1
+        return self.moteur.meilleur_coup(plateau, difficulte)
 
 
 class Bouton:
@@ -137,13 +237,21 @@ class Bouton:
         self.hover = False
     
     def dessiner(self, ecran: pygame.Surface):
+        # Bouton complet (fond, bordure, libellé) pré-rendu pour chaque état normal/survol;
+        # la clé contient le texte et la taille: un changement de l'un ou l'autre invalide le rendu.
         couleur = self.couleur_hover if self.hover else self.couleur
-        pygame.draw.rect(ecran, couleur, self.rect, border_radius=10)
-        pygame.draw.rect(ecran, NOIR, self.rect, 3, border_radius=10)
-        
-        texte_surface = FONT_MENU.render(self.texte, True, BLANC)
-        texte_rect = texte_surface.get_rect(center=self.rect.center)
-        ecran.blit(texte_surface, texte_rect)
+        rendu = CACHE_RENDU.surface(("bouton", self.texte, couleur), self.rect.size, self._rendre,
+                                    transparent=True)
+        ecran.blit(rendu, self.rect)
+
+    def _rendre(self, surface: pygame.Surface):
+        # appelé par le cache juste après la création de `surface` (état de survol courant)
+        rect = surface.get_rect()
+        couleur = self.couleur_hover if self.hover else self.couleur
+        pygame.draw.rect(surface, couleur, rect, border_radius=10)
+        pygame.draw.rect(surface, NOIR, rect, 3, border_radius=10)
+        texte_surface = CACHE_RENDU.texte(FONT_MENU, self.texte, BLANC)
+        surface.blit(texte_surface, texte_surface.get_rect(center=rect.center))
     
     def verifier_hover(self, pos: Tuple[int, int]):
         self.hover = self.rect.collidepoint(pos)
@@ -155,15 +263,43 @@ class Bouton:
 class JeuPygame:
     """Classe principale gérant le jeu avec Pygame"""
     
-    def __init__(self):
+    def __init__(self, modele_path: Optional[str] = None, registre: Optional[str] = None,
+                 journal: Optional[str] = None, budget_memoire_mb: float = 0,
+                 hud: bool = False, hud_export: Optional[str] = None, moteur: str = DEFAULT_MOTEUR,
+                 prefetch_batches: int = 0):
         self.ecran = pygame.display.set_mode((LARGEUR_FENETRE, HAUTEUR_FENETRE))
         pygame.display.set_caption("Morpion - Intelligence Artificielle")
         self.horloge = pygame.time.Clock()
         
         self.jeu = Morpion()
-        self.ia = None
+        self.ia = None  # IA Minimax par tables (moteur "table"), une par symbole
+        if moteur not in MOTEURS:
+            raise ValueError(f"Moteur inconnu: {moteur} (moteurs: {', '.join(MOTEURS)})")
+        if (moteur in ("dqn", "mcts") and not DQN_DISPONIBLE) or (moteur == "tabulaire" and TabularQAgent is None):
+            moteur = "table"
+        self.moteur = moteur if moteur != "table" or TableMinimax is not None else None
+        # Agent apprenant des modes IA: DQNAgent, TabularQAgent (même interface) en "tabulaire",
+        # ou MCTSAgent (choix des coups par recherche, apprentissage délégué au DQN) en "mcts"
         self.agent_dqn: Optional[DQNAgent] = None
-        self.modele_path = "models/dqn_tictactoe.pt"
+        if modele_path is None:
+            modele_path = DEFAULT_MODELE_TABULAIRE_PATH if moteur == "tabulaire" else DEFAULT_MODELE_PATH
+        self.modele_path = modele_path
+        self.budget_memoire_mb = budget_memoire_mb  # 0 = illimité (voir memory_budget.py)
+        self.prefetch_batches = prefetch_batches  # batchs préparés en fond (voir batch_prefetch.py)
+        # Apprentissage en ligne de l'agent DQN (remember + train_step + save), coupé si le
+        # budget mémoire est dépassé: l'IA continue de jouer avec ses poids actuels.
+        self.apprentissage_en_ligne = True
+        # Registre de modèles (optionnel): version courante chargée au démarrage,
+        # nouvelles versions validées en tâche de fond puis chargées entre deux coups.
+        self.registre = ModelRegistry(registre) if registre and self.moteur in ("dqn", "mcts") else None
+        self.surveillant: Optional["ModelWatcher"] = None
+        # Journal binaire des parties (optionnel, voir game_log.py)
+        self.journal = GameLog(journal) if journal and GameLog is not None else None
+        self._debut_partie = 0.0
+        self._partie_journalisee = False
+        # Surcouche de performance (F3: afficher/masquer, F4: exporter les échantillons)
+        self.hud = PerfHUD(visible=hud)
+        self.hud_export = hud_export  # CSV écrit à la fermeture (None: seulement sur F4)
         # Pour un apprentissage correct en jeu IA vs humain:
         # on enregistre (s,a) au tour de l'IA, puis on finalise (s') après le coup humain suivant.
         self._pending_ai_state: Optional[List[float]] = None
@@ -203,26 +339,25 @@ class JeuPygame:
         ]
     
     def dessiner_grille(self):
-        """Dessine la grille de jeu"""
+        """Dessine la grille de jeu (pré-rendue une fois)"""
+        # +1 pixel: les lignes débordent d'un pixel sur les bords bas et droit du fond blanc
+        grille = CACHE_RENDU.surface("grille", (TAILLE_GRILLE + 1, TAILLE_GRILLE + 1), self._rendre_grille,
+                                     transparent=True)
+        self.ecran.blit(grille, (GRILLE_X, GRILLE_Y))
+
+    def _rendre_grille(self, surface: pygame.Surface):
         # Fond de la grille
-        pygame.draw.rect(self.ecran, BLANC, 
-                        (GRILLE_X, GRILLE_Y, TAILLE_GRILLE, TAILLE_GRILLE))
+        pygame.draw.rect(surface, BLANC, (0, 0, TAILLE_GRILLE, TAILLE_GRILLE))
         
         # Lignes verticales
         for i in range(1, 3):
-            x = GRILLE_X + i * TAILLE_CASE
-            pygame.draw.line(self.ecran, NOIR,
-                           (x, GRILLE_Y),
-                           (x, GRILLE_Y + TAILLE_GRILLE),
-                           LARGEUR_LIGNE)
+            x = i * TAILLE_CASE
+            pygame.draw.line(surface, NOIR, (x, 0), (x, TAILLE_GRILLE), LARGEUR_LIGNE)
         
         # Lignes horizontales
         for i in range(1, 3):
-            y = GRILLE_Y + i * TAILLE_CASE
-            pygame.draw.line(self.ecran, NOIR,
-                           (GRILLE_X, y),
-                           (GRILLE_X + TAILLE_GRILLE, y),
-                           LARGEUR_LIGNE)
+            y = i * TAILLE_CASE
+            pygame.draw.line(surface, NOIR, (0, y), (TAILLE_GRILLE, y), LARGEUR_LIGNE)
     
     def dessiner_symboles(self):
         """Dessine les X et O sur la grille"""
@@ -240,34 +375,43 @@ class JeuPygame:
                     self.dessiner_o(centre_x, centre_y)
     
     def dessiner_x(self, x: int, y: int):
-        """Dessine un X"""
+        """Dessine un X (glyphe pré-rendu, centré en (x, y))"""
+        glyphe = CACHE_RENDU.surface("X", (TAILLE_CASE, TAILLE_CASE), self._rendre_x, transparent=True)
+        self.ecran.blit(glyphe, (x - TAILLE_CASE // 2, y - TAILLE_CASE // 2))
+
+    def _rendre_x(self, surface: pygame.Surface):
         taille = TAILLE_CASE // 3
         couleur = BLEU
         epaisseur = 12
+        c = TAILLE_CASE // 2
         
-        pygame.draw.line(self.ecran, couleur,
-                        (x - taille, y - taille),
-                        (x + taille, y + taille),
+        pygame.draw.line(surface, couleur,
+                        (c - taille, c - taille),
+                        (c + taille, c + taille),
                         epaisseur)
-        pygame.draw.line(self.ecran, couleur,
-                        (x + taille, y - taille),
-                        (x - taille, y + taille),
+        pygame.draw.line(surface, couleur,
+                        (c + taille, c - taille),
+                        (c - taille, c + taille),
                         epaisseur)
     
     def dessiner_o(self, x: int, y: int):
-        """Dessine un O"""
+        """Dessine un O (glyphe pré-rendu, centré en (x, y))"""
+        glyphe = CACHE_RENDU.surface("O", (TAILLE_CASE, TAILLE_CASE), self._rendre_o, transparent=True)
+        self.ecran.blit(glyphe, (x - TAILLE_CASE // 2, y - TAILLE_CASE // 2))
+
+    def _rendre_o(self, surface: pygame.Surface):
         rayon = TAILLE_CASE // 3
         couleur = ROUGE
         epaisseur = 12
         
-        pygame.draw.circle(self.ecran, couleur, (x, y), rayon, epaisseur)
+        pygame.draw.circle(surface, couleur, (TAILLE_CASE // 2, TAILLE_CASE // 2), rayon, epaisseur)
     
     def dessiner_ligne_victoire(self):
         """Dessine une ligne animée sur la combinaison gagnante"""
         if self.jeu.combinaison_gagnante:
             # Animation de pulsation
             self.animation_victoire += 0.1
-            epaisseur = int(10 + 5 * abs(pygame.math.Vector2(1, 0).rotate(self.animation_victoire * 180).x))
+            epaisseur = int(10 + 5 * abs(math.cos(math.radians(self.animation_victoire * 180))))
             
             # Calculer les positions de début et fin
             debut = self.jeu.combinaison_gagnante[0]
@@ -308,11 +452,11 @@ class JeuPygame:
         self.ecran.fill(GRIS)
         
         # Titre
-        titre = FONT_TITRE.render("MORPION", True, NOIR)
+        titre = CACHE_RENDU.texte(FONT_TITRE, "MORPION", NOIR)
         titre_rect = titre.get_rect(center=(LARGEUR_FENETRE // 2, 120))
         self.ecran.blit(titre, titre_rect)
         
-        sous_titre = FONT_PETIT.render("avec Intelligence Artificielle", True, GRIS_FONCE)
+        sous_titre = CACHE_RENDU.texte(FONT_PETIT, "avec Intelligence Artificielle", GRIS_FONCE)
         sous_titre_rect = sous_titre.get_rect(center=(LARGEUR_FENETRE // 2, 170))
         self.ecran.blit(sous_titre, sous_titre_rect)
         
@@ -324,7 +468,7 @@ class JeuPygame:
         """Dessine le menu de sélection de difficulté"""
         self.ecran.fill(GRIS)
         
-        titre = FONT_TITRE.render("DIFFICULTÉ", True, NOIR)
+        titre = CACHE_RENDU.texte(FONT_TITRE, "DIFFICULTÉ", NOIR)
         titre_rect = titre.get_rect(center=(LARGEUR_FENETRE // 2, 120))
         self.ecran.blit(titre, titre_rect)
         
@@ -337,7 +481,7 @@ class JeuPygame:
         
         # Message en haut
         if self.message:
-            texte = FONT_TEXTE.render(self.message, True, NOIR)
+            texte = CACHE_RENDU.texte(FONT_TEXTE, self.message, NOIR)
             texte_rect = texte.get_rect(center=(LARGEUR_FENETRE // 2, 50))
             self.ecran.blit(texte, texte_rect)
         
@@ -353,10 +497,8 @@ class JeuPygame:
         """Dessine l'écran de fin de partie"""
         self.dessiner_jeu()
         
-        # Panneau semi-transparent
-        overlay = pygame.Surface((LARGEUR_FENETRE, HAUTEUR_FENETRE))
-        overlay.set_alpha(200)
-        overlay.fill(BLANC)
+        # Panneau semi-transparent (alloué une fois)
+        overlay = CACHE_RENDU.surface("voile", self.ecran.get_size(), lambda s: s.fill(BLANC), alpha=200)
         self.ecran.blit(overlay, (0, 0))
         
         # Message de résultat
@@ -378,7 +520,7 @@ class JeuPygame:
             texte_principal = "⚖️  MATCH NUL !"
             couleur = JAUNE
         
-        texte = FONT_TITRE.render(texte_principal, True, couleur)
+        texte = CACHE_RENDU.texte(FONT_TITRE, texte_principal, couleur)
         texte_rect = texte.get_rect(center=(LARGEUR_FENETRE // 2, 300))
         self.ecran.blit(texte, texte_rect)
         
@@ -399,8 +541,8 @@ class JeuPygame:
             self.difficulte = "difficile"
             self.demarrer_partie()
         elif self.boutons_menu[3].est_clique(pos):  # Quitter
-            pygame.quit()
-            sys.exit()
+            # même sortie que la fermeture de la fenêtre: `lancer` fait le nettoyage
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
     
     def gerer_clic_difficulte(self, pos: Tuple[int, int]):
         """Gère les clics dans le menu de difficulté"""
@@ -448,11 +590,7 @@ class JeuPygame:
                         done=done,
                         next_valid_mask=next_mask,
                     )
-                    self.agent_dqn.remember(t)
-                    for _ in range(self.agent_dqn.config.train_steps_per_move):
-                        self.agent_dqn.train_step()
-                    if done:
-                        self.agent_dqn.save(self.modele_path)
+                    self.apprendre(t, sauver=done)
 
                     self._pending_ai_state = None
                     self._pending_ai_action = None
@@ -489,50 +627,39 @@ class JeuPygame:
         self.jeu.reinitialiser()
         self.etat = "jeu"
         self.animation_victoire = 0
+        self._debut_partie = time.perf_counter()
+        self._partie_journalisee = False
         
-        if self.mode_jeu == "ia":
-            if not DQN_DISPONIBLE:
-                self.message = "Mode IA indisponible: installez PyTorch (torch)."
-                pygame.time.wait(1200)
-                self.etat = "menu"
-                return
+        if self.mode_jeu in ("ia", "ia_vs_ia") and self.moteur is None:
+            self.message = "Mode IA indisponible: installez PyTorch (torch) ou NumPy."
+            pygame.time.wait(1200)
+            self.etat = "menu"
+            return
 
+        if self.mode_jeu == "ia" and self.moteur == "table":
+            self.initialiser_ia_table()
+            self.message = f"Votre tour ! (Niveau: {self.difficulte.capitalize()})"
+        elif self.mode_jeu == "ia":
             # DQN: initialise/charge le modèle et ajuste epsilon selon difficulté.
             if self.agent_dqn is None:
-                self.agent_dqn = DQNAgent(DQNConfig())
-                charge = self.agent_dqn.load(self.modele_path)
-                if not charge:
-                    # Petit entraînement initial self-play (rapide) pour éviter un agent totalement aléatoire.
-                    # Les données sont générées par le jeu (pas de dataset externe).
-                    self.message = "Entraînement initial de l'IA (DQN)..."
-                    pygame.display.flip()
-                    pygame.event.pump()
-                    self_play_train(self.agent_dqn, episodes=DEFAULT_BOOTSTRAP_EPISODES, verbose_every=0)
-                    self.agent_dqn.save(self.modele_path)
+                self.initialiser_agent()
+            self.recharger_modele_si_nouveau()
 
             self.agent_dqn.set_epsilon_for_difficulty(self.difficulte)
             self._pending_ai_state = None
             self._pending_ai_action = None
             self._pending_ai_board_after = None
             self.message = f"Votre tour ! (Niveau: {self.difficulte.capitalize()})"
+            if not self.apprentissage_en_ligne:
+                self.message += " - sans apprentissage"
         elif self.mode_jeu == "2joueurs":
             self.message = "Tour du joueur X"
         elif self.mode_jeu == "ia_vs_ia":
-            if not DQN_DISPONIBLE:
-                self.message = "Mode IA indisponible: installez PyTorch (torch)."
-                pygame.time.wait(1200)
-                self.etat = "menu"
-                return
-
-            if self.agent_dqn is None:
-                self.agent_dqn = DQNAgent(DQNConfig())
-                charge = self.agent_dqn.load(self.modele_path)
-                if not charge:
-                    self.message = "Entraînement initial de l'IA (DQN)..."
-                    pygame.display.flip()
-                    pygame.event.pump()
-                    self_play_train(self.agent_dqn, episodes=DEFAULT_BOOTSTRAP_EPISODES, verbose_every=0)
-                    self.agent_dqn.save(self.modele_path)
+            if self.moteur == "table":
+                self.initialiser_ia_table()
+            elif self.agent_dqn is None:
+                self.initialiser_agent()
+            self.recharger_modele_si_nouveau()
 
             # IA vs IA: démonstration (peut aussi continuer à apprendre en ligne)
             self._pending_ai_state = None
@@ -542,17 +669,137 @@ class JeuPygame:
             # Démarrer la démonstration après un court délai
             pygame.time.set_timer(pygame.USEREVENT + 1, 1000)
     
+    def initialiser_ia_table(self):
+        """Crée (une fois) les IA Minimax par tables des deux camps (sans PyTorch)."""
+        if self.ia is None:
+            self.ia = {'X': IntelligenceArtificielle('X', 'O'), 'O': IntelligenceArtificielle('O', 'X')}
+
+    def jouer_coup_table(self, symbole: str, difficulte: str):
+        """Tour d'une IA Minimax par tables: choisit et joue un coup pour `symbole`."""
+        with self.hud.mesurer("tour_ia"):
+            action = self.ia[symbole].meilleur_coup(self.jeu.plateau, difficulte)
+        if action != -1:
+            self.jeu.placer_symbole(action, symbole)
+        return action
+
+    def initialiser_agent(self):
+        """Crée l'agent du moteur courant (DQN, tabulaire, ou DQN encapsulé par MCTS)."""
+        if self.moteur == "tabulaire":
+            self.initialiser_agent_tabulaire()
+            return
+        self.initialiser_agent_dqn()
+        if self.moteur == "mcts":
+            self.agent_dqn = MCTSAgent(self.agent_dqn)
+
+    def initialiser_agent_dqn(self):
+        """Crée l'agent DQN: version courante du registre, sinon modèle local, sinon bootstrap."""
+        try:
+            self.agent_dqn = DQNAgent(DQNConfig(memory_budget_mb=self.budget_memoire_mb,
+                                                prefetch_batches=self.prefetch_batches))
+        except MemoryBudgetExceeded as e:
+            # Le replay ne tient pas dans le budget: agent d'inférence seul (replay minimal)
+            self.agent_dqn = DQNAgent(DQNConfig(replay_capacity=1, q_cache=False))
+            self.desactiver_apprentissage(e)
+        version = self.registre.current() if self.registre is not None else None
+        if version is not None and self.agent_dqn.load(self.registre.path(version)):
+            self.surveillant = ModelWatcher(self.registre, loaded_version=version.version).start()
+            return
+        if self.registre is not None:
+            self.surveillant = ModelWatcher(self.registre).start()
+
+        charge = self.agent_dqn.load(self.modele_path)
+        if not charge:
+            # Entraînement initial pour éviter un agent totalement aléatoire: distillation de
+            # l'oracle Minimax (~1 s, voir distillation.py), sinon petit self-play.
+            self.message = "Entraînement initial de l'IA (DQN)..."
+            pygame.display.flip()
+            pygame.event.pump()
+            try:
+                with self.hud.mesurer("bootstrap"):
+                    if distill is not None:
+                        distill(self.agent_dqn)
+                    elif self.apprentissage_en_ligne:
+                        self_play_train(self.agent_dqn, episodes=DEFAULT_BOOTSTRAP_EPISODES, verbose_every=0)
+            except MemoryBudgetExceeded as e:
+                self.desactiver_apprentissage(e)  # bootstrap incomplet: pas sauvegardé
+            else:
+                with self.hud.mesurer("save"):
+                    self.agent_dqn.save(self.modele_path)
+
+    def initialiser_agent_tabulaire(self):
+        """Crée l'agent tabulaire: table locale, sinon bootstrap self-play (si PyTorch est installé)."""
+        self.agent_dqn = TabularQAgent()
+        if self.agent_dqn.load(self.modele_path) or self_play_train is None:
+            return
+        self.message = "Entraînement initial de l'IA (tabulaire)..."
+        pygame.display.flip()
+        pygame.event.pump()
+        with self.hud.mesurer("bootstrap"):
+            self_play_train(self.agent_dqn, episodes=DEFAULT_TABULAIRE_BOOTSTRAP_EPISODES, verbose_every=0)
+        with self.hud.mesurer("save"):
+            self.agent_dqn.save(self.modele_path)
+
+    def apprendre(self, transition: "Transition", sauver: bool):
+        """Apprentissage en ligne d'une transition de l'IA, puis sauvegarde du modèle si `sauver`.
+
+        Rien pour un agent figé (réseau distillé: la cible TD le dégraderait, voir distillation.py).
+        """
+        if not self.apprentissage_en_ligne or getattr(self.agent_dqn, "frozen", False):
+            return
+        try:
+            self.agent_dqn.remember(transition)
+            with self.hud.mesurer("train_step"):
+                for _ in range(self.agent_dqn.config.train_steps_per_move):
+                    self.agent_dqn.train_step()
+        except MemoryBudgetExceeded as e:
+            self.desactiver_apprentissage(e)
+            return
+        if sauver:
+            with self.hud.mesurer("save"):
+                self.agent_dqn.save(self.modele_path)
+
+    def desactiver_apprentissage(self, erreur: MemoryBudgetExceeded):
+        """Budget mémoire dépassé: l'IA continue de jouer sans apprendre (ni sauvegarder)."""
+        self.apprentissage_en_ligne = False
+        self.arreter_prefetch()
+        self.message = "Mémoire insuffisante: l'IA joue sans apprendre"
+        print(f"{erreur} -> apprentissage en ligne désactivé")
+
+    def arreter_prefetch(self):
+        """Arrête le thread de préchargement des batchs (agent DQN seulement)."""
+        stop_prefetch = getattr(self.agent_dqn, "stop_prefetch", None)
+        if stop_prefetch is not None:
+            stop_prefetch()
+
+    def recharger_modele_si_nouveau(self):
+        """Charge (entre deux coups) une nouvelle version du registre déjà validée par le surveillant."""
+        if self.surveillant is None or self.agent_dqn is None:
+            return
+        version = self.surveillant.prendre_nouvelle_version()
+        if version is None:
+            return
+        epsilon = self.agent_dqn.epsilon
+        if self.agent_dqn.load(self.registre.path(version)):
+            self.agent_dqn.epsilon = epsilon  # garde le niveau de difficulté en cours
+            print(f"Modèle v{version.version} chargé depuis le registre")
+
     def tour_ia(self):
         """Exécute le tour de l'IA"""
+        if self.moteur == "table" and self.ia is not None:
+            self.jouer_coup_table(self.jeu.joueur_ia, self.difficulte)
+            self.verifier_etat_jeu()
+            return
         if not self.agent_dqn:
             return
+        self.recharger_modele_si_nouveau()
 
         board_abs, agent_player = from_chars(self.jeu.plateau, self.jeu.joueur_ia)
         # Agent joue O => agent_player = -1, état depuis sa perspective
         state = [float(v) for v in to_perspective(board_abs, agent_player)]
         valid = valid_actions(board_abs)
 
-        action = self.agent_dqn.select_action(state, valid, training=False)
+        with self.hud.mesurer("tour_ia"):
+            action = self.agent_dqn.select_action(state, valid, training=False)
         if action == -1:
             return
 
@@ -576,10 +823,7 @@ class JeuPygame:
                 done=True,
                 next_valid_mask=next_mask,
             )
-            self.agent_dqn.remember(t)
-            for _ in range(self.agent_dqn.config.train_steps_per_move):
-                self.agent_dqn.train_step()
-            self.agent_dqn.save(self.modele_path)
+            self.apprendre(t, sauver=True)
             self._pending_ai_state = None
             self._pending_ai_action = None
             self._pending_ai_board_after = None
@@ -598,14 +842,24 @@ class JeuPygame:
             pygame.time.set_timer(pygame.USEREVENT + 1, 0)  # Arrêter le timer
             return
 
+        if self.moteur == "table" and self.ia is not None:
+            # Démonstration: niveau "moyen" des deux côtés (deux IA parfaites font toujours nul)
+            joueur = self.jeu.joueur_actuel
+            if self.jouer_coup_table(joueur, "moyen") != -1:
+                self.verifier_etat_jeu()
+                self.jeu.joueur_actuel = 'O' if joueur == 'X' else 'X'
+            return
+
         if not self.agent_dqn:
             return
+        self.recharger_modele_si_nouveau()
 
         joueur = self.jeu.joueur_actuel  # 'X' ou 'O'
         board_abs, agent_player = from_chars(self.jeu.plateau, joueur)
         state = [float(v) for v in to_perspective(board_abs, agent_player)]
         valid = valid_actions(board_abs)
-        action = self.agent_dqn.select_action(state, valid, training=False)
+        with self.hud.mesurer("tour_ia"):
+            action = self.agent_dqn.select_action(state, valid, training=False)
         if action == -1:
             return
 
@@ -632,15 +886,47 @@ class JeuPygame:
             self.jeu.gagnant = 'nul'
             pygame.time.wait(1000)
             self.etat = "fin"
+
+        if self.jeu.gagnant:
+            self.journaliser_partie()
+
+    def journaliser_partie(self):
+        """Ajoute la partie terminée au journal (une seule fois par partie)"""
+        if self.journal is None or self._partie_journalisee:
+            return
+        self._partie_journalisee = True
+        gagnant = {'X': 1, 'O': -1}.get(self.jeu.gagnant, 0)
+        ia = {'X': 1, 'O': -1}[self.jeu.joueur_ia] if self.mode_jeu == "ia" else 0
+        version = self.surveillant.loaded_version if self.surveillant is not None else 0
+        self.journal.append(
+            self.jeu.coups,
+            mode=self.mode_jeu,
+            difficulte=self.difficulte if self.mode_jeu == "ia" else None,
+            outcome=gagnant,
+            ai_player=ia,
+            model_version=version or 0,
+            duration_ms=int((time.perf_counter() - self._debut_partie) * 1000),
+        )
+        self.journal.flush()
     
     def lancer(self):
         """Boucle principale du jeu"""
         en_cours = True
         
         while en_cours:
+            self.hud.debut_image()
             for event in pygame.event.get():
+                debut_evenement = time.perf_counter()
                 if event.type == pygame.QUIT:
                     en_cours = False
+
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.hud.basculer()
+
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    chemin = self.hud_export or DEFAULT_HUD_EXPORT
+                    n = self.hud.exporter(chemin)
+                    print(f"HUD: {n} échantillons exportés dans {chemin}")
                 
                 elif event.type == pygame.MOUSEMOTION:
                     pos = pygame.mouse.get_pos()
@@ -668,6 +954,7 @@ class JeuPygame:
                 elif event.type == pygame.USEREVENT + 1:  # Timer pour IA vs IA
                     if self.mode_jeu == "ia_vs_ia" and self.etat == "jeu":
                         self.tour_ia_vs_ia()
+                self.hud.ajouter("evenement", (time.perf_counter() - debut_evenement) * 1000.0)
             
             # Dessiner selon l'état
             if self.etat == "menu":
@@ -678,17 +965,47 @@ class JeuPygame:
                 self.dessiner_jeu()
             elif self.etat == "fin":
                 self.dessiner_fin()
+            self.hud.dessiner(self.ecran)
             
             pygame.display.flip()
+            self.hud.fin_image()
             self.horloge.tick(60)
         
+        if self.hud_export is not None and self.hud.echantillons["frame"]:
+            self.hud.exporter(self.hud_export)
+        if self.surveillant is not None:
+            self.surveillant.stop()
+        self.arreter_prefetch()
+        if self.journal is not None:
+            self.journal.close()
         pygame.quit()
         sys.exit()
 
 
 def main():
     """Fonction principale"""
-    jeu = JeuPygame()
+    parser = argparse.ArgumentParser(description="Morpion - Pygame + IA DQN")
+    parser.add_argument("--modele", default=None,
+                        help=f"checkpoint local de l'agent (défaut: {DEFAULT_MODELE_PATH}, "
+                             f"{DEFAULT_MODELE_TABULAIRE_PATH} en moteur tabulaire)")
+    parser.add_argument("--registre", default=None,
+                        help="dossier du registre de modèles (rechargement à chaud des nouvelles versions)")
+    parser.add_argument("--journal", default=None, metavar="DOSSIER",
+                        help="enregistre chaque partie dans un journal binaire (ex: runs/games)")
+    parser.add_argument("--budget-memoire", type=float, default=0, metavar="MO",
+                        help="mémoire maximale du processus (replay et cache dimensionnés en conséquence)")
+    parser.add_argument("--hud", action="store_true", help="affiche la surcouche de performance (touche F3)")
+    parser.add_argument("--hud-export", default=None, metavar="FICHIER",
+                        help="exporte les mesures du HUD en CSV à la fermeture (et sur F4)")
+    parser.add_argument("--moteur", choices=MOTEURS, default=DEFAULT_MOTEUR,
+                        help="IA des modes de jeu: dqn (PyTorch), tabulaire (Q-learning tabulaire), "
+                             "table (Minimax précalculé, sans PyTorch) ou mcts (recherche guidée par le DQN)")
+    parser.add_argument("--prefetch", type=int, default=0, metavar="K",
+                        help="prépare en tâche de fond les K prochains batchs d'apprentissage du DQN")
+    args = parser.parse_args()
+    jeu = JeuPygame(modele_path=args.modele, registre=args.registre, journal=args.journal,
+                    budget_memoire_mb=args.budget_memoire, hud=args.hud, hud_export=args.hud_export,
+                    moteur=args.moteur, prefetch_batches=args.prefetch)
     jeu.lancer()
 
 
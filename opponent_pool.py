@@ -0,0 +1,177 @@
+"""opponent_pool.py
+
+Pool d'adversaires pour l'entraînement (`self_play_train(..., opponents=pool)`).
+
+Le self-play pur met longtemps à rencontrer les positions défensives que l'IA Minimax
+exploite. Le pool tire, à chaque épisode, un adversaire selon des poids de mélange:
+
+- 'self'              : self-play classique (l'agent joue les deux camps)
+- 'minimax:difficile' : Minimax parfait (coups mémorisés, voir evaluation.oracle_move)
+- 'minimax:moyen'     : 50% coup aléatoire, 50% coup Minimax (comme morpion.py)
+- 'minimax:facile'    : coups aléatoires (comme morpion.py)
+- 'random'            : coups aléatoires
+- 'snapshot'          : ancienne version figée du QNetwork (gloutonne, petit epsilon)
+
+Aléatoire: par défaut le module `random` (reproductible avec `random.seed`, comme l'IA de
+morpion.py); passer `rng=random.Random(graine)` pour un flux indépendant.
+
+Les snapshots sont stockés en float16 sur CPU (~11 ko pour le réseau par défaut) et
+rechargés à la demande dans un unique réseau de travail.
+
+Exemple:
+    pool = OpponentPool({"self": 0.4, "minimax:difficile": 0.3, "random": 0.1, "snapshot": 0.2})
+    self_play_train(agent, episodes=3000, opponents=pool)
+"""
+
+from __future__ import annotations
+
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from evaluation import oracle_move
+from tictactoe_env import to_perspective, valid_actions
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_POOL_WEIGHTS: Dict[str, float] = {
+    "self": 0.4,
+    "minimax:difficile": 0.25,
+    "minimax:moyen": 0.1,
+    "minimax:facile": 0.05,
+    "random": 0.05,
+    "snapshot": 0.15,
+}
+DEFAULT_SNAPSHOT_EVERY = 250  # épisodes entre deux snapshots
+DEFAULT_MAX_SNAPSHOTS = 8
+DEFAULT_SNAPSHOT_EPSILON = 0.05
+
+KINDS = ("self", "minimax:difficile", "minimax:moyen", "minimax:facile", "random", "snapshot")
+
+
+def _chars(board_abs: List[int]) -> List[str]:
+    return ['X' if v == 1 else 'O' if v == -1 else ' ' for v in board_abs]
+
+
+class RandomOpponent:
+    name = "random"
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng if rng is not None else random
+
+    def act(self, board_abs: List[int], player: int) -> int:
+        valid = valid_actions(board_abs)
+        return self.rng.choice(valid) if valid else -1
+
+
+class MinimaxOpponent:
+    """IA Minimax de morpion.py, même répartition de coups que `meilleur_coup` par difficulté."""
+
+    def __init__(self, difficulte: str = "difficile", rng: Optional[random.Random] = None):
+        self.difficulte = difficulte
+        self.name = f"minimax:{difficulte}"
+        self.rng = rng if rng is not None else random
+
+    def act(self, board_abs: List[int], player: int) -> int:
+        valid = valid_actions(board_abs)
+        if not valid:
+            return -1
+        if self.difficulte == "facile" or (self.difficulte == "moyen" and self.rng.random() < 0.5):
+            return self.rng.choice(valid)
+        # 'difficile' est déterministe et mémorisé: bien plus rapide que l'IA de morpion.py
+        return oracle_move(_chars(board_abs), 'X' if player == 1 else 'O', "difficile")
+
+
+class SnapshotOpponent:
+    """Version figée du QNetwork (poids float16), jouée de façon gloutonne."""
+
+    name = "snapshot"
+
+    def __init__(self, state_dict: Dict[str, object], episode: int, network, epsilon: float,
+                 rng: random.Random):
+        self.state_dict = state_dict
+        self.episode = episode
+        self.network = network  # réseau de travail partagé par tous les snapshots du pool
+        self.epsilon = epsilon
+        self.rng = rng
+
+    def act(self, board_abs: List[int], player: int) -> int:
+        import torch
+
+        valid = valid_actions(board_abs)
+        if not valid:
+            return -1
+        if self.rng.random() < self.epsilon:
+            return self.rng.choice(valid)
+        if getattr(self.network, "loaded_snapshot", None) is not self:
+            self.network.load_state_dict({k: v.float() for k, v in self.state_dict.items()})
+            self.network.loaded_snapshot = self
+        state = torch.tensor([to_perspective(board_abs, player)], dtype=torch.float32)
+        with torch.no_grad():
+            q_values = self.network(state)[0].tolist()
+        return max(valid, key=lambda a: q_values[a])
+
+
+class OpponentPool:
+    """Tire un adversaire par épisode selon `weights` et archive des snapshots de l'agent."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        max_snapshots: int = DEFAULT_MAX_SNAPSHOTS,
+        snapshot_epsilon: float = DEFAULT_SNAPSHOT_EPSILON,
+        rng: Optional[random.Random] = None,
+    ):
+        self.weights = dict(DEFAULT_POOL_WEIGHTS if weights is None else weights)
+        unknown = set(self.weights) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Adversaire inconnu: {', '.join(sorted(unknown))} (possibles: {', '.join(KINDS)})")
+        if sum(self.weights.values()) <= 0:
+            raise ValueError("La somme des poids du pool doit être > 0")
+        self.snapshot_every = snapshot_every
+        self.snapshot_epsilon = snapshot_epsilon
+        self.rng = rng if rng is not None else random
+        self.snapshots: Deque[SnapshotOpponent] = deque(maxlen=max_snapshots)
+        self.counts: Dict[str, int] = {k: 0 for k in KINDS}
+        self._opponents = {
+            "random": RandomOpponent(self.rng),
+            "minimax:difficile": MinimaxOpponent("difficile", self.rng),
+            "minimax:moyen": MinimaxOpponent("moyen", self.rng),
+            "minimax:facile": MinimaxOpponent("facile", self.rng),
+        }
+        self._network = None
+
+    def sample(self, agent) -> Optional[object]:
+        """Adversaire de l'épisode suivant, ou None pour un épisode de self-play."""
+        kinds = [k for k, w in self.weights.items() if w > 0 and (k != "snapshot" or self.snapshots)]
+        if not kinds:
+            kind = "self"
+        else:
+            kind = self.rng.choices(kinds, weights=[self.weights[k] for k in kinds])[0]
+        self.counts[kind] += 1
+        if kind == "self":
+            return None
+        if kind == "snapshot":
+            return self.rng.choice(list(self.snapshots))
+        return self._opponents[kind]
+
+    def snapshot(self, agent, episode: int = 0) -> Optional[SnapshotOpponent]:
+        """Fige les poids actuels de l'agent (float16, CPU). Sans effet si l'agent n'a pas de réseau."""
+        q = getattr(agent, "q", None)
+        if q is None or not hasattr(q, "state_dict"):
+            return None
+        if self._network is None:
+            import copy
+
+            self._network = copy.deepcopy(q).cpu().eval()
+        state_dict = {k: v.detach().to("cpu", copy=True).half() for k, v in q.state_dict().items()}
+        snap = SnapshotOpponent(state_dict, episode, self._network, self.snapshot_epsilon, self.rng)
+        self.snapshots.append(snap)
+        return snap
+
+    def on_episode_end(self, agent, episode: int) -> None:
+        if self.snapshot_every > 0 and episode % self.snapshot_every == 0:
+            self.snapshot(agent, episode)
@@ -0,0 +1,151 @@
+"""perf_hud.py
+
+Surcouche de performance pour l'interface Pygame (touche F3 pour l'afficher / la masquer).
+
+Mesures (fenêtre glissante des `DEFAULT_HUD_FENETRE` derniers échantillons, en ms):
+- `frame`     : travail d'une image (événements + dessin + flip), hors attente de `tick`
+- `evenement` : traitement d'un événement (clic, survol...), révèle les appels bloquants
+- `tour_ia`   : choix du coup par l'agent (inférence)
+- `train_step`, `save`, `bootstrap` : apprentissage et sauvegarde en jeu
+FPS glissant calculé sur l'intervalle réel entre deux images.
+
+`exporter(chemin)` écrit tous les échantillons conservés en CSV (t, mesure, ms), ex. pour
+analyser après coup les blocages observés sur une borne.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_HUD_FENETRE = 600  # échantillons conservés par mesure (~10 s d'images à 60 FPS)
+DEFAULT_HUD_RAFRAICHISSEMENT_S = 0.25  # le texte de la surcouche est recalculé 4 fois par seconde
+
+MESURES = ("frame", "evenement", "tour_ia", "train_step", "save", "bootstrap")
+
+
+def _percentile(valeurs: List[float], p: float) -> float:
+    if not valeurs:
+        return 0.0
+    ordonnees = sorted(valeurs)
+    k = min(len(ordonnees) - 1, max(0, int(round(p / 100.0 * (len(ordonnees) - 1)))))
+    return ordonnees[k]
+
+
+class PerfHUD:
+    def __init__(self, fenetre: int = DEFAULT_HUD_FENETRE, visible: bool = False):
+        self.visible = visible
+        self.fenetre = fenetre
+        self.t0 = time.perf_counter()
+        self.echantillons: Dict[str, Deque[Tuple[float, float]]] = {m: deque(maxlen=fenetre) for m in MESURES}
+        self.intervalles: Deque[float] = deque(maxlen=fenetre)
+        self._derniere_image: Optional[float] = None
+        self._debut_image = 0.0
+        self._surface: Optional[pygame.Surface] = None
+        self._prochain_rafraichissement = 0.0
+        self._police: Optional[pygame.font.Font] = None
+
+    def basculer(self) -> None:
+        self.visible = not self.visible
+        self._surface = None
+
+    # --- collecte ---
+    def ajouter(self, mesure: str, ms: float) -> None:
+        # appelée à chaque évènement et chaque image: pas de deque construite pour rien
+        if mesure not in self.echantillons:
+            self.echantillons[mesure] = deque(maxlen=self.fenetre)
+        self.echantillons[mesure].append((time.perf_counter() - self.t0, ms))
+
+    @contextmanager
+    def mesurer(self, mesure: str) -> Iterator[None]:
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ajouter(mesure, (time.perf_counter() - debut) * 1000.0)
+
+    def debut_image(self) -> None:
+        maintenant = time.perf_counter()
+        if self._derniere_image is not None:
+            self.intervalles.append(maintenant - self._derniere_image)
+        self._derniere_image = maintenant
+        self._debut_image = maintenant
+
+    def fin_image(self) -> None:
+        """À appeler après `pygame.display.flip()`, avant `tick` (l'attente n'est pas comptée)."""
+        self.ajouter("frame", (time.perf_counter() - self._debut_image) * 1000.0)
+
+    # --- statistiques ---
+    def fps(self) -> float:
+        total = sum(self.intervalles)
+        return len(self.intervalles) / total if total > 0 else 0.0
+
+    def stats(self, mesure: str) -> Dict[str, float]:
+        valeurs = [ms for _, ms in self.echantillons.get(mesure, ())]
+        return {
+            "n": len(valeurs),
+            "p50": _percentile(valeurs, 50),
+            "p95": _percentile(valeurs, 95),
+            "p99": _percentile(valeurs, 99),
+            "max": max(valeurs) if valeurs else 0.0,
+        }
+
+    def lignes(self) -> List[str]:
+        lignes = [f"FPS {self.fps():5.1f}   (F3: masquer, F4: exporter)"]
+        for mesure in self.echantillons:
+            s = self.stats(mesure)
+            if s["n"]:
+                lignes.append(
+                    f"{mesure:<10} p50 {s['p50']:6.1f}  p95 {s['p95']:6.1f}  p99 {s['p99']:6.1f}  "
+                    f"max {s['max']:7.1f} ms  (n={s['n']})"
+                )
+        return lignes
+
+    # --- affichage ---
+    def dessiner(self, ecran: pygame.Surface) -> None:
+        if not self.visible:
+            return
+        maintenant = time.perf_counter()
+        if self._surface is None or maintenant >= self._prochain_rafraichissement:
+            self._surface = self._rendre()
+            self._prochain_rafraichissement = maintenant + DEFAULT_HUD_RAFRAICHISSEMENT_S
+        ecran.blit(self._surface, (8, 8))
+
+    def _rendre(self) -> pygame.Surface:
+        if self._police is None:
+            self._police = pygame.font.SysFont("monospace", 14) or pygame.font.Font(None, 18)
+        rendus = [self._police.render(l, True, (255, 255, 255)) for l in self.lignes()]
+        largeur = max(r.get_width() for r in rendus) + 12
+        hauteur = sum(r.get_height() for r in rendus) + 12
+        surface = pygame.Surface((largeur, hauteur), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        y = 6
+        for r in rendus:
+            surface.blit(r, (6, y))
+            y += r.get_height()
+        return surface
+
+    # --- export ---
+    def exporter(self, chemin: str) -> int:
+        """Écrit les échantillons conservés (CSV: t_s, mesure, ms). Retourne le nombre de lignes."""
+        if os.path.dirname(chemin):
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        lignes = sorted(
+            (t, mesure, ms) for mesure, valeurs in self.echantillons.items() for t, ms in valeurs
+        )
+        with open(chemin, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["t_s", "mesure", "ms"])
+            for t, mesure, ms in lignes:
+                writer.writerow([f"{t:.4f}", mesure, f"{ms:.3f}"])
+        return len(lignes)
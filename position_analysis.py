@@ -0,0 +1,281 @@
+"""position_analysis.py
+
+Analyse de positions en masse (tutorat, étiquetage, tableaux de bord).
+
+Pour chaque plateau: score exact de chaque coup légal, ensemble des coups optimaux et
+valeur de la position, du point de vue du joueur qui doit jouer.
+
+    score > 0 : victoire forcée (plus grand = victoire plus rapide)
+    score = 0 : nul avec un jeu parfait
+    score < 0 : défaite forcée (plus petit = défaite plus rapide)
+
+Les scores viennent de la résolution complète du jeu (`state_index.negamax_scores`), identique
+au Minimax de `morpion.py` en mode 'difficile'. Le calcul est vectorisé par tranche de
+plateaux (NumPy) et les tranches sont réparties sur un pool de processus:
+
+- `analyze_positions(boards)` est un générateur: les résultats arrivent dans l'ordre des
+  entrées, au fil de l'eau
+- au plus `workers * DEFAULT_CHUNKS_IN_FLIGHT` tranches sont en cours à la fois: la mémoire
+  reste constante quelle que soit la longueur de l'entrée (itérable infini accepté)
+
+Formats de plateau acceptés: chaîne de 9 caractères ('X', 'O', et ' ', '.', '-' ou '_' pour
+une case vide), liste de 9 caractères, ou liste de 9 entiers (1 = X, -1 = O, 0 = vide).
+
+Exemple:
+    for r in analyze_positions(["X...O....", "XX.OO...."], workers=4):
+        print(r["plateau"], r["optimaux"], r["valeur"])
+
+    python position_analysis.py positions.txt --workers 4 > analyses.jsonl
+    python position_analysis.py --benchmark 200000 --workers 1,2,4
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from state_index import FLIP, LEGAL_MASK, N_STATES, POW3, TERMINAL, WINNER, negamax_scores
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_CHUNK_SIZE = 4096  # plateaux par tranche envoyée à un processus
+DEFAULT_CHUNKS_IN_FLIGHT = 2  # tranches en cours par processus (borne la mémoire)
+
+_VIDES = {' ', '.', '-', '_'}
+_ISSUES = {1: "victoire", 0: "nul", -1: "défaite"}
+
+
+class EntreeIllisible(NamedTuple):
+    """Entrée rejetée avant l'analyse (ex: ligne JSON mal formée du CLI); produit un enregistrement "erreur"."""
+
+    texte: str
+    erreur: str
+
+
+def parse_board(board: Any) -> Tuple[int, int]:
+    """Plateau -> (index absolu, joueur qui doit jouer: 1 = X, -1 = O).
+
+    Raises:
+        ValueError si le plateau est mal formé ou impossible (X commence toujours)
+    """
+    if isinstance(board, EntreeIllisible):
+        raise ValueError(board.erreur)
+    if isinstance(board, str):
+        if len(board) != 9:
+            raise ValueError(f"plateau de {len(board)} cases (9 attendues)")
+        board = list(board)
+    if len(board) != 9:
+        raise ValueError(f"plateau de {len(board)} cases (9 attendues)")
+    idx = 0
+    n_x = n_o = 0
+    for i, c in enumerate(board):
+        if isinstance(c, str):
+            c = c.upper()
+            v = 1 if c == 'X' else (-1 if c == 'O' else (0 if c in _VIDES else None))
+        else:
+            v = int(c) if c in (-1, 0, 1) else None
+        if v is None:
+            raise ValueError(f"case {i} invalide: {c!r}")
+        if v == 1:
+            idx += POW3[i]
+            n_x += 1
+        elif v == -1:
+            idx += 2 * POW3[i]
+            n_o += 1
+    if n_x - n_o not in (0, 1):
+        raise ValueError(f"position impossible ({n_x} X, {n_o} O)")
+    return idx, (1 if n_x == n_o else -1)
+
+
+def _board_str(idx: int) -> str:
+    chars = []
+    for _ in range(9):
+        d = idx % 3
+        chars.append('.' if d == 0 else ('X' if d == 1 else 'O'))
+        idx //= 3
+    return "".join(chars)
+
+
+def analyze_indices(idx_abs: np.ndarray, players: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Noyau vectorisé.
+
+    Args:
+        idx_abs: index absolus (1 = X) [n]
+        players: joueur qui doit jouer (1 = X, -1 = O) [n]
+
+    Returns:
+        (scores int16 [n, 9], légal bool [n, 9]); scores des coups illégaux = 0
+    """
+    scores_table = negamax_scores()
+    idx_abs = idx_abs.astype(np.int64)
+    persp = np.where(players == 1, idx_abs, FLIP[idx_abs]).astype(np.int64)
+    legal = LEGAL_MASK[persp]
+    scores = np.zeros((len(persp), 9), dtype=np.int16)
+    for a in range(9):
+        child = np.where(legal[:, a], persp + POW3[a], 0)
+        scores[:, a] = np.where(legal[:, a], -scores_table[FLIP[child]].astype(np.int16), 0)
+    return scores, legal
+
+
+def analyze_chunk(boards: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Analyse une tranche de plateaux (exécuté dans un processus du pool)."""
+    parsed: List[Optional[Tuple[int, int]]] = []
+    errors: Dict[int, str] = {}
+    for i, b in enumerate(boards):
+        try:
+            parsed.append(parse_board(b))
+        except (TypeError, ValueError) as e:
+            parsed.append(None)
+            errors[i] = str(e)
+
+    ok = [i for i, p in enumerate(parsed) if p is not None]
+    idx_abs = np.array([parsed[i][0] for i in ok], dtype=np.int64)
+    players = np.array([parsed[i][1] for i in ok], dtype=np.int8)
+    scores, legal = analyze_indices(idx_abs, players)
+
+    results: List[Dict[str, Any]] = [{} for _ in boards]
+    for i, msg in errors.items():
+        b = boards[i]
+        if isinstance(b, EntreeIllisible):
+            b = b.texte
+        results[i] = {"plateau": b if isinstance(b, (str, list)) else repr(b), "erreur": msg}
+    for row, i in enumerate(ok):
+        idx, player = parsed[i]
+        r: Dict[str, Any] = {"plateau": _board_str(idx), "joueur": 'X' if player == 1 else 'O'}
+        if TERMINAL[idx]:
+            r.update(scores=[None] * 9, optimaux=[], valeur=None,
+                     issue={1: "X gagne", -1: "O gagne"}.get(int(WINNER[idx]), "nul"))
+        else:
+            ligne = scores[row].tolist()
+            masque = legal[row].tolist()
+            valeur = max(s for s, l in zip(ligne, masque) if l)
+            r.update(
+                scores=[s if l else None for s, l in zip(ligne, masque)],
+                optimaux=[a for a in range(9) if masque[a] and ligne[a] == valeur],
+                valeur=valeur,
+                issue=_ISSUES[(valeur > 0) - (valeur < 0)],
+            )
+        results[i] = r
+    return results
+
+
+def _init_worker() -> None:
+    negamax_scores()  # résolution du jeu une fois par processus
+
+
+def _chunks(boards: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    it = iter(boards)
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def analyze_positions(
+    boards: Iterable[Any],
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunks_in_flight: int = DEFAULT_CHUNKS_IN_FLIGHT,
+) -> Iterator[Dict[str, Any]]:
+    """Analyse en flux (ordre des entrées conservé).
+
+    Args:
+        workers: processus du pool (0 = nombre de cœurs, 1 = dans le processus appelant)
+        chunk_size: plateaux par tranche
+        chunks_in_flight: tranches en attente par processus
+
+    Yields:
+        {"plateau", "joueur", "scores" (9 valeurs, None si coup illégal), "optimaux", "valeur", "issue"}
+        ou {"plateau", "erreur"} pour une entrée invalide
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(boards, chunk_size):
+            yield from analyze_chunk(chunk)
+        return
+
+    negamax_scores()  # calculé avant le fork: hérité par les processus (pas de recalcul)
+    pending: Deque[Future] = deque()
+    max_pending = workers * max(1, chunks_in_flight)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for chunk in _chunks(boards, chunk_size):
+            pending.append(pool.submit(analyze_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def benchmark(n_boards: int, workers_list: List[int], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict[str, float]]:
+    """Débit (plateaux/s) pour chaque nombre de processus, sur les plateaux légaux répétés."""
+    states = [_board_str(int(i)) for i in _legal_absolute_indices()]
+    rows = []
+    for w in workers_list:
+        boards = itertools.islice(itertools.cycle(states), n_boards)
+        t0 = time.perf_counter()
+        n = sum(1 for _ in analyze_positions(boards, workers=w, chunk_size=chunk_size))
+        dt = time.perf_counter() - t0
+        rows.append({"workers": w, "boards": n, "seconds": round(dt, 3), "boards_per_s": round(n / dt)})
+    return rows
+
+
+def _legal_absolute_indices() -> np.ndarray:
+    """Index absolus des plateaux où X commence (nX - nO dans {0, 1})."""
+    digits = (np.arange(N_STATES)[:, None] // np.array(POW3)[None, :]) % 3
+    diff = (digits == 1).sum(axis=1) - (digits == 2).sum(axis=1)
+    return np.flatnonzero((diff == 0) | (diff == 1))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyse de positions en masse (scores exacts de chaque coup)")
+    parser.add_argument("entree", nargs="?", default="-",
+                        help="un plateau par ligne (ex: X...O....), ou JSON; '-' = entrée standard")
+    parser.add_argument("--workers", default="0", help="processus (0 = nombre de cœurs); liste pour --benchmark")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="mesure le débit sur N plateaux pour chaque valeur de --workers (ex: 1,2,4)")
+    args = parser.parse_args()
+    workers_list = [int(w) for w in args.workers.split(",")]
+
+    if args.benchmark:
+        for row in benchmark(args.benchmark, workers_list, args.chunk_size):
+            print(f"{row['workers']} processus: {row['boards_per_s']} plateaux/s ({row['seconds']} s)")
+        return
+
+    def lignes(f) -> Iterator[Any]:
+        for ligne in f:
+            ligne = ligne.rstrip("\n")
+            if not ligne.strip():
+                continue
+            if not ligne.lstrip().startswith(("[", '"')):
+                yield ligne
+                continue
+            try:
+                yield json.loads(ligne)
+            except json.JSONDecodeError as e:
+                # signalée dans le flux (enregistrement "erreur") sans arrêter l'analyse
+                yield EntreeIllisible(ligne, f"JSON illisible: {e}")
+
+    f = sys.stdin if args.entree == "-" else open(args.entree, "r", encoding="utf-8")
+    try:
+        for r in analyze_positions(lignes(f), workers=workers_list[0], chunk_size=args.chunk_size):
+            sys.stdout.write(json.dumps(r, ensure_ascii=False) + "\n")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+if __name__ == "__main__":
+    main()
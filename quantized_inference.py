@@ -0,0 +1,355 @@
+"""quantized_inference.py
+
+Variantes d'inférence compactes du `QNetwork` pour les processus qui ne font que jouer.
+
+Un checkpoint d'entraînement (`models/dqn_tictactoe.pt`) contient aussi le target network
+et l'état de l'optimizer (Adam: 2 tenseurs par paramètre). Un processus de jeu n'a besoin
+que des poids du réseau online, éventuellement compressés:
+
+- 'dynamic_int8': `torch.ao.quantization.quantize_dynamic` (Linear int8, activations quantifiées à la volée)
+- 'int8': poids int8 symétriques par neurone de sortie + échelle fp32, calibrés (voir plus bas)
+- 'fp16': poids stockés en float16
+
+Le gain est la taille de l'artefact (fichier et transfert), pas la vitesse: 'int8' et 'fp16'
+reconstruisent une copie float32 des poids une seule fois (construction / chargement) et
+calculent ensuite exactement comme le fp32. À cette taille (9-64-64-9, un état par appel), le
+coût d'un forward est celui des appels de modules, pas des produits matriciels. Mesuré sur un
+cœur CPU bruité: fp32 33-58 µs, int8 et fp16 dans le bruit du fp32 (-16 % à +2 %),
+'dynamic_int8' ~2,5x plus lent (activations quantifiées à chaque appel) et moins précis
+(~120 états en désaccord).
+
+Calibration 'int8': l'arrondi naïf par neurone change le coup choisi sur ~50 des 4520 états
+(coups presque à égalité en fp32). Les poids et biais sont donc ajustés
+quelques dizaines de pas (arrondi simulé, estimateur "straight-through") pour reproduire les
+Q-values fp32 avec une marge sur le coup choisi, sur tous les états atteignables: le domaine
+d'entrée entier, il n'y a pas d'autre état à généraliser.
+
+`check_policy_agreement` vérifie sur les 4520 états atteignables que l'argmax masqué
+de la variante compressée coïncide avec celui du modèle fp32. Le CLI ne sauvegarde que si
+tous les états sont en accord (`--min-agreement`, défaut 1.0) et liste les états en désaccord.
+
+Exemple:
+    python quantized_inference.py --model models/dqn_tictactoe.pt --mode int8 --out models/dqn_tictactoe_int8.pt
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import os
+import random
+import time
+import warnings
+from typing import Dict, List, Tuple
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from dqn_agent import DQNAgent, QNetwork
+from tictactoe_env import reachable_states
+
+
+MODES = ("dynamic_int8", "int8", "fp16")
+
+# Accord minimal des argmax avec le fp32 pour sauvegarder: 1.0 = tous les états atteignables
+DEFAULT_MIN_AGREEMENT = 1.0
+DEFAULT_MISMATCHES_SHOWN = 20  # états en désaccord affichés par le CLI
+DEFAULT_INT8_CALIBRATION_STEPS = 500  # pas max (arrêt dès l'accord complet, ~40 pas en pratique)
+DEFAULT_INT8_CALIBRATION_LR = 1e-4
+DEFAULT_INT8_CALIBRATION_MARGIN = 1e-3  # écart visé entre le coup fp32 et le suivant
+
+
+class _DequantizedLinear(nn.Module):
+    """Linear dont les poids compressés sont dans le state_dict et une copie float32 en mémoire.
+
+    La copie (`weight_f`, `bias_f`, non sauvegardée) est reconstruite une fois, à la construction
+    et au chargement: le forward ne convertit rien.
+    """
+
+    def _dequantize(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        raise NotImplementedError
+
+    def _refresh(self) -> None:
+        weight, bias = self._dequantize()
+        self.register_buffer("weight_f", weight, persistent=False)
+        self.register_buffer("bias_f", bias, persistent=False)
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        super()._load_from_state_dict(*args, **kwargs)
+        self._refresh()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return F.linear(x, self.weight_f, self.bias_f)
+
+
+class Int8Linear(_DequantizedLinear):
+    """Linear avec poids int8 (symétrique, une échelle par neurone de sortie)."""
+
+    def __init__(self, linear: nn.Linear):
+        super().__init__()
+        w = linear.weight.detach().float()
+        scale = _int8_scale(w)
+        self.register_buffer("weight_q", torch.round(w / scale[:, None]).clamp(-127, 127).to(torch.int8))
+        self.register_buffer("scale", scale)
+        self.register_buffer("bias", linear.bias.detach().float().clone())
+        self._refresh()
+
+    def _dequantize(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.weight_q.float() * self.scale[:, None], self.bias
+
+
+class FP16Linear(_DequantizedLinear):
+    """Linear avec poids stockés en float16 (moitié de la taille du fichier)."""
+
+    def __init__(self, linear: nn.Linear):
+        super().__init__()
+        self.register_buffer("weight_h", linear.weight.detach().half().clone())
+        self.register_buffer("bias_h", linear.bias.detach().half().clone())
+        self._refresh()
+
+    def _dequantize(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.weight_h.float(), self.bias_h.float()
+
+
+def _int8_scale(w: torch.Tensor) -> torch.Tensor:
+    return w.abs().amax(dim=1).clamp(min=1e-8) / 127.0
+
+
+def _fake_int8(w: torch.Tensor) -> torch.Tensor:
+    """Poids arrondis comme `Int8Linear` (gradient "straight-through" vers `w`)."""
+    scale = _int8_scale(w).detach()[:, None]
+    wq = torch.round(w / scale).clamp(-127, 127) * scale
+    return w + (wq - w).detach()
+
+
+def calibrate_int8(
+    q: QNetwork,
+    steps: int = DEFAULT_INT8_CALIBRATION_STEPS,
+    lr: float = DEFAULT_INT8_CALIBRATION_LR,
+    margin: float = DEFAULT_INT8_CALIBRATION_MARGIN,
+) -> Tuple[QNetwork, int]:
+    """Copie de `q` dont l'arrondi int8 garde l'argmax masqué de `q` sur tous les états atteignables.
+
+    Perte: erreur quadratique avec les Q-values fp32 (coups légaux) + marge (hinge) entre le
+    coup fp32 et le meilleur autre coup légal, poids arrondis simulés dans le forward.
+
+    Returns:
+        (réseau calibré en float32, nombre d'états encore en désaccord: 0 sauf si `steps` ne suffit pas)
+    """
+    model = copy.deepcopy(q).cpu().float()
+    x = torch.tensor(reachable_states(), dtype=torch.float32)
+    legal = x == 0
+    with torch.no_grad():
+        q_ref = q.cpu().float()(x)
+    a_ref = _masked_argmax(q_ref, x)
+    chosen = F.one_hot(a_ref, 9).bool()
+    linears = [m for m in model.net if isinstance(m, nn.Linear)]
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+
+    def forward() -> torch.Tensor:
+        h = x
+        for i, layer in enumerate(linears):
+            h = F.linear(h, _fake_int8(layer.weight), layer.bias)
+            if i < len(linears) - 1:
+                h = torch.relu(h)
+        return h
+
+    best_state, best_mismatches = copy.deepcopy(model.state_dict()), len(x) + 1
+    for _ in range(steps + 1):
+        q_cand = forward()
+        mismatches = int((_masked_argmax(q_cand.detach(), x) != a_ref).sum().item())
+        if mismatches < best_mismatches:
+            best_state, best_mismatches = copy.deepcopy(model.state_dict()), mismatches
+        if mismatches == 0:
+            break
+        best = q_cand.gather(1, a_ref[:, None]).squeeze(1)
+        other = q_cand.masked_fill(~legal | chosen, -1e9).max(dim=1).values
+        loss = F.mse_loss(q_cand[legal], q_ref[legal]) + 10.0 * F.relu(margin - (best - other)).mean()
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    model.load_state_dict(best_state)
+    return model, best_mismatches
+
+
+def _replace_linears(model: QNetwork, factory) -> QNetwork:
+    layers = [factory(m) if isinstance(m, nn.Linear) else m for m in model.net]
+    model.net = nn.Sequential(*layers)
+    return model
+
+
+def quantize_qnetwork(q: QNetwork, mode: str = "int8", calibrate: bool = True) -> nn.Module:
+    """Construit une copie compressée (inférence seule) de `q`.
+
+    Args:
+        calibrate: 'int8' seulement, voir `calibrate_int8` (False: arrondi naïf, ex. squelette
+            à remplir par `load_state_dict`)
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode inconnu: {mode} (modes: {', '.join(MODES)})")
+    if mode == "int8" and calibrate:
+        q, _ = calibrate_int8(q)
+    model = copy.deepcopy(q).cpu().eval()
+    for p in model.parameters():
+        p.requires_grad_(False)
+
+    if mode == "dynamic_int8":
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            from torch.ao.quantization import quantize_dynamic
+
+            return quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    if mode == "int8":
+        return _replace_linears(model, Int8Linear)
+    return _replace_linears(model, FP16Linear)
+
+
+def _masked_argmax(q_values: torch.Tensor, states: torch.Tensor) -> torch.Tensor:
+    return torch.where(states == 0, q_values, torch.full_like(q_values, -1e9)).argmax(dim=1)
+
+
+@torch.no_grad()
+def check_policy_agreement(reference: nn.Module, candidate: nn.Module) -> Dict[str, object]:
+    """Compare les argmax masqués sur tous les états atteignables.
+
+    Returns:
+        {'states', 'agreement' (fraction), 'mismatches' (liste d'états), 'mismatch_actions'
+        (liste de (coup fp32, coup compressé)), 'max_abs_error'}
+    """
+    states = reachable_states()
+    x = torch.tensor(states, dtype=torch.float32)
+    q_ref = reference.cpu().eval()(x)
+    q_cand = candidate(x)
+    a_ref = _masked_argmax(q_ref, x)
+    a_cand = _masked_argmax(q_cand, x)
+    same = a_ref == a_cand
+    rows = torch.nonzero(~same).flatten().tolist()
+    return {
+        "states": len(states),
+        "agreement": float(same.float().mean().item()),
+        "mismatches": [states[i] for i in rows],
+        "mismatch_actions": [(int(a_ref[i]), int(a_cand[i])) for i in rows],
+        "max_abs_error": float((q_ref - q_cand).abs().max().item()),
+    }
+
+
+class QuantizedPolicy:
+    """Politique de jeu (sans apprentissage) sur un réseau compressé.
+
+    Expose `select_action` / `set_epsilon_for_difficulty` comme `DQNAgent`.
+    """
+
+    def __init__(self, model: nn.Module, mode: str):
+        self.model = model.eval()
+        self.mode = mode
+        self.epsilon = 0.0
+
+    @classmethod
+    def from_agent(cls, agent: DQNAgent, mode: str = "int8") -> "QuantizedPolicy":
+        return cls(quantize_qnetwork(agent.q, mode), mode)
+
+    def set_epsilon_for_difficulty(self, difficulte: str) -> None:
+        d = (difficulte or "difficile").lower()
+        self.epsilon = 0.40 if d == "facile" else 0.15 if d == "moyen" else 0.05
+
+    @torch.no_grad()
+    def select_action(self, state: List[float], valid: List[int], training: bool = False) -> int:
+        if not valid:
+            return -1
+        if random.random() < self.epsilon:
+            return random.choice(valid)
+        q_values = self.model(torch.tensor([state], dtype=torch.float32))[0].tolist()
+        return max(valid, key=lambda a: q_values[a])
+
+    def save(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        torch.save({"mode": self.mode, "model": self.model.state_dict()}, path)
+
+    @classmethod
+    def load(cls, path: str) -> "QuantizedPolicy":
+        ckpt = torch.load(path, map_location="cpu")
+        model = quantize_qnetwork(QNetwork(), ckpt["mode"], calibrate=False)
+        model.load_state_dict(ckpt["model"])
+        return cls(model, ckpt["mode"])
+
+
+def _model_bytes(model: nn.Module) -> int:
+    """Taille des poids sauvegardés (hors copies float32 non persistantes)."""
+    total = 0
+    for t in model.state_dict().values():
+        if isinstance(t, torch.Tensor) and not t.is_quantized:
+            total += t.numel() * t.element_size()
+    for m in model.modules():
+        if hasattr(m, "_packed_params") and callable(getattr(m, "weight", None)):
+            # DynamicQuantizedLinear: poids dans un objet opaque
+            w, b = m.weight(), m.bias()
+            total += w.numel() * w.element_size() + (b.numel() * b.element_size() if b is not None else 0)
+    return total
+
+
+def _latency_us(models: Dict[str, nn.Module], repeats: int = 500, rounds: int = 10) -> Dict[str, float]:
+    """Latence d'un forward (1 état), meilleure de `rounds` tranches alternées entre modèles."""
+    x = torch.zeros(1, 9)
+    best = {nom: float("inf") for nom in models}
+    with torch.no_grad():
+        for model in models.values():
+            for _ in range(50):
+                model(x)
+        for _ in range(rounds):
+            for nom, model in models.items():
+                t0 = time.perf_counter()
+                for _ in range(repeats):
+                    model(x)
+                best[nom] = min(best[nom], (time.perf_counter() - t0) / repeats * 1e6)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export d'un QNetwork compressé pour l'inférence")
+    parser.add_argument("--model", default="models/dqn_tictactoe.pt")
+    parser.add_argument("--mode", choices=MODES, default="int8")
+    parser.add_argument("--out", default=None, help="fichier de sortie (défaut: <model>_<mode>.pt)")
+    parser.add_argument("--min-agreement", type=float, default=DEFAULT_MIN_AGREEMENT,
+                        help="accord minimal avec la politique fp32 pour sauvegarder (0..1, défaut: tous les états)")
+    args = parser.parse_args()
+
+    agent = DQNAgent(device="cpu")
+    if not agent.load(args.model):
+        raise SystemExit(f"Modèle introuvable: {args.model}")
+
+    policy = QuantizedPolicy.from_agent(agent, args.mode)
+    report = check_policy_agreement(agent.q, policy.model)
+    print(
+        f"{args.mode}: accord argmax {report['agreement'] * 100:.2f}% sur {report['states']} états "
+        f"({len(report['mismatches'])} différences, erreur max {report['max_abs_error']:.4f})"
+    )
+    latence = _latency_us({"fp32": agent.q.cpu().eval(), args.mode: policy.model})
+    print(
+        f"taille poids: fp32 {_model_bytes(agent.q)} o -> {_model_bytes(policy.model)} o | "
+        f"latence: fp32 {latence['fp32']:.1f} µs, {args.mode} {latence[args.mode]:.1f} µs "
+        f"({(latence[args.mode] / latence['fp32'] - 1) * 100:+.0f}%)"
+    )
+
+    if report["mismatches"]:
+        print("états en désaccord (perspective du joueur qui doit jouer: X = 1, O = -1; coup fp32 -> compressé):")
+        for state, (a_ref, a_cand) in list(zip(report["mismatches"], report["mismatch_actions"]))[:DEFAULT_MISMATCHES_SHOWN]:
+            plateau = "".join('X' if v > 0 else ('O' if v < 0 else '.') for v in state)
+            print(f"  {plateau}  {a_ref} -> {a_cand}")
+        if len(report["mismatches"]) > DEFAULT_MISMATCHES_SHOWN:
+            print(f"  ... et {len(report['mismatches']) - DEFAULT_MISMATCHES_SHOWN} autres")
+
+    if report["agreement"] < args.min_agreement:
+        raise SystemExit(
+            f"Accord insuffisant ({len(report['mismatches'])} états en désaccord, "
+            f"< {args.min_agreement * 100:.1f}%): modèle non sauvegardé"
+        )
+
+    out = args.out or os.path.splitext(args.model)[0] + f"_{args.mode}.pt"
+    policy.save(out)
+    print(f"Sauvegardé: {out}")
+
+
+if __name__ == "__main__":
+    main()
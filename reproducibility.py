@@ -0,0 +1,140 @@
+"""reproducibility.py
+
+Gestion centralisée des générateurs aléatoires (reproductibilité des mesures).
+
+Sources d'aléa du projet:
+- `random` (ε-greedy du DQN, replay, IA Minimax en facile/moyen, agents tabulaires)
+- NumPy (si installé)
+- PyTorch (initialisation des poids, mélanges dans `train_fused`)
+
+Fonctionnalités:
+- `seed_everything(seed)`: fixe toutes les graines
+- `get_rng_state()` / `set_rng_state(state)`: snapshot / restauration (sérialisable, stocké dans les checkpoints)
+- `worker_seed(seed, worker_id)`: graine indépendante et déterministe pour chaque worker parallèle
+
+NumPy et PyTorch restent optionnels: ils sont ignorés s'ils ne sont pas installés.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy optionnel
+    np = None  # type: ignore[assignment]
+
+try:
+    import torch
+except ImportError:  # PyTorch optionnel (version console / agents tabulaires)
+    torch = None  # type: ignore[assignment]
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def worker_seed(seed: int, worker_id: int) -> int:
+    """Dérive une graine 32 bits indépendante pour le worker `worker_id`.
+
+    Deux workers différents (ou deux graines de base différentes) obtiennent des flux
+    décorrélés, contrairement à `seed + worker_id`.
+    """
+    return _splitmix64(_splitmix64(seed & _MASK64) ^ (worker_id & _MASK64)) & 0xFFFFFFFF
+
+
+def seed_everything(seed: int, deterministic: bool = False) -> None:
+    """Fixe les graines de `random`, NumPy et PyTorch.
+
+    Args:
+        seed: graine de base
+        deterministic: force aussi les algorithmes déterministes de PyTorch (plus lent)
+    """
+    random.seed(seed)
+    if np is not None:
+        np.random.seed(seed & 0xFFFFFFFF)
+    if torch is not None:
+        torch.manual_seed(seed)
+        if deterministic:
+            torch.use_deterministic_algorithms(True)
+
+
+def seed_worker(seed: int, worker_id: int) -> int:
+    """Initialise les générateurs d'un worker (processus ou thread) et retourne sa graine."""
+    s = worker_seed(seed, worker_id)
+    seed_everything(s)
+    return s
+
+
+def get_rng_state() -> Dict[str, Any]:
+    """Snapshot de tous les générateurs (types sérialisables par `torch.save` et JSON sauf 'torch')."""
+    version, internal, gauss = random.getstate()
+    state: Dict[str, Any] = {"python": [version, list(internal), gauss]}
+    if np is not None:
+        name, keys, pos, has_gauss, cached = np.random.get_state()
+        state["numpy"] = [name, [int(k) for k in keys], int(pos), int(has_gauss), float(cached)]
+    if torch is not None:
+        state["torch"] = torch.get_rng_state()
+        if torch.cuda.is_available():
+            state["torch_cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state: Optional[Dict[str, Any]]) -> None:
+    """Restaure un snapshot produit par `get_rng_state` (les clés absentes sont ignorées)."""
+    if not state:
+        return
+    if "python" in state:
+        version, internal, gauss = state["python"]
+        random.setstate((version, tuple(internal), gauss))
+    if np is not None and "numpy" in state:
+        name, keys, pos, has_gauss, cached = state["numpy"]
+        np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached))
+    if torch is not None and "torch" in state:
+        torch.set_rng_state(state["torch"])
+        if "torch_cuda" in state and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(state["torch_cuda"])
+
+
+class RNGManager:
+    """Point d'entrée unique pour une exécution reproductible.
+
+    Exemple:
+        rng = RNGManager(seed=42)
+        rng.seed_all()
+        ... entraînement ...
+        snap = rng.snapshot()        # à stocker avec le modèle
+        rng.restore(snap)            # reprise à l'identique
+
+        # dans le worker i d'un pool de processus
+        RNGManager(seed=42).for_worker(i).seed_all()
+    """
+
+    def __init__(self, seed: int = 0, deterministic: bool = False):
+        self.seed = seed
+        self.deterministic = deterministic
+
+    def seed_all(self) -> None:
+        seed_everything(self.seed, self.deterministic)
+
+    def for_worker(self, worker_id: int) -> "RNGManager":
+        return RNGManager(worker_seed(self.seed, worker_id), self.deterministic)
+
+    def python_rng(self, stream: int = 0) -> random.Random:
+        """Générateur `random.Random` privé (n'affecte pas l'état global)."""
+        return random.Random(worker_seed(self.seed, stream))
+
+    @staticmethod
+    def snapshot() -> Dict[str, Any]:
+        return get_rng_state()
+
+    @staticmethod
+    def restore(state: Optional[Dict[str, Any]]) -> None:
+        set_rng_state(state)
@@ -0,0 +1,166 @@
+"""state_index.py
+
+Index dense des plateaux 3x3: chaque plateau correspond à un entier base 3 dans [0, 3^9).
+
+    index = somme(code(case_i) * 3^i)   avec code: 0 = vide, 1 = valeur +1, 2 = valeur -1
+
+L'index se met à jour en O(1) à chaque coup (`play`), et des tables NumPy précalculées
+(une entrée par index, 19683 entrées) remplacent les parcours Python du plateau:
+
+- `CELLS`       int8   [N, 9] valeurs des cases (-1/0/1)
+- `WINNER`      int8   1 / -1 / 0 (même convention que `tictactoe_env.check_winner`)
+- `IS_DRAW`     bool   plateau plein sans gagnant
+- `TERMINAL`    bool   victoire ou nul
+- `LEGAL_MASK`  bool   [N, 9] cases vides (aucun coup légal si terminal)
+- `EMPTIES`     uint8  nombre de cases vides
+- `FLIP`        uint16 index du même plateau vu par l'adversaire (échange +1 / -1)
+- `CANONICAL`   uint16 plus petit index parmi les 8 symétries du plateau (convention de
+                `tictactoe_env.canonical`, qui lit ces tables)
+- `CANONICAL_SYM` uint8 indice dans `tictactoe_env.SYMMETRIES` de la symétrie utilisée
+                (la première en cas d'égalité)
+
+Les tables valent aussi bien pour les plateaux absolus (1 = X) que pour les plateaux
+en perspective (1 = joueur qui doit jouer).
+
+`negamax_scores()` résout le jeu entier par induction rétrograde sur ces tables:
+score du point de vue du joueur qui doit jouer (>0 victoire, <0 défaite, 0 nul;
+|score| plus grand = issue plus rapide).
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from tictactoe_env import SYMMETRIES, WIN_COMBOS
+
+
+N_STATES = 3 ** 9
+POW3: Tuple[int, ...] = tuple(3 ** i for i in range(9))
+_POW3 = np.array(POW3, dtype=np.int64)
+
+# code base 3 d'une valeur de case (+1 -> 1, -1 -> 2, 0 -> 0)
+_CODE = {0: 0, 1: 1, -1: 2}
+
+
+def board_to_index(board: Sequence[float]) -> int:
+    """Plateau (valeurs -1/0/1, entiers ou flottants) -> index."""
+    idx = 0
+    for i, v in enumerate(board):
+        if v > 0:
+            idx += POW3[i]
+        elif v < 0:
+            idx += 2 * POW3[i]
+    return idx
+
+
+def index_to_board(idx: int) -> List[int]:
+    """Index -> plateau (valeurs -1/0/1)."""
+    board = []
+    for _ in range(9):
+        d = idx % 3
+        board.append(0 if d == 0 else (1 if d == 1 else -1))
+        idx //= 3
+    return board
+
+
+def index_from_chars(plateau: Sequence[str], symbole: str) -> int:
+    """Plateau en caractères ('X', 'O', ' ') -> index vu par `symbole` (1 = ses pions)."""
+    idx = 0
+    for i, c in enumerate(plateau):
+        if c == symbole:
+            idx += POW3[i]
+        elif c != ' ':
+            idx += 2 * POW3[i]
+    return idx
+
+
+def play(idx: int, action: int, player: int) -> int:
+    """Mise à jour incrémentale: `player` (1 ou -1) occupe la case `action` (supposée vide)."""
+    return idx + _CODE[player] * POW3[action]
+
+
+def _build_tables():
+    all_idx = np.arange(N_STATES, dtype=np.int64)
+    digits = (all_idx[:, None] // _POW3[None, :]) % 3  # [N, 9]
+    cells = np.where(digits == 1, 1, np.where(digits == 2, -1, 0)).astype(np.int8)
+
+    winner = np.zeros(N_STATES, dtype=np.int8)
+    # ordre inverse pour que la première combinaison trouvée l'emporte (comme check_winner)
+    for a, b, c in reversed(WIN_COMBOS):
+        s = cells[:, a].astype(np.int16) + cells[:, b] + cells[:, c]
+        winner = np.where(s == 3, 1, np.where(s == -3, -1, winner)).astype(np.int8)
+
+    empties = (digits == 0).sum(axis=1).astype(np.uint8)
+    is_draw = (empties == 0) & (winner == 0)
+    terminal = (winner != 0) | is_draw
+    legal = (digits == 0) & ~terminal[:, None]
+
+    swapped = np.where(digits == 0, 0, 3 - digits)
+    flip = (swapped * _POW3[None, :]).sum(axis=1).astype(np.uint16)
+
+    sym_indices = np.stack(
+        [(digits[:, list(perm)] * _POW3[None, :]).sum(axis=1) for perm in SYMMETRIES], axis=1
+    )  # [N, 8]
+    canonical_sym = sym_indices.argmin(axis=1).astype(np.uint8)
+    canonical = sym_indices.min(axis=1).astype(np.uint16)
+
+    tables = (cells, winner, is_draw, terminal, legal, empties, flip, canonical, canonical_sym)
+    for t in tables:
+        t.setflags(write=False)
+    return tables
+
+
+CELLS, WINNER, IS_DRAW, TERMINAL, LEGAL_MASK, EMPTIES, FLIP, CANONICAL, CANONICAL_SYM = _build_tables()
+
+
+def legal_actions(idx: int) -> List[int]:
+    return np.flatnonzero(LEGAL_MASK[idx]).tolist()
+
+
+def step(idx: int, action: int, player: int) -> Tuple[int, int, bool]:
+    """Joue un coup et retourne (nouvel index, gagnant, partie terminée)."""
+    nxt = idx + _CODE[player] * POW3[action]
+    return nxt, int(WINNER[nxt]), bool(TERMINAL[nxt])
+
+
+def perspective_index(idx_abs: int, player: int) -> int:
+    """Index absolu (1 = X) -> index vu par `player` (1 si X, -1 si O)."""
+    return idx_abs if player == 1 else int(FLIP[idx_abs])
+
+
+@lru_cache(maxsize=1)
+def negamax_scores() -> np.ndarray:
+    """Score exact de chaque plateau pour le joueur qui doit jouer (perspective +1).
+
+    - adversaire vient de gagner avec e cases vides: -(e + 1)
+    - nul: 0
+    - sinon: max sur les coups a de -score(plateau après a, vu par l'adversaire)
+    Calcul vectorisé par nombre de cases vides croissant (les enfants sont déjà résolus).
+    """
+    scores = np.zeros(N_STATES, dtype=np.int8)
+    for e in range(10):
+        level = np.flatnonzero(EMPTIES == e)
+        w = WINNER[level]
+        lvl_scores = np.where(w == -1, -(e + 1), np.where(w == 1, e + 1, 0)).astype(np.int16)
+        open_states = level[~TERMINAL[level]]
+        if e > 0 and open_states.size:
+            best = np.full(open_states.size, -128, dtype=np.int16)
+            for a in range(9):
+                can = LEGAL_MASK[open_states, a]
+                child = FLIP[open_states[can] + POW3[a]]
+                cand = -scores[child].astype(np.int16)
+                best[can] = np.maximum(best[can], cand)
+            pos = np.searchsorted(level, open_states)
+            lvl_scores[pos] = best
+        scores[level] = lvl_scores
+    scores.setflags(write=False)
+    return scores
+
+
+def move_scores(idx: int) -> List[Tuple[int, int]]:
+    """[(coup, score)] de chaque coup légal, du point de vue du joueur qui doit jouer."""
+    scores = negamax_scores()
+    return [(a, -int(scores[FLIP[idx + POW3[a]]])) for a in legal_actions(idx)]
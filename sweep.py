@@ -0,0 +1,269 @@
+"""sweep.py
+
+Recherche d'hyperparamètres DQN: essais parallèles (pool de processus) et arrêt anticipé.
+
+Chaque essai:
+1. construit un `DQNConfig` (valeurs par défaut + valeurs tirées dans l'espace de recherche)
+2. s'entraîne par self-play par tranches de `checkpoint_every` épisodes
+3. après chaque tranche, est évalué contre l'IA Minimax (oracle, modes 'difficile' et 'moyen')
+4. est élagué s'il fait moins bien que la médiane des essais déjà arrivés au même checkpoint
+
+Un essai qui dépasse son budget mémoire (`--param memory_budget_mb=...`) est noté en échec
+(colonne `error`) et classé en fin de tableau; les autres essais continuent.
+
+Le tableau de résultats (CSV) est trié par nombre d'épisodes nécessaires pour atteindre
+`target_score`, puis par score final: les configurations qui convergent le plus vite en tête.
+
+Exemple:
+    python sweep.py --trials 16 --workers 4 --episodes 3000 --checkpoint-every 500 \
+        --param lr=1e-3,5e-4,2e-4 --param batch_size=32,64,128 --out runs/sweep.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+from typing import Any, Dict, List, Optional
+
+from dqn_agent import DQNAgent, DQNConfig, self_play_train
+from evaluation import evaluate_vs_minimax
+from memory_budget import MemoryBudgetExceeded
+from reproducibility import seed_worker
+
+
+# Espace de recherche par défaut (champs de DQNConfig)
+DEFAULT_SPACE: Dict[str, List[Any]] = {
+    "gamma": [0.9, 0.95, 0.99],
+    "lr": [1e-3, 5e-4, 2e-4],
+    "batch_size": [32, 64, 128],
+    "min_replay_size": [256, 1_000],
+    "epsilon_decay_steps": [5_000, 15_000, 30_000],
+    "target_update_interval": [100, 500, 1_000],
+    "train_steps_per_move": [1, 2],
+}
+
+DEFAULT_TARGET_SCORE = 0.95
+DEFAULT_MIN_TRIALS_FOR_PRUNING = 4
+
+
+def sample_configs(space: Dict[str, List[Any]], trials: int, seed: int = 0, grid: bool = False) -> List[Dict[str, Any]]:
+    """Tire `trials` jeux de valeurs (aléatoires, ou grille complète si `grid`)."""
+    names = sorted(space)
+    if grid:
+        combos = [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+        return combos[:trials] if trials > 0 else combos
+    rng = random.Random(seed)
+    return [{n: rng.choice(space[n]) for n in names} for _ in range(trials)]
+
+
+def score_agent(agent: DQNAgent, eval_games: int) -> float:
+    """Score dans [0, 1]: moyenne du taux de non-défaite contre Minimax 'difficile' et 'moyen'.
+
+    Contre 'difficile' (déterministe) et un agent glouton, 2 parties (X puis O) suffisent.
+    """
+    hard = evaluate_vs_minimax(agent, games=2, difficulte="difficile")
+    medium = evaluate_vs_minimax(agent, games=eval_games, difficulte="moyen", rng=random.Random(0))
+    return 0.5 * (hard["non_loss"] + medium["non_loss"])
+
+
+def _should_prune(shared: Any, checkpoint: int, score: float, min_trials: int) -> bool:
+    if shared is None:
+        return False
+    previous = [v for (k, _), v in shared.items() if k == checkpoint]
+    if len(previous) < min_trials:
+        return False
+    return score < statistics.median(previous)
+
+
+def run_trial(
+    trial_id: int,
+    overrides: Dict[str, Any],
+    episodes: int,
+    checkpoint_every: int,
+    eval_games: int,
+    seed: int,
+    target_score: float = DEFAULT_TARGET_SCORE,
+    shared: Any = None,
+    min_trials: int = DEFAULT_MIN_TRIALS_FOR_PRUNING,
+) -> Dict[str, Any]:
+    """Entraîne et évalue un essai. Exécuté dans un processus du pool."""
+    try:
+        import torch
+
+        torch.set_num_threads(1)  # un cœur par essai: évite la sur-souscription du CPU
+    except ImportError:
+        pass
+    seed_worker(seed, trial_id)
+
+    t0 = time.perf_counter()
+    done_episodes = 0
+    score = 0.0
+    episodes_to_target: Optional[int] = None
+    pruned = False
+    error = ""
+    history: List[str] = []
+
+    try:
+        agent = DQNAgent(DQNConfig(**overrides), device="cpu")
+        while done_episodes < episodes:
+            chunk = min(checkpoint_every, episodes - done_episodes)
+            self_play_train(agent, episodes=chunk, verbose_every=0)
+            done_episodes += chunk
+
+            score = score_agent(agent, eval_games)
+            history.append(f"{done_episodes}:{score:.3f}")
+            if episodes_to_target is None and score >= target_score:
+                episodes_to_target = done_episodes
+
+            if _should_prune(shared, done_episodes, score, min_trials):
+                pruned = True
+            if shared is not None:
+                shared[(done_episodes, trial_id)] = score
+            if pruned:
+                break
+    except MemoryBudgetExceeded as e:
+        error = str(e)
+
+    row: Dict[str, Any] = {
+        "trial": trial_id,
+        "score": round(score, 4),
+        "episodes_to_target": episodes_to_target if episodes_to_target is not None else "",
+        "episodes": done_episodes,
+        "pruned": pruned,
+        "error": error,
+        "seconds": round(time.perf_counter() - t0, 2),
+        "history": " ".join(history),
+    }
+    row.update(overrides)
+    return row
+
+
+def run_sweep(
+    space: Dict[str, List[Any]],
+    trials: int = 16,
+    workers: int = 0,
+    episodes: int = 3000,
+    checkpoint_every: int = 500,
+    eval_games: int = 20,
+    seed: int = 0,
+    grid: bool = False,
+    out_path: Optional[str] = None,
+    target_score: float = DEFAULT_TARGET_SCORE,
+    prune: bool = True,
+) -> List[Dict[str, Any]]:
+    """Lance tous les essais et écrit le tableau de résultats (CSV) si `out_path` est fourni."""
+    configs = sample_configs(space, trials, seed=seed, grid=grid)
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+
+    results: List[Dict[str, Any]] = []
+    with mp.Manager() as manager:
+        shared = manager.dict() if prune else None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(run_trial, i, cfg, episodes, checkpoint_every, eval_games, seed, target_score, shared)
+                for i, cfg in enumerate(configs)
+            ]
+            for fut in as_completed(futures):
+                row = fut.result()
+                results.append(row)
+                status = f"échec ({row['error']})" if row["error"] else "élagué" if row["pruned"] else "terminé"
+                print(f"[essai {row['trial']}] {status} score={row['score']} ({row['seconds']}s)")
+
+    results.sort(
+        key=lambda r: (
+            r["error"] != "",
+            r["episodes_to_target"] if r["episodes_to_target"] != "" else float("inf"),
+            -r["score"],
+            r["seconds"],
+        )
+    )
+    if out_path:
+        write_results(results, out_path)
+    return results
+
+
+def write_results(results: List[Dict[str, Any]], path: str) -> None:
+    if not results:
+        return
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    columns: List[str] = []
+    for row in results:
+        for k in row:
+            if k not in columns:
+                columns.append(k)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def _parse_value(name: str, raw: str) -> Any:
+    default = asdict(DQNConfig())[name]
+    if isinstance(default, bool):
+        return raw.lower() in ("1", "true", "oui", "yes")
+    if isinstance(default, int):
+        return int(float(raw))
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def parse_space(params: List[str]) -> Dict[str, List[Any]]:
+    """Convertit ['lr=1e-3,5e-4', ...] en espace de recherche (champs de DQNConfig)."""
+    if not params:
+        return dict(DEFAULT_SPACE)
+    valid = {f.name for f in fields(DQNConfig)}
+    space: Dict[str, List[Any]] = {}
+    for p in params:
+        name, _, values = p.partition("=")
+        name = name.strip()
+        if name not in valid:
+            raise ValueError(f"Paramètre inconnu: {name} (champs possibles: {', '.join(sorted(valid))})")
+        space[name] = [_parse_value(name, v.strip()) for v in values.split(",") if v.strip()]
+    return space
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres DQN (Morpion)")
+    parser.add_argument("--trials", type=int, default=16, help="nombre d'essais (0 = grille complète avec --grid)")
+    parser.add_argument("--workers", type=int, default=0, help="processus parallèles (0 = nb de cœurs - 1)")
+    parser.add_argument("--episodes", type=int, default=3000, help="épisodes de self-play max par essai")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="épisodes entre deux évaluations")
+    parser.add_argument("--eval-games", type=int, default=20, help="parties contre Minimax 'moyen' par évaluation")
+    parser.add_argument("--target-score", type=float, default=DEFAULT_TARGET_SCORE)
+    parser.add_argument("--param", action="append", default=[], help="espace de recherche, ex: lr=1e-3,5e-4")
+    parser.add_argument("--grid", action="store_true", help="grille complète au lieu d'un tirage aléatoire")
+    parser.add_argument("--no-prune", action="store_true", help="désactive l'élagage par la médiane")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="runs/sweep.csv")
+    args = parser.parse_args()
+
+    results = run_sweep(
+        parse_space(args.param),
+        trials=args.trials,
+        workers=args.workers,
+        episodes=args.episodes,
+        checkpoint_every=args.checkpoint_every,
+        eval_games=args.eval_games,
+        seed=args.seed,
+        grid=args.grid,
+        out_path=args.out,
+        target_score=args.target_score,
+        prune=not args.no_prune,
+    )
+    if results:
+        best = results[0]
+        print(f"\nMeilleur essai: {best['trial']} score={best['score']} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""table_minimax.py
+
+IA Minimax par table précalculée, sans PyTorch (NumPy seulement).
+
+Le jeu entier est résolu une fois au chargement (`state_index.negamax_scores`, 19683 entrées
+int8, ~20 ko); un coup se réduit ensuite à quelques lectures de table: aucune recherche
+pendant la partie.
+
+La difficulté est une probabilité d'erreur (`DEFAULT_BLUNDER_PROBS`): à chaque coup, avec
+cette probabilité, l'IA joue un coup sous-optimal tiré au hasard (s'il en existe un);
+sinon elle joue un coup optimal (victoire la plus rapide, défaite la plus lente), au hasard
+parmi les coups de même score pour varier les parties.
+
+Exemple:
+    ia = TableMinimax('O')
+    coup = ia.meilleur_coup(plateau, 'moyen')   # plateau: liste de 9 caractères 'X', 'O', ' '
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, Optional, Sequence
+
+from state_index import index_from_chars, move_scores, negamax_scores
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_BLUNDER_PROBS: Dict[str, float] = {
+    "facile": 0.6,
+    "moyen": 0.25,
+    "difficile": 0.0,
+}
+
+
+class TableMinimax:
+    """IA Minimax (tables) jouant `symbole`; interface de `IntelligenceArtificielle` (`meilleur_coup`)."""
+
+    def __init__(self, symbole: str, rng: Optional[random.Random] = None,
+                 blunder_probs: Optional[Dict[str, float]] = None):
+        self.symbole = symbole
+        # Par défaut le module `random` (comme `IntelligenceArtificielle`): `random.seed` suffit
+        self.rng = rng if rng is not None else random
+        self.blunder_probs = dict(DEFAULT_BLUNDER_PROBS if blunder_probs is None else blunder_probs)
+        negamax_scores()  # résolution du jeu dès la création (pas au premier coup)
+
+    def meilleur_coup(self, plateau: Sequence[str], difficulte: str = "difficile") -> int:
+        """Coup joué (0-8) selon la difficulté, -1 si la partie est terminée."""
+        if difficulte not in self.blunder_probs:
+            raise ValueError(f"Difficulté inconnue: {difficulte}")
+        scores = move_scores(index_from_chars(plateau, self.symbole))
+        if not scores:
+            return -1
+        meilleur = max(s for _, s in scores)
+        optimaux = [a for a, s in scores if s == meilleur]
+        erreurs = [a for a, s in scores if s < meilleur]
+        if erreurs and self.rng.random() < self.blunder_probs[difficulte]:
+            return self.rng.choice(erreurs)
+        return self.rng.choice(optimaux)
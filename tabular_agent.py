@@ -0,0 +1,285 @@
+"""tabular_agent.py
+
+Agents tabulaires pour Morpion 3x3: alternatives rapides au DQN.
+
+Le nombre d'états atteignables est petit (quelques milliers, moins d'un millier
+après réduction par symétrie), une table suffit donc:
+- `TabularQAgent`: Q-learning sur les états canoniques (Q[s][a])
+- `AfterstateAgent`: apprentissage TD de la valeur des "afterstates" V(s après mon coup)
+
+Les deux agents exposent la même interface que `DQNAgent`
+(`select_action` / `remember` / `train_step` / `save` / `load`, `config.train_steps_per_move`,
+`set_epsilon_for_difficulty`) et peuvent donc être entraînés avec `dqn_agent.self_play_train`
+ou utilisés dans `morpion_pygame`.
+
+Ce module n'importe pas PyTorch: il fonctionne sur une installation légère.
+
+Remarque sur les transitions:
+- `self_play_train` et le jeu contre un humain fournissent `next_state` vu par l'agent après
+  la réponse adverse (2 pions de plus que `state`): cible TD positive
+- une transition dont `next_state` est vu par l'adversaire (1 pion de plus) reçoit une cible
+  négative (negamax)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import ContextManager, Deque, Dict, List, Optional, Tuple
+
+from telemetry import TrainingTelemetry
+from tictactoe_env import Transition, canonical
+
+
+# =====================
+# Paramètres principaux
+# =====================
+DEFAULT_TABULAR_ALPHA = 0.3
+DEFAULT_TABULAR_GAMMA = 0.95
+DEFAULT_TABULAR_BATCH_SIZE = 16
+DEFAULT_TABULAR_REPLAY_CAPACITY = 5_000
+DEFAULT_TABULAR_MIN_REPLAY_SIZE = 16
+
+DEFAULT_TABULAR_EPSILON_START = 1.0
+DEFAULT_TABULAR_EPSILON_END = 0.05
+DEFAULT_TABULAR_EPSILON_DECAY_STEPS = 10_000
+
+
+StateKey = Tuple[int, ...]
+
+
+@dataclass
+class TabularConfig:
+    alpha: float = DEFAULT_TABULAR_ALPHA
+    gamma: float = DEFAULT_TABULAR_GAMMA
+    batch_size: int = DEFAULT_TABULAR_BATCH_SIZE
+    replay_capacity: int = DEFAULT_TABULAR_REPLAY_CAPACITY
+    min_replay_size: int = DEFAULT_TABULAR_MIN_REPLAY_SIZE
+
+    epsilon_start: float = DEFAULT_TABULAR_EPSILON_START
+    epsilon_end: float = DEFAULT_TABULAR_EPSILON_END
+    epsilon_decay_steps: int = DEFAULT_TABULAR_EPSILON_DECAY_STEPS
+
+    train_steps_per_move: int = 1
+
+
+class _TabularAgentBase(ABC):
+    """Logique commune: epsilon, replay, canonisation, sauvegarde JSON.
+
+    Les sous-classes définissent `action_values` et `_update`.
+    """
+
+    kind = "tabular"
+    row_size = 9
+
+    def __init__(self, config: Optional[TabularConfig] = None):
+        self.config = config or TabularConfig()
+        self.table: Dict[StateKey, List[float]] = {}
+        self.replay: Deque[Transition] = deque(maxlen=self.config.replay_capacity)
+
+        self.step_count = 0
+        self.epsilon = self.config.epsilon_start
+        self.train_updates = 0
+
+        self.telemetry: Optional[TrainingTelemetry] = None
+        # cache: état (tuple) -> (état canonique, permutation)
+        self._canon_cache: Dict[StateKey, Tuple[StateKey, Tuple[int, ...]]] = {}
+
+    def _phase(self, name: str) -> ContextManager[None]:
+        if self.telemetry is None:
+            return nullcontext()
+        return self.telemetry.phase(name)
+
+    def _canonical(self, state: List[float]) -> Tuple[StateKey, Tuple[int, ...]]:
+        key = tuple(int(v) for v in state)
+        hit = self._canon_cache.get(key)
+        if hit is None:
+            hit = canonical(list(key))
+            self._canon_cache[key] = hit
+        return hit
+
+    def _rekey(self, table: Dict[StateKey, List[float]]) -> Dict[StateKey, List[float]]:
+        """Table d'un ancien fichier (plateau canonique = plus grande symétrie lexicographique)
+        ré-indexée selon `canonical` (plus petit index); les lignes suivent la permutation."""
+        out: Dict[StateKey, List[float]] = {}
+        for old_key, row in table.items():
+            key, perm = canonical(list(old_key))
+            out[key] = row if len(row) == 1 else [row[j] for j in perm]
+        return out
+
+    def _row(self, key: StateKey) -> List[float]:
+        row = self.table.get(key)
+        if row is None:
+            row = [0.0] * self.row_size
+            self.table[key] = row
+        return row
+
+    def set_epsilon_for_difficulty(self, difficulte: str) -> None:
+        """Même barème que `DQNAgent.set_epsilon_for_difficulty`."""
+        d = (difficulte or "difficile").lower()
+        if d == "facile":
+            self.epsilon = 0.40
+        elif d == "moyen":
+            self.epsilon = 0.15
+        else:
+            self.epsilon = 0.05
+
+    def _update_epsilon_training(self) -> None:
+        self.step_count += 1
+        frac = min(1.0, self.step_count / float(self.config.epsilon_decay_steps))
+        self.epsilon = self.config.epsilon_start + frac * (self.config.epsilon_end - self.config.epsilon_start)
+
+    @abstractmethod
+    def action_values(self, state: List[float], valid: List[int]) -> List[float]:
+        """Valeur estimée de chaque coup de `valid` (même ordre)."""
+
+    def _best_next_value(self, next_state: List[float], next_valid_mask: List[float]) -> float:
+        valid = [i for i, m in enumerate(next_valid_mask) if m > 0.5]
+        if not valid:
+            return 0.0
+        return max(self.action_values(next_state, valid))
+
+    @abstractmethod
+    def _update(self, t: Transition) -> float:
+        """Mise à jour TD d'une transition; retourne l'erreur TD au carré."""
+
+    def select_action(self, state: List[float], valid: List[int], training: bool = False) -> int:
+        if not valid:
+            return -1
+        if random.random() < self.epsilon:
+            return random.choice(valid)
+
+        values = self.action_values(state, valid)
+        best_a = valid[0]
+        best_v = values[0]
+        for a, v in zip(valid[1:], values[1:]):
+            if v > best_v:
+                best_v = v
+                best_a = a
+        return best_a
+
+    def remember(self, transition: Transition) -> None:
+        # Les transitions sont rejouées plus tard: en self-play la récompense du dernier
+        # coup adverse est fixée après coup (défaite), comme pour le DQN.
+        self.replay.append(transition)
+
+    def _td_target(self, t: Transition) -> float:
+        if t.done:
+            return t.reward
+        # negamax si `next_state` est vu par l'adversaire (un seul coup joué depuis `state`)
+        played = sum(1 for v in t.next_state if v != 0) - sum(1 for v in t.state if v != 0)
+        sign = -1.0 if played == 1 else 1.0
+        return t.reward + sign * self.config.gamma * self._best_next_value(t.next_state, t.next_valid_mask)
+
+    def train_step(self) -> Optional[float]:
+        if len(self.replay) < self.config.min_replay_size:
+            return None
+
+        with self._phase("sample"):
+            batch = random.sample(self.replay, min(self.config.batch_size, len(self.replay)))
+
+        with self._phase("forward_backward"):
+            total = 0.0
+            for t in batch:
+                total += self._update(t)
+            loss = total / len(batch)
+
+        self.train_updates += 1
+        if self.telemetry is not None:
+            self.telemetry.record_update(loss, self.epsilon, 0.0)
+        return loss
+
+    def save(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = {
+            "kind": self.kind,
+            "canonical": "index",
+            "table": {",".join(str(v) for v in key): row for key, row in self.table.items()},
+            "step_count": self.step_count,
+            "epsilon": self.epsilon,
+            "train_updates": self.train_updates,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    def load(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if payload.get("kind") != self.kind:
+            return False
+        self.table = {
+            tuple(int(v) for v in key.split(",")): [float(x) for x in row]
+            for key, row in payload.get("table", {}).items()
+        }
+        if payload.get("canonical") != "index":
+            self.table = self._rekey(self.table)
+        self.step_count = int(payload.get("step_count", 0))
+        self.epsilon = float(payload.get("epsilon", self.config.epsilon_end))
+        self.train_updates = int(payload.get("train_updates", 0))
+        return True
+
+
+class TabularQAgent(_TabularAgentBase):
+    """Q-learning tabulaire sur les états canoniques (symétries du plateau)."""
+
+    kind = "tabular_q"
+
+    def action_values(self, state: List[float], valid: List[int]) -> List[float]:
+        key, perm = self._canonical(state)
+        row = self.table.get(key)
+        if row is None:
+            return [0.0] * len(valid)
+        # action `a` du plateau d'origine = indice perm.index(a) du plateau canonique
+        return [row[perm.index(a)] for a in valid]
+
+    def _update(self, t: Transition) -> float:
+        target = self._td_target(t)
+        key, perm = self._canonical(t.state)
+        row = self._row(key)
+        a = perm.index(t.action)
+        delta = target - row[a]
+        row[a] += self.config.alpha * delta
+        return delta * delta
+
+
+class AfterstateAgent(_TabularAgentBase):
+    """Apprentissage TD de V(afterstate): valeur du plateau juste après mon coup.
+
+    Plusieurs couples (état, action) mènent au même afterstate: l'information est
+    partagée, ce qui accélère encore la convergence par rapport au Q-learning.
+    La table stocke une seule valeur par afterstate canonique.
+    """
+
+    kind = "afterstate"
+    row_size = 1
+
+    def _afterstate_key(self, state: List[float], action: int) -> StateKey:
+        after = [int(v) for v in state]
+        after[action] = 1
+        key, _ = self._canonical(after)
+        return key
+
+    def action_values(self, state: List[float], valid: List[int]) -> List[float]:
+        values = []
+        for a in valid:
+            row = self.table.get(self._afterstate_key(state, a))
+            values.append(row[0] if row is not None else 0.0)
+        return values
+
+    def _update(self, t: Transition) -> float:
+        target = self._td_target(t)
+        row = self._row(self._afterstate_key(t.state, t.action))
+        delta = target - row[0]
+        row[0] += self.config.alpha * delta
+        return delta * delta
@@ -0,0 +1,182 @@
+"""telemetry.py
+
+Instrumentation de l'entraînement DQN (mesures de performance).
+
+- Chronomètres par phase: sélection d'action, pas d'environnement, échantillonnage,
+  construction des tenseurs, forward/backward, synchronisation du target network
+- Statistiques d'apprentissage: loss, epsilon, moyenne du max-Q, issues des épisodes
+- Export vers un fichier CSV ou JSONL (une ligne par fenêtre de `verbose_every` épisodes)
+- Sessions de profilage optionnelles (cProfile ou torch.profiler)
+
+Ce module n'importe pas PyTorch: il reste utilisable pour instrumenter du code sans DQN.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import csv
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+# Phases mesurées par `DQNAgent.train_step` et `self_play_train`
+PHASES = (
+    "select_action",
+    "env_step",
+    "sample",
+    "tensors",
+    "forward_backward",
+    "target_sync",
+)
+
+
+class TrainingTelemetry:
+    """Collecte des chronomètres et statistiques d'entraînement.
+
+    Les valeurs sont agrégées sur une fenêtre glissante (entre deux appels à `flush`)
+    et écrites dans `sink_path` si fourni. Le format est déduit de l'extension
+    (`.csv` ou `.jsonl`).
+    """
+
+    def __init__(self, sink_path: Optional[str] = None):
+        self.sink_path = sink_path
+        self.sink_format = "csv" if sink_path and sink_path.lower().endswith(".csv") else "jsonl"
+        self._csv_header_written = False
+        if sink_path and os.path.dirname(sink_path):
+            os.makedirs(os.path.dirname(sink_path), exist_ok=True)
+
+        self.totals: Dict[str, float] = {name: 0.0 for name in PHASES}
+        self.episodes_total = 0
+        self.updates_total = 0
+        self._start = time.perf_counter()
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self.phase_time: Dict[str, float] = {name: 0.0 for name in PHASES}
+        self.phase_count: Dict[str, int] = {name: 0 for name in PHASES}
+        self.losses: List[float] = []
+        self.max_qs: List[float] = []
+        self.epsilon = 0.0
+        self.outcomes = {"x": 0, "o": 0, "nul": 0}
+        self.episode_lengths: List[int] = []
+        self._window_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Chronomètre un bloc de code sous le nom `name`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.phase_time[name] = self.phase_time.get(name, 0.0) + dt
+            self.phase_count[name] = self.phase_count.get(name, 0) + 1
+            self.totals[name] = self.totals.get(name, 0.0) + dt
+
+    def record_update(self, loss: float, epsilon: float, mean_max_q: float) -> None:
+        self.losses.append(loss)
+        self.max_qs.append(mean_max_q)
+        self.epsilon = epsilon
+        self.updates_total += 1
+
+    def record_episode(self, winner: int, length: int, epsilon: Optional[float] = None) -> None:
+        """Enregistre l'issue d'un épisode (winner: 1=X, -1=O, 0=nul)."""
+        if winner == 1:
+            self.outcomes["x"] += 1
+        elif winner == -1:
+            self.outcomes["o"] += 1
+        else:
+            self.outcomes["nul"] += 1
+        self.episode_lengths.append(length)
+        if epsilon is not None:
+            self.epsilon = epsilon
+        self.episodes_total += 1
+
+    def summary(self) -> Dict[str, float]:
+        """Statistiques de la fenêtre courante (sans la réinitialiser)."""
+        n_ep = max(1, len(self.episode_lengths))
+        elapsed = max(1e-9, time.perf_counter() - self._window_start)
+        row: Dict[str, float] = {
+            "episodes_total": self.episodes_total,
+            "updates_total": self.updates_total,
+            "elapsed_s": time.perf_counter() - self._start,
+            "epsilon": self.epsilon,
+            "loss_mean": sum(self.losses) / len(self.losses) if self.losses else float("nan"),
+            "max_q_mean": sum(self.max_qs) / len(self.max_qs) if self.max_qs else float("nan"),
+            "win_x": self.outcomes["x"] / n_ep,
+            "win_o": self.outcomes["o"] / n_ep,
+            "draw": self.outcomes["nul"] / n_ep,
+            "episode_len_mean": sum(self.episode_lengths) / n_ep,
+            "updates_per_s": len(self.losses) / elapsed,
+        }
+        for name in PHASES:
+            row[f"t_{name}_s"] = self.phase_time.get(name, 0.0)
+        return row
+
+    def format_summary(self, row: Optional[Dict[str, float]] = None) -> str:
+        row = row or self.summary()
+        timers = " ".join(f"{name}={row[f't_{name}_s']:.3f}s" for name in PHASES)
+        return (
+            f"[ep {int(row['episodes_total'])}] eps={row['epsilon']:.3f} "
+            f"loss={row['loss_mean']:.4f} maxQ={row['max_q_mean']:.3f} "
+            f"X={row['win_x']:.2f} O={row['win_o']:.2f} nul={row['draw']:.2f} "
+            f"upd/s={row['updates_per_s']:.0f} | {timers}"
+        )
+
+    def flush(self) -> Dict[str, float]:
+        """Écrit la fenêtre courante dans le sink puis la réinitialise."""
+        row = self.summary()
+        if self.sink_path:
+            if self.sink_format == "csv":
+                with open(self.sink_path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+                    if not self._csv_header_written and f.tell() == 0:
+                        writer.writeheader()
+                    self._csv_header_written = True
+                    writer.writerow(row)
+            else:
+                with open(self.sink_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+        self._reset_window()
+        return row
+
+
+@contextmanager
+def profile_session(kind: str = "cprofile", output_path: Optional[str] = None, top: int = 25) -> Iterator[object]:
+    """Encapsule un bloc dans une session de profilage.
+
+    Args:
+        kind: 'cprofile' ou 'torch' (torch.profiler, activités CPU)
+        output_path: fichier de sortie (.prof pour cProfile, trace Chrome .json pour torch)
+        top: nombre de lignes affichées en fin de session
+
+    Exemple:
+        with profile_session("cprofile", "profiles/train.prof"):
+            self_play_train(agent, episodes=500)
+    """
+    if output_path and os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    if kind == "torch":
+        from torch.profiler import ProfilerActivity, profile
+
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=False) as prof:
+            yield prof
+        if output_path:
+            prof.export_chrome_trace(output_path)
+        print(prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=top))
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output_path:
+            profiler.dump_stats(output_path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,6 @@
+"""Configuration pytest: les modules du projet sont à la racine du dépôt."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
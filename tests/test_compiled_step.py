@@ -0,0 +1,23 @@
+"""Parité perte / gradients entre le pas eager de `DQNAgent` et les pas compilés."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from compiled_step import COMPILE_MODES, DEFAULT_PARITY_ATOL, _filled_agent, check_parity
+
+
+@pytest.fixture(scope="module")
+def agent():
+    torch.set_num_threads(1)
+    return _filled_agent("eager", 1_000, seed=0)
+
+
+@pytest.mark.parametrize("mode", [m for m in COMPILE_MODES if m != "eager"])
+def test_parity_with_eager(agent, mode):
+    try:
+        r = check_parity(agent, mode, batches=3)
+    except RuntimeError as e:  # torch.compile indisponible sur cette installation
+        pytest.skip(str(e))
+    assert r["max_loss_diff"] <= DEFAULT_PARITY_ATOL
+    assert r["max_grad_diff"] <= DEFAULT_PARITY_ATOL
@@ -0,0 +1,46 @@
+"""Comportement de `MCTSAgent` (recherche seule: évaluateur neutre, sans réseau entraîné)."""
+
+import pytest
+
+pytest.importorskip("torch")
+
+from dqn_agent import DQNAgent
+from mcts_agent import MCTSAgent, MCTSConfig
+
+
+def _agent(simulations: int = 200) -> MCTSAgent:
+    # Q-values nulles: seuls les états terminaux rencontrés pendant la recherche guident le choix
+    return MCTSAgent(DQNAgent(device="cpu"), MCTSConfig(simulations=simulations),
+                     evaluator=lambda states: [[0.0] * 9 for _ in states])
+
+
+def _valid(state):
+    return [i for i, v in enumerate(state) if v == 0]
+
+
+def test_plays_immediate_win():
+    # X X .
+    # O O .
+    # . . .    (1 = joueur qui doit jouer)
+    state = [1, 1, 0, -1, -1, 0, 0, 0, 0]
+    assert _agent().select_action([float(v) for v in state], _valid(state)) == 2
+
+
+def test_blocks_immediate_loss():
+    # X . .
+    # O O .
+    # X . .    l'adversaire menace la case 5
+    state = [1, 0, 0, -1, -1, 0, 1, 0, 0]
+    assert _agent().select_action([float(v) for v in state], _valid(state)) == 5
+
+
+def test_tree_reused_after_opponent_reply():
+    agent = _agent(simulations=100)
+    state = [0] * 9
+    action = agent.select_action([0.0] * 9, _valid(state))
+    assert agent.root is not None and agent.root.n > 0
+    # réponse adverse, puis état vu par l'agent: sous-arbre déjà exploré
+    reply = next(a for a in _valid(state) if a != action)
+    after = [0] * 9
+    after[action], after[reply] = 1, -1
+    assert agent._find_root(tuple(after)).n > 0
@@ -15,7 +15,7 @@ Aucune donnée externe: les épisodes sont générés en jouant.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, Tuple
 
 
 WIN_COMBOS: Tuple[Tuple[int, int, int], ...] = (
@@ -30,6 +30,65 @@ WIN_COMBOS: Tuple[Tuple[int, int, int], ...] = (
 )
 
 
+def _rotate(perm: Tuple[int, ...]) -> Tuple[int, ...]:
+    # rotation de 90° (sens horaire): case (r, c) <- case (2 - c, r)
+    return tuple(perm[(2 - (i % 3)) * 3 + i // 3] for i in range(9))
+
+
+def _mirror(perm: Tuple[int, ...]) -> Tuple[int, ...]:
+    # symétrie gauche/droite: case (r, c) <- case (r, 2 - c)
+    return tuple(perm[(i // 3) * 3 + 2 - (i % 3)] for i in range(9))
+
+
+def _build_symmetries() -> Tuple[Tuple[int, ...], ...]:
+    perms = []
+    p: Tuple[int, ...] = tuple(range(9))
+    for _ in range(4):
+        perms.append(p)
+        perms.append(_mirror(p))
+        p = _rotate(p)
+    return tuple(perms)
+
+
+# Les 8 symétries du carré (groupe diédral D4).
+# Pour une permutation `p`, le plateau transformé vaut: [board[p[i]] for i in range(9)]
+SYMMETRIES: Tuple[Tuple[int, ...], ...] = _build_symmetries()
+
+
+# code base 3 d'une case (comme state_index: +1 -> 1, -1 -> 2)
+_CODE = {0: 0, 1: 1, -1: 2}
+_STATE_INDEX: object = None  # module state_index, False si NumPy est absent
+
+
+def _state_index():
+    # import différé: state_index importe ce module (SYMMETRIES, WIN_COMBOS)
+    global _STATE_INDEX
+    if _STATE_INDEX is None:
+        try:
+            import state_index
+
+            _STATE_INDEX = state_index
+        except ImportError:
+            _STATE_INDEX = False
+    return _STATE_INDEX or None
+
+
+def canonical(board: List[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Retourne (plateau canonique, permutation utilisée).
+
+    Le plateau canonique est la symétrie de plus petit index base 3 (`state_index.CANONICAL`,
+    première symétrie de `SYMMETRIES` en cas d'égalité). Lu dans les tables de state_index.py
+    si NumPy est disponible, calculé ici sinon (même résultat).
+    Une action `a` du plateau d'origine correspond à l'indice `perm.index(a)` du plateau canonique.
+    """
+    tables = _state_index()
+    if tables is not None:
+        perm = SYMMETRIES[tables.CANONICAL_SYM[tables.board_to_index(board)]]
+    else:
+        perm = min(SYMMETRIES, key=lambda p: sum(_CODE[board[j]] * 3 ** i for i, j in enumerate(p)))
+    return tuple(board[j] for j in perm), perm
+
+
 def check_winner(board_abs: List[int]) -> int:
     """Retourne 1 si X gagne, -1 si O gagne, 0 sinon.
 
@@ -61,6 +120,35 @@ def to_perspective(board_abs: List[int], player: int) -> List[int]:
     return [v * player for v in board_abs]
 
 
+def reachable_states(include_terminal: bool = False) -> List[Tuple[int, ...]]:
+    """Tous les plateaux atteignables depuis le plateau vide, vus par le joueur qui doit jouer.
+
+    Par défaut seuls les états non terminaux (où un coup doit être choisi) sont retournés:
+    4520 états, dans un ordre déterministe.
+    """
+    seen = set()
+    out: List[Tuple[int, ...]] = []
+
+    def visit(board_abs: List[int], player: int) -> None:
+        key = tuple(v * player for v in board_abs)
+        if key in seen:
+            return
+        seen.add(key)
+        terminal = check_winner(board_abs) != 0 or all(v != 0 for v in board_abs)
+        if terminal:
+            if include_terminal:
+                out.append(key)
+            return
+        out.append(key)
+        for a in valid_actions(board_abs):
+            board_abs[a] = player
+            visit(board_abs, -player)
+            board_abs[a] = 0
+
+    visit([0] * 9, 1)
+    return out
+
+
 def from_chars(plateau_chars: List[str], agent_symbol: str) -> Tuple[List[int], int]:
     """Convertit un plateau en chars ['X','O',' '] vers plateau absolu int.
 
@@ -90,3 +178,5 @@ class Transition:
     next_state: List[float]
     done: bool
     next_valid_mask: List[float]
+    # Nombre de coups (du même joueur) agrégés dans la transition: la cible utilise gamma**n_steps
+    n_steps: int = 1